@@ -1,7 +1,24 @@
+import json
+
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 
 API_BASE = "http://localhost:8000/pdf"
+# (connect, read) timeouts in seconds
+REQUEST_TIMEOUT = (3.05, 30)
+UPLOAD_TIMEOUT = (3.05, 300)
+STREAM_TIMEOUT = (3.05, 120)
+PDF_LIST_TTL_SECONDS = 30
+JOB_POLL_SECONDS = 1.0
+STAGE_LABELS = {
+    "queued": "Queued",
+    "extracting": "Reading pages",
+    "embedding": "Embedding",
+    "writing": "Writing to the vault",
+    "linked": "Ready",
+    "failed": "Failed",
+}
 
 
 st.set_page_config(page_title="PDF QA Assistant", layout="wide")
@@ -18,6 +35,42 @@ if "question_text" not in st.session_state:
     st.session_state.question_text = ""
 if "is_uploading" not in st.session_state:
     st.session_state.is_uploading = False
+if "pending_question" not in st.session_state:
+    st.session_state.pending_question = ""
+if "upload_jobs" not in st.session_state:
+    st.session_state.upload_jobs = []
+
+
+@st.cache_resource
+def get_http_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_data(ttl=PDF_LIST_TTL_SECONDS, show_spinner=False)
+def fetch_pdf_list(project_name):
+    res = get_http_session().get(
+        f"{API_BASE}/pdf/list", params={"project_name": project_name}, timeout=REQUEST_TIMEOUT
+    )
+    res.raise_for_status()
+    return res.json().get("pdfs", [])
+
+
+def job_progress(job):
+    stage = job.get("stage", "queued")
+    label = f"{job.get('filename', '')}: {STAGE_LABELS.get(stage, stage)}"
+    if stage == "linked":
+        return 1.0, f"{label} ({job.get('num_chunks', 0)} chunks)"
+    if stage in ("queued", "failed"):
+        return 0.0, f"{label} - {job['error']}" if job.get("error") else label
+    total = job.get("pages_total")
+    if total:
+        done = job.get("pages_done") or 0
+        return 0.05 + 0.9 * done / total, f"{label} (page {done}/{total}, {job.get('num_chunks', 0)} chunks)"
+    return 0.05, label
 
 
 def inject_harry_potter_banner():
@@ -161,6 +214,65 @@ def show_upload_spinner(show):
         st.markdown("<div></div>", unsafe_allow_html=True)
 
 
+def stream_answer(params, meta):
+    with get_http_session().get(f"{API_BASE}/ask/stream", params=params, stream=True, timeout=STREAM_TIMEOUT) as res:
+        res.raise_for_status()
+        event = "message"
+        for line in res.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[len("data:"):].strip())
+                if event == "token":
+                    yield data.get("text", "")
+                elif event == "error":
+                    meta["error"] = data.get("message", "Unknown error")
+                else:
+                    meta.update(data)
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def upload_progress():
+    session = get_http_session()
+    finished = True
+    failed = []
+    unknown = []
+    for job_id in st.session_state.upload_jobs:
+        try:
+            res = session.get(f"{API_BASE}/jobs/{job_id}", timeout=REQUEST_TIMEOUT)
+        except Exception as e:
+            st.warning(f"Waiting for the server: {e}")
+            finished = False
+            continue
+        if res.status_code == 404:
+            st.warning(f"Job {job_id} is unknown to the server; its outcome cannot be tracked.")
+            unknown.append(job_id)
+            continue
+        if not res.ok:
+            st.warning(f"Waiting for the server: HTTP {res.status_code}")
+            finished = False
+            continue
+        job = res.json()
+        fraction, text = job_progress(job)
+        st.progress(fraction, text=text)
+        finished = finished and job.get("done", False)
+        if job.get("stage") == "failed":
+            failed.append(job.get("filename", job_id))
+    if finished:
+        st.session_state.upload_jobs = []
+        fetch_pdf_list.clear()
+        if failed or unknown:
+            messages = []
+            if failed:
+                messages.append("❌ Indexing failed for: " + ", ".join(failed))
+            if unknown:
+                messages.append("⚠️ Outcome unknown for jobs: " + ", ".join(unknown) + ". Check the PDF list.")
+            st.session_state.upload_success_message = " ".join(messages)
+        else:
+            st.session_state.upload_success_message = "✅ PDFs indexed and ready for questions."
+        st.rerun()
+
+
 left, center, right = st.columns([1, 2, 1])
 
 with center:
@@ -180,8 +292,7 @@ with center:
         st.stop()
 
     try:
-        res = requests.get(f"{API_BASE}/pdf/list", params={"project_name": st.session_state.project_name})
-        pdf_list = res.json().get("pdfs", []) if res.ok else []
+        pdf_list = fetch_pdf_list(st.session_state.project_name)
     except Exception as e:
         st.error(f"Error fetching PDF list: {e}")
         pdf_list = []
@@ -193,39 +304,43 @@ with center:
             st.markdown(f"<div style='background:#222;padding:10px;text-align:right;color:#fff;border-radius:10px;margin-bottom:10px'><strong>You:</strong><br>{msg['content']}</div>", unsafe_allow_html=True)
         else:
             st.markdown(f"<div style='background:#333;padding:10px;color:#0ff;border-radius:10px;margin-bottom:10px'><strong>Assistant:</strong><br>{msg['content']}</div>", unsafe_allow_html=True)
+            if msg.get("cached") == "semantic":
+                st.caption("Reused the answer to a very similar earlier question.")
             if msg.get("context"):
                 with st.expander("Context Preview"):
                     for i, chunk in enumerate(msg["context"], 1):
                         st.markdown(f"**Chunk {i}:**\n{chunk}")
 
+    if st.session_state.pending_question:
+        question = st.session_state.pending_question
+        st.session_state.pending_question = ""
+        params = {"q": question, "project_name": st.session_state.project_name}
+        if selected_pdf:
+            params["pdf_name"] = selected_pdf
+        meta = {}
+        try:
+            st.markdown("<strong>Assistant:</strong>", unsafe_allow_html=True)
+            answer = st.write_stream(stream_answer(params, meta))
+            st.session_state.chat_history.append({
+                "role": "assistant",
+                "content": meta.get("error") or answer or "No answer returned.",
+                "context": meta.get("context_preview", []),
+                "cached": meta.get("cached", False),
+            })
+        except Exception as e:
+            st.session_state.chat_history.append({
+                "role": "assistant",
+                "content": f"Error: {e}"
+            })
+        st.rerun()
+
     st.markdown("---")
 
     def on_enter():
         question = st.session_state.question_text.strip()
         if question:
             st.session_state.chat_history.append({"role": "user", "content": question})
-            try:
-                params = {"q": question, "project_name": st.session_state.project_name}
-                if selected_pdf:
-                    params["pdf_name"] = selected_pdf
-                res = requests.get(f"{API_BASE}/ask", params=params)
-                if res.ok:
-                    data = res.json()
-                    st.session_state.chat_history.append({
-                        "role": "assistant",
-                        "content": data.get("answer", "No answer returned."),
-                        "context": data.get("context_preview", [])
-                    })
-                else:
-                    st.session_state.chat_history.append({
-                        "role": "assistant",
-                        "content": "Sorry, I couldn't generate a response at the moment."
-                    })
-            except Exception as e:
-                st.session_state.chat_history.append({
-                    "role": "assistant",
-                    "content": f"Error: {e}"
-                })
+            st.session_state.pending_question = question
             st.session_state.question_text = ""
 
     st.text_input(
@@ -253,13 +368,20 @@ with center:
                     show_upload_spinner(True)
                     files = [("files", (f.name, f, "application/pdf")) for f in uploaded_files]
                     try:
-                        res = requests.post(
+                        res = get_http_session().post(
                             f"{API_BASE}/upload",
                             params={"project_name": st.session_state.project_name},
-                            files=files
+                            files=files,
+                            timeout=UPLOAD_TIMEOUT
                         )
                         if res.ok:
-                            st.session_state.upload_success_message = "✅ PDFs uploaded and indexed successfully!"
+                            body = res.json()
+                            st.session_state.upload_jobs = body.get("job_ids", [])
+                            if st.session_state.upload_jobs:
+                                st.session_state.upload_success_message = "✅ PDFs uploaded! Indexing is running in the background."
+                            else:
+                                st.session_state.upload_success_message = "✅ These PDFs are already in the vault."
+                                fetch_pdf_list.clear()
                         else:
                             st.session_state.upload_success_message = (
                                 "❌ Upload failed: " + res.json().get("detail", "Unknown error")
@@ -276,3 +398,6 @@ with center:
                 f"<div style='margin-top:10px; color:#0f0; font-weight:bold'>{st.session_state.upload_success_message}</div>",
                 unsafe_allow_html=True
             )
+
+    if st.session_state.upload_jobs:
+        upload_progress()
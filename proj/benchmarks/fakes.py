@@ -0,0 +1,301 @@
+import asyncio
+import hashlib
+import random
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import fitz
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+_WORDS = (
+    "wand spell potion charm owl castle library parchment quill cauldron "
+    "dragon phoenix goblet prophecy corridor staircase portrait tower dungeon "
+    "herbology transfiguration divination astronomy potions defence ancient "
+    "runes history arithmancy quidditch broom snitch house prefect feast"
+).split()
+
+QA_TEMPLATE = """You are a helpful assistant. Use the following context to answer the question.
+
+Context:
+{context}
+
+Question:
+{question}
+
+Answer:"""
+
+
+def make_pdf(num_pages: int, words_per_page: int = 350, seed: int = 0) -> bytes:
+    """
+    Generate a text PDF with deterministic pseudo-random prose.
+
+    Args:
+        num_pages (int): Number of pages.
+        words_per_page (int): Approximate number of words per page.
+        seed (int): Seed of the word generator.
+
+    Returns:
+        bytes: PDF file content.
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for _ in range(num_pages):
+        page = doc.new_page()
+        paragraphs = []
+        remaining = words_per_page
+        while remaining > 0:
+            length = min(remaining, rng.randint(40, 90))
+            paragraphs.append(" ".join(rng.choice(_WORDS) for _ in range(length)).capitalize() + ".")
+            remaining -= length
+        page.insert_textbox(page.rect + (36, 36, -36, -36), "\n\n".join(paragraphs), fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_questions(count: int, seed: int = 0) -> list[str]:
+    """
+    Generate distinct questions over the benchmark vocabulary.
+
+    Args:
+        count (int): Number of questions.
+        seed (int): Seed of the word generator.
+
+    Returns:
+        list[str]: Questions.
+    """
+    rng = random.Random(seed)
+    return [
+        f"What does the text say about the {rng.choice(_WORDS)} and the {rng.choice(_WORDS)} ({index})?"
+        for index in range(count)
+    ]
+
+
+class HashEmbeddings(Embeddings):
+    """
+    Deterministic embedding model that derives unit vectors from text hashes.
+
+    Stands in for the HuggingFace model so benchmarks run offline; an optional
+    per-call latency models the cost of real inference.
+
+    Attributes:
+        dimensions (int): Embedding dimensions.
+        latency_ms (float): Simulated latency per model call.
+    """
+
+    def __init__(self, dimensions: int = 384, latency_ms: float = 0.0):
+        self.dimensions = dimensions
+        self.latency_ms = latency_ms
+
+    def _embed(self, text: str) -> list[float]:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+        vector = np.random.default_rng(seed).standard_normal(self.dimensions).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+def _fake_response(contents: str) -> SimpleNamespace:
+    """
+    Build a deterministic Gemini-like response for a prompt.
+
+    Args:
+        contents (str): Compiled prompt.
+
+    Returns:
+        SimpleNamespace: Object shaped like `GenerateContentResponse`.
+    """
+    digest = hashlib.sha256(contents.encode("utf-8")).hexdigest()
+    text = f"Deterministic answer {digest[:16]} based on the provided context."
+    return SimpleNamespace(
+        text=text,
+        candidates=[SimpleNamespace(content=SimpleNamespace(parts=[SimpleNamespace(text=text)]))],
+        usage_metadata=SimpleNamespace(
+            prompt_token_count=max(1, len(contents) // 4),
+            candidates_token_count=max(1, len(text) // 4),
+        ),
+    )
+
+
+class _FakeModels:
+    def __init__(self, latency_ms: float):
+        self.latency_ms = latency_ms
+
+    def generate_content(self, model: str, contents: str):
+        time.sleep(self.latency_ms / 1000)
+        return _fake_response(contents)
+
+    def count_tokens(self, model: str, contents):
+        return SimpleNamespace(total_tokens=max(1, len(str(contents)) // 4))
+
+
+class _FakeAsyncModels:
+    def __init__(self, latency_ms: float):
+        self.latency_ms = latency_ms
+
+    async def generate_content(self, model: str, contents: str):
+        await asyncio.sleep(self.latency_ms / 1000)
+        return _fake_response(contents)
+
+    async def generate_content_stream(self, model: str, contents: str):
+        response = _fake_response(contents)
+        words = response.text.split(" ")
+
+        async def stream():
+            for index, word in enumerate(words):
+                await asyncio.sleep(self.latency_ms / 1000 / len(words))
+                last = index == len(words) - 1
+                yield SimpleNamespace(
+                    text=word if last else word + " ",
+                    usage_metadata=response.usage_metadata if last else None,
+                )
+
+        return stream()
+
+
+class FakeGenAIClient:
+    """
+    Offline stand-in for `google.genai.Client` with a fixed response latency.
+
+    Attributes:
+        models: Synchronous model API.
+        aio: Asynchronous API exposing `aio.models`.
+    """
+
+    latency_ms = 0.0
+
+    def __init__(self, *args, **kwargs):
+        self.models = _FakeModels(self.latency_ms)
+        self.aio = SimpleNamespace(models=_FakeAsyncModels(self.latency_ms))
+
+
+class _FakePrompt:
+    version = 1
+
+    def get_langchain_prompt(self) -> str:
+        return QA_TEMPLATE
+
+
+class FakeGeneration:
+    """
+    Offline stand-in for a Langfuse generation that keeps what it was given.
+
+    Attributes:
+        fields (dict): Fields passed at start and in updates.
+        end_time (int | None): End time passed to `end`, once ended.
+        ended (bool): Whether `end` was called.
+    """
+
+    def __init__(self, **fields):
+        self.fields = dict(fields)
+        self.end_time = None
+        self.ended = False
+
+    def update(self, **fields):
+        self.fields.update(fields)
+        return self
+
+    def end(self, end_time: int | None = None):
+        self.end_time = end_time
+        self.ended = True
+        return self
+
+
+class FakeLangfuse:
+    """
+    Offline stand-in for the Langfuse client that serves one prompt version.
+
+    Attributes:
+        generations (list[FakeGeneration]): Generations started so far.
+    """
+
+    def __init__(self):
+        self.generations = []
+
+    def auth_check(self) -> bool:
+        return True
+
+    def create_trace_id(self, seed: str | None = None) -> str:
+        return uuid.uuid4().hex
+
+    def get_prompt(self, name: str, label: str | None = None, **kwargs):
+        return _FakePrompt()
+
+    def start_generation(self, **kwargs):
+        generation = FakeGeneration(**kwargs)
+        self.generations.append(generation)
+        return generation
+
+    def flush(self):
+        pass
+
+
+class FakeCollection:
+    """
+    In-memory stand-in for the MongoDB upload catalog collection.
+
+    Supports the equality, `$in` and `$ne` filters, `find_one` sorting,
+    `$set` upserts, `update_many` and bulk `UpdateOne` writes used by the
+    catalog;
+    projections and indexes are accepted and ignored.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._documents: list[dict] = []
+
+    @staticmethod
+    def _matches(document: dict, query: dict) -> bool:
+        for key, condition in query.items():
+            value = document.get(key)
+            if isinstance(condition, dict):
+                if "$in" in condition and value not in condition["$in"]:
+                    return False
+                if "$ne" in condition and value == condition["$ne"]:
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    def create_index(self, keys, **kwargs) -> str:
+        return kwargs.get("name", "index")
+
+    def find(self, query: dict, *args, **kwargs) -> list[dict]:
+        with self._lock:
+            return [dict(document) for document in self._documents if self._matches(document, query)]
+
+    def find_one(self, query: dict, *args, sort: list | None = None, **kwargs) -> dict | None:
+        with self._lock:
+            documents = [document for document in self._documents if self._matches(document, query)]
+        for field, direction in reversed(sort or []):
+            documents.sort(key=lambda document: document.get(field), reverse=direction < 0)
+        return dict(documents[0]) if documents else None
+
+    def update_one(self, query: dict, update: dict, upsert: bool = False):
+        with self._lock:
+            for document in self._documents:
+                if self._matches(document, query):
+                    document.update(update.get("$set", {}))
+                    return
+            if upsert:
+                self._documents.append({**query, **update.get("$set", {})})
+
+    def update_many(self, query: dict, update: dict):
+        with self._lock:
+            for document in self._documents:
+                if self._matches(document, query):
+                    document.update(update.get("$set", {}))
+
+    def bulk_write(self, requests: list, ordered: bool = True):
+        for request in requests:
+            self.update_one(request._filter, request._doc, upsert=request._upsert)
@@ -0,0 +1,172 @@
+"""
+Recall, memory and latency of the local backend's int8 vector format.
+
+Indexes synthetic clustered embeddings into a `LocalVectorStore` once per
+vector format and compares its exact-scan top-k against float32 ground
+truth, with and without the float32 rerank of int8 candidates. Reports the
+bytes the store keeps memory-mapped (what a scan pages in), the bytes it
+reads per query to rerank, and the bytes the segments take on disk: int8
+segments keep their float32 file cold for reranking, so they shrink the
+resident bytes to a quarter while the disk use grows by a quarter.
+
+Run from the `proj` directory:
+
+    python -m benchmarks.quantization --chunks 50000 --queries 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from llama_index_pipeline.local_store import LocalVectorStore
+
+
+def make_embeddings(count: int, dim: int, seed: int = 0) -> np.ndarray:
+    """
+    Generate unit vectors grouped in clusters, like chunk embeddings of related documents.
+
+    Args:
+        count (int): Number of vectors.
+        dim (int): Embedding dimensions.
+        seed (int): Random seed.
+
+    Returns:
+        np.ndarray: float32 unit vectors, one per row.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(count // 50, 1), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)] + 0.6 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _index(store: LocalVectorStore, vectors: np.ndarray, project: str, pdfs: int):
+    for number, rows in enumerate(np.array_split(np.arange(len(vectors)), pdfs)):
+        filename = f"synthetic-{number}.pdf"
+        upload_id = f"upload-{number}"
+        store.write_chunks(
+            [
+                {
+                    "id": f"{filename}:{index}",
+                    "index": index,
+                    "text": str(int(row)),
+                    "embedding": vectors[row].tolist(),
+                    "page": 0,
+                    "start": 0,
+                    "end": 0,
+                }
+                for index, row in enumerate(rows)
+            ],
+            filename,
+            project,
+            upload_id,
+        )
+        store.publish(filename, project, upload_id, sha256=None)
+
+
+def run_format(workdir: str, vectors: np.ndarray, queries: np.ndarray, truth: list[set], dtype: str, rerank: int, args) -> dict:
+    """
+    Index the vectors in one format and measure recall, scanned bytes and latency.
+
+    Args:
+        workdir (str): Directory to build the store in.
+        vectors (np.ndarray): Chunk embeddings.
+        queries (np.ndarray): Query embeddings.
+        truth (list[set]): float32 top-k chunk ids per query.
+        dtype (str): Vector format of the store.
+        rerank (int): Quantized candidates rescored in float32 per segment.
+        args (argparse.Namespace): Benchmark settings.
+
+    Returns:
+        dict: Recall@k, megabytes mapped by the store, the most kilobytes a
+        query reads from the cold float32 files, megabytes on disk and query
+        latency.
+    """
+    store = LocalVectorStore(
+        workdir,
+        hnsw_min_chunks=len(vectors) + 1,
+        hnsw_m=16,
+        hnsw_ef_construction=200,
+        hnsw_ef_search=64,
+        dtype=dtype,
+        rerank_candidates=rerank,
+    )
+    store.prepare()
+    _index(store, vectors, args.project, args.pdfs)
+    store.search_many(queries[:1].tolist(), args.project, k=args.k)
+
+    segments = store._load_project(args.project)["segments"].values()
+    segment_dir = os.path.join(store._project_dir(args.project), "segments")
+    disk_bytes = sum(entry.stat().st_size for entry in os.scandir(segment_dir) if not entry.name.endswith(".jsonl"))
+    resident_bytes = sum(
+        sum(segment[key].nbytes for key in ("vectors", "codes", "scales") if segment[key] is not None)
+        for segment in segments
+    )
+    cold_rows = min(max(args.k, rerank), len(vectors) // args.pdfs) * args.pdfs if dtype == "int8" and rerank else 0
+
+    latencies = []
+    found = 0
+    for start in range(0, len(queries), args.batch):
+        batch = queries[start:start + args.batch]
+        began = time.perf_counter()
+        results = store.search_many(batch.tolist(), args.project, k=args.k)
+        latencies.append((time.perf_counter() - began) * 1000 / len(batch))
+        for offset, docs in enumerate(results):
+            found += len(truth[start + offset] & {int(doc.page_content) for doc in docs})
+    store.close()
+    return {
+        "dtype": dtype,
+        "rerank": rerank,
+        "recall_at_k": round(found / (len(queries) * args.k), 4),
+        "resident_mb": round(resident_bytes / 2**20, 2),
+        "cold_kb_per_query": round(cold_rows * 4 * vectors.shape[1] / 2**10, 1),
+        "disk_mb": round(disk_bytes / 2**20, 2),
+        "ms_per_query": round(float(np.mean(latencies)), 3),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare the local backend's float32 and int8 vector formats.")
+    parser.add_argument("--chunks", type=int, default=20000, help="Number of synthetic chunks to index.")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimensions.")
+    parser.add_argument("--pdfs", type=int, default=4, help="Number of segments to spread the chunks over.")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries to run.")
+    parser.add_argument("--batch", type=int, default=1, help="Queries per search_many call.")
+    parser.add_argument("--k", type=int, default=5, help="Results per query.")
+    parser.add_argument("--rerank", type=int, default=50, help="int8 candidates rescored in float32.")
+    parser.add_argument("--project", default="quantization", help="Project namespace to index into.")
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    vectors = make_embeddings(args.chunks, args.dim)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(0, len(vectors), args.queries)] + 0.3 * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ vectors.T
+    truth = [set(row.tolist()) for row in np.argpartition(-scores, args.k - 1, axis=1)[:, :args.k]]
+
+    results = []
+    for dtype, rerank in (("float32", 0), ("int8", 0), ("int8", args.rerank)):
+        with tempfile.TemporaryDirectory(prefix="wizvault-quant-") as workdir:
+            results.append(run_format(workdir, vectors, queries, truth, dtype, rerank, args))
+
+    header = f"{'dtype':<10}{'rerank':>8}{'recall@k':>12}{'resident MB':>14}{'cold KB/q':>12}{'disk MB':>10}{'ms/query':>12}"
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        print(
+            f"{row['dtype']:<10}{row['rerank']:>8}{row['recall_at_k']:>12}{row['resident_mb']:>14}"
+            f"{row['cold_kb_per_query']:>12}{row['disk_mb']:>10}{row['ms_per_query']:>12}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump({"config": {key: value for key, value in vars(args).items() if key != "output"}, "results": results}, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
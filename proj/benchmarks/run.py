@@ -0,0 +1,456 @@
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from benchmarks.fakes import (
+    FakeCollection,
+    FakeGenAIClient,
+    FakeLangfuse,
+    HashEmbeddings,
+    make_pdf,
+    make_questions,
+)
+
+
+class StageTimer:
+    """
+    Collects wall-clock latencies per named stage.
+    """
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.items: dict[str, int] = defaultdict(int)
+
+    def add(self, stage: str, seconds: float, items: int = 1):
+        self.samples[stage].append(seconds)
+        self.items[stage] += items
+
+    def reset(self):
+        self.samples.clear()
+        self.items.clear()
+
+    def wrap(self, stage: str, fn, items=None):
+        """
+        Wrap a synchronous function so every call is timed under `stage`.
+
+        Args:
+            stage (str): Stage name.
+            fn (callable): Function to time.
+            items (callable | None): Maps the call arguments to the number of
+                items processed, for throughput; defaults to 1 per call.
+
+        Returns:
+            callable: Timed function.
+        """
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - started, items(*args, **kwargs) if items else 1)
+        return timed
+
+    def summary(self) -> dict:
+        """
+        Summarize latency percentiles and throughput of every stage.
+
+        Returns:
+            dict: Per-stage call count, items, mean/p50/p90/p99 latency in
+            milliseconds and items per second of stage time.
+        """
+        result = {}
+        for stage, samples in sorted(self.samples.items()):
+            values = np.asarray(samples) * 1000
+            total = float(np.sum(values)) / 1000
+            result[stage] = {
+                "count": len(samples),
+                "items": self.items[stage],
+                "mean_ms": round(float(np.mean(values)), 3),
+                "p50_ms": round(float(np.percentile(values, 50)), 3),
+                "p90_ms": round(float(np.percentile(values, 90)), 3),
+                "p99_ms": round(float(np.percentile(values, 99)), 3),
+                "items_per_second": round(self.items[stage] / total, 2) if total > 0 else 0.0,
+            }
+        return result
+
+
+def _install_stand_ins(workdir: str, args) -> None:
+    """
+    Point the application at local stand-ins before any of it is imported.
+
+    Selects the local vector backend in `workdir` (unless `args.vector_backend`
+    is "neo4j", which keeps the Neo4j instance configured by NEO4J_URI so
+    that its Cypher write and search paths are measured), disables the
+    persistent embedding cache, and replaces the Langfuse, Gemini, MongoDB
+    and embedding-model clients with offline fakes.
+
+    Args:
+        workdir (str): Scratch directory for the vector store.
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        None
+    """
+    os.environ["VECTOR_BACKEND"] = getattr(args, "vector_backend", "local")
+    os.environ["LOCAL_VECTOR_PATH"] = os.path.join(workdir, "vectors")
+    os.environ["EMBED_CACHE_PATH"] = ""
+    os.environ["LOCAL_HNSW_MIN_CHUNKS"] = str(args.hnsw_min_chunks)
+
+    import langfuse
+    from google import genai
+
+    langfuse.get_client = lambda *a, **kw: FakeLangfuse()
+    FakeGenAIClient.latency_ms = args.llm_latency_ms
+    genai.Client = FakeGenAIClient
+
+    from config import settings
+    from llama_index_pipeline import catalog, embedder
+
+    catalog.meta_collection = FakeCollection()
+    embedder._embedder = embedder.MicroBatchEmbedder(
+        HashEmbeddings(latency_ms=args.embed_latency_ms),
+        model_name="hash-embeddings",
+        max_batch_size=settings.EMBED_MAX_BATCH_SIZE,
+        max_wait_ms=settings.EMBED_MAX_WAIT_MS,
+    )
+
+
+def _instrument(timer: StageTimer):
+    """
+    Time the vector store, embedder and QA stages under `timer`.
+
+    Installed once per process, so repeated runs do not stack wrappers.
+
+    Args:
+        timer (StageTimer): Collector for stage latencies.
+
+    Returns:
+        None
+    """
+    from llama_index_pipeline.embedder import get_embedder
+    from llama_index_pipeline.vector_store import get_vector_store
+    from services import pdf_service
+
+    store = get_vector_store()
+    embedder = get_embedder()
+    store.write_chunks = timer.wrap("store_write", store.write_chunks, items=lambda rows, *a, **kw: len(rows))
+    store.publish = timer.wrap("store_publish", store.publish)
+    embedder.embed_documents = timer.wrap("embed_documents", embedder.embed_documents, items=lambda texts: len(texts))
+
+    pdf_service._embed_question = timer.wrap("qa_embed", pdf_service._embed_question)
+    pdf_service._retrieve_context = timer.wrap("qa_retrieve", pdf_service._retrieve_context)
+    pdf_service._compile_prompt = timer.wrap("qa_prompt", pdf_service._compile_prompt)
+
+    llm = pdf_service.get_llm_client().aio.models
+    generate = llm.generate_content
+
+    async def timed_generate(*a, **kw):
+        began = time.perf_counter()
+        try:
+            return await generate(*a, **kw)
+        finally:
+            timer.add("qa_llm", time.perf_counter() - began)
+
+    llm.generate_content = timed_generate
+
+
+def run_ingestion(timer: StageTimer, args, project_name: str) -> dict:
+    """
+    Benchmark PDF extraction, splitting and end-to-end ingestion.
+
+    Args:
+        timer (StageTimer): Collector for stage latencies.
+        args (argparse.Namespace): Parsed command-line arguments.
+        project_name (str): Project namespace to index into.
+
+    Returns:
+        dict: Pages and chunks ingested and overall chunks per second.
+    """
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    from llama_index_pipeline import index_builder, pdf_extract
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
+    pdfs = [make_pdf(args.pages, seed=seed) for seed in range(args.pdfs)]
+
+    num_chunks = 0
+    started = time.perf_counter()
+    for index, pdf in enumerate(pdfs):
+        began = time.perf_counter()
+        pages = list(pdf_extract.iter_pdf_pages(pdf))
+        timer.add("extract", time.perf_counter() - began, items=len(pages))
+
+        began = time.perf_counter()
+        chunks = list(pdf_extract.iter_page_chunks(range(len(pages)), pages, splitter))
+        timer.add("split", time.perf_counter() - began, items=len(chunks))
+
+        began = time.perf_counter()
+        stats = index_builder.build_index_from_bytes(pdf, f"bench-{index}.pdf", project_name=project_name)
+        timer.add("ingest", time.perf_counter() - began, items=stats["num_chunks"])
+        num_chunks += stats["num_chunks"]
+    seconds = time.perf_counter() - started
+
+    return {
+        "pdfs": args.pdfs,
+        "pages": args.pdfs * args.pages,
+        "chunks": num_chunks,
+        "chunks_per_second": round(num_chunks / seconds, 2) if seconds > 0 else 0.0,
+    }
+
+
+async def run_queries(timer: StageTimer, args, project_name: str) -> dict:
+    """
+    Benchmark `answer_question` and its stages with concurrent questions.
+
+    Args:
+        timer (StageTimer): Collector for stage latencies.
+        args (argparse.Namespace): Parsed command-line arguments.
+        project_name (str): Project namespace to ask about.
+
+    Returns:
+        dict: Number of questions, concurrency and questions per second.
+    """
+    from services import pdf_service
+
+    questions = make_questions(args.questions)
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def ask(question: str):
+        async with limit:
+            began = time.perf_counter()
+            await pdf_service.answer_question(question, project_name)
+            timer.add("answer", time.perf_counter() - began)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(ask(question) for question in questions))
+    seconds = time.perf_counter() - started
+
+    return {
+        "questions": args.questions,
+        "concurrency": args.concurrency,
+        "questions_per_second": round(args.questions / seconds, 2) if seconds > 0 else 0.0,
+    }
+
+
+async def run_repeats(timer: StageTimer, args, projects: list[str]) -> list[dict]:
+    """
+    Run the benchmark once per project, in one event loop.
+
+    The QA stage semaphores bind to the first event loop that uses them, so
+    every run shares the same loop.
+
+    Args:
+        timer (StageTimer): Collector for stage latencies, reset per run.
+        args (argparse.Namespace): Parsed command-line arguments.
+        projects (list[str]): Fresh project namespace of each run.
+
+    Returns:
+        list[dict]: Ingestion, query and stage results of each run.
+    """
+    runs = []
+    for project_name in projects:
+        timer.reset()
+        run = {}
+        if not args.skip_ingestion:
+            run["ingestion"] = run_ingestion(timer, args, project_name)
+        if not args.skip_queries:
+            run["queries"] = await run_queries(timer, args, project_name)
+        run["stages"] = timer.summary()
+        runs.append(run)
+    return runs
+
+
+def _best_of(runs: list[dict]) -> dict:
+    """
+    Combine repeated runs into the best value of every metric.
+
+    Latencies take their minimum and throughputs their maximum across runs,
+    which filters out runs slowed down by unrelated load on the machine.
+
+    Args:
+        runs (list[dict]): Results of each run, with "stages" and optional
+            "ingestion" and "queries" sections.
+
+    Returns:
+        dict: Results shaped like a single run.
+    """
+    best = dict(runs[0])
+    best["stages"] = {}
+    for stage, first in runs[0]["stages"].items():
+        rows = [run["stages"][stage] for run in runs if stage in run["stages"]]
+        best["stages"][stage] = {
+            **first,
+            **{metric: min(row[metric] for row in rows) for metric in ("mean_ms", "p50_ms", "p90_ms", "p99_ms")},
+            "items_per_second": max(row["items_per_second"] for row in rows),
+        }
+    for section, metric in (("ingestion", "chunks_per_second"), ("queries", "questions_per_second")):
+        if section in best:
+            best[section] = {**best[section], metric: max(run[section][metric] for run in runs)}
+    return best
+
+
+def _drop_neo4j_project(project_name: str):
+    """
+    Delete a benchmark project's chunks, PDFs and project node from Neo4j.
+
+    Args:
+        project_name (str): Project namespace written by the benchmark.
+
+    Returns:
+        None
+    """
+    from llama_index_pipeline.index_builder import get_neo4j_driver
+
+    with get_neo4j_driver().session() as session:
+        session.run(
+            """
+            MATCH (proj:Project {name: $project_name})
+            OPTIONAL MATCH (pdf:PDF {project: $project_name})
+            OPTIONAL MATCH (pdf)-[:HAS_CHUNK]->(chunk:Chunk)
+            DETACH DELETE chunk, pdf, proj
+            """,
+            project_name=project_name,
+        ).consume()
+
+
+def _machine() -> dict:
+    """
+    Describe the machine and interpreter the benchmark ran on.
+
+    Returns:
+        dict: Platform, processor count and Python version.
+    """
+    return {"platform": platform.platform(), "cpus": os.cpu_count(), "python": platform.python_version()}
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float = 1.0) -> list[str]:
+    """
+    List regressions of `results` against a saved baseline.
+
+    A stage regresses when its p50 or p90 latency grows by more than
+    `tolerance` (a fraction of the baseline value) and by more than
+    `min_delta_ms`, so that jitter in sub-millisecond stages is not
+    reported. Ingestion and query throughput regress when they drop by more
+    than `tolerance`.
+
+    Args:
+        results (dict): Current benchmark results.
+        baseline (dict): Previously saved results.
+        tolerance (float): Allowed relative change.
+        min_delta_ms (float): Smallest latency growth reported.
+
+    Returns:
+        list[str]: Human-readable regression descriptions.
+    """
+    regressions = []
+    for stage, before in baseline.get("stages", {}).items():
+        after = results["stages"].get(stage)
+        if after is None:
+            continue
+        for metric in ("p50_ms", "p90_ms"):
+            if after[metric] > before[metric] * (1 + tolerance) and after[metric] - before[metric] > min_delta_ms:
+                regressions.append(f"{stage}.{metric}: {before[metric]} -> {after[metric]}")
+    for section, metric in (("ingestion", "chunks_per_second"), ("queries", "questions_per_second")):
+        before = baseline.get(section, {}).get(metric)
+        after = results.get(section, {}).get(metric)
+        if before and after is not None and after < before * (1 - tolerance):
+            regressions.append(f"{section}.{metric}: {before} -> {after}")
+    return regressions
+
+
+def _print_table(results: dict):
+    header = f"{'stage':<16}{'count':>8}{'items':>10}{'mean ms':>12}{'p50 ms':>12}{'p90 ms':>12}{'p99 ms':>12}{'items/s':>14}"
+    print(header)
+    print("-" * len(header))
+    for stage, row in results["stages"].items():
+        print(
+            f"{stage:<16}{row['count']:>8}{row['items']:>10}{row['mean_ms']:>12}"
+            f"{row['p50_ms']:>12}{row['p90_ms']:>12}{row['p99_ms']:>12}{row['items_per_second']:>14}"
+        )
+    for section in ("ingestion", "queries"):
+        if section in results:
+            print(f"{section}: {results[section]}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the ingestion and query paths.")
+    parser.add_argument("--pdfs", type=int, default=3, help="Number of generated PDFs to ingest.")
+    parser.add_argument("--pages", type=int, default=40, help="Pages per generated PDF.")
+    parser.add_argument("--questions", type=int, default=200, help="Number of questions to answer.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Questions in flight at once.")
+    parser.add_argument("--project", default="benchmark", help="Project namespace to index into.")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated LLM response latency.")
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="Simulated latency per embedding model call.")
+    parser.add_argument(
+        "--vector-backend",
+        choices=("local", "neo4j"),
+        default="local",
+        help="Vector store to benchmark; neo4j writes to the instance at NEO4J_URI and deletes the project afterwards.",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Runs to repeat, keeping the best value of every metric.")
+    parser.add_argument("--hnsw-min-chunks", type=int, default=20000, help="Project size from which HNSW is used.")
+    parser.add_argument("--skip-ingestion", action="store_true", help="Only benchmark queries, against an empty index.")
+    parser.add_argument("--skip-queries", action="store_true", help="Only benchmark ingestion.")
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    parser.add_argument("--save-baseline", help="Write results as the JSON baseline at this path.")
+    parser.add_argument("--baseline", help="Compare results against the JSON baseline at this path.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression against the baseline.")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Smallest stage latency growth reported as a regression.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="wizvault-bench-") as workdir:
+        _install_stand_ins(workdir, args)
+        timer = StageTimer()
+        _instrument(timer)
+        projects = [args.project] if args.repeat <= 1 else [f"{args.project}-{run}" for run in range(args.repeat)]
+        try:
+            runs = asyncio.run(run_repeats(timer, args, projects))
+        finally:
+            if args.vector_backend == "neo4j" and not args.skip_ingestion:
+                for project_name in projects:
+                    _drop_neo4j_project(project_name)
+        results = {
+            "machine": _machine(),
+            "config": {
+                key: value
+                for key, value in vars(args).items()
+                if key not in ("output", "save_baseline", "baseline", "tolerance", "min_delta_ms")
+            },
+            **_best_of(runs),
+        }
+
+    _print_table(results)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump(results, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        if baseline.get("config") != results["config"]:
+            print("Warning: baseline was recorded with different settings; numbers may not be comparable.")
+        if baseline.get("machine") != results["machine"]:
+            print("Warning: baseline was recorded on a different machine; numbers may not be comparable.")
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,14 +5,63 @@ load_dotenv()
 
 class Settings:
     MONGO_URI = os.getenv("MONGO_URI")
+    CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "30"))
     NEO4J_URI = os.getenv("NEO4J_URI")
     NEO4J_USER = os.getenv("NEO4J_USER")
     NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
+    NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+    NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "30"))
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "neo4j")
+    LOCAL_VECTOR_PATH = os.getenv("LOCAL_VECTOR_PATH", ".cache/vectors")
+    LOCAL_HNSW_MIN_CHUNKS = int(os.getenv("LOCAL_HNSW_MIN_CHUNKS", "20000"))
+    LOCAL_HNSW_M = int(os.getenv("LOCAL_HNSW_M", "16"))
+    LOCAL_HNSW_EF_CONSTRUCTION = int(os.getenv("LOCAL_HNSW_EF_CONSTRUCTION", "200"))
+    LOCAL_HNSW_EF_SEARCH = int(os.getenv("LOCAL_HNSW_EF_SEARCH", "64"))
+    LOCAL_VECTOR_DTYPE = os.getenv("LOCAL_VECTOR_DTYPE", "float32")
+    LOCAL_RERANK_CANDIDATES = int(os.getenv("LOCAL_RERANK_CANDIDATES", "50"))
+    VECTOR_OVERFETCH = int(os.getenv("VECTOR_OVERFETCH", "10"))
+    VECTOR_MAX_CANDIDATES = int(os.getenv("VECTOR_MAX_CANDIDATES", "1000"))
+    PDF_SCOPE_TOP_K = int(os.getenv("PDF_SCOPE_TOP_K", "20"))
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+    ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+    ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.97"))
+    LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "gemini-2.5-flash")
+    TOKEN_RECOUNT_QUEUE_SIZE = int(os.getenv("TOKEN_RECOUNT_QUEUE_SIZE", "1000"))
+    QA_EMBED_CONCURRENCY = int(os.getenv("QA_EMBED_CONCURRENCY", "32"))
+    QA_RETRIEVAL_CONCURRENCY = int(os.getenv("QA_RETRIEVAL_CONCURRENCY", "16"))
+    QA_PROMPT_CONCURRENCY = int(os.getenv("QA_PROMPT_CONCURRENCY", "8"))
+    QA_LLM_CONCURRENCY = int(os.getenv("QA_LLM_CONCURRENCY", "32"))
+    WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+    WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+    QA_BATCH_MAX_QUESTIONS = int(os.getenv("QA_BATCH_MAX_QUESTIONS", "500"))
+    QA_BATCH_LLM_CONCURRENCY = int(os.getenv("QA_BATCH_LLM_CONCURRENCY", "8"))
     LANGFUSE_PUBLIC_KEY = os.getenv("LANGFUSE_PUBLIC_KEY")
     LANGFUSE_SECRET_KEY = os.getenv("LANGFUSE_SECRET_KEY")
     LANGFUSE_HOST = os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
+    PROMPT_CACHE_TTL_SECONDS = float(os.getenv("PROMPT_CACHE_TTL_SECONDS", "60"))
+    PROMPT_RETRY_SECONDS = float(os.getenv("PROMPT_RETRY_SECONDS", "5"))
+    TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+    TRACE_BATCH_SIZE = int(os.getenv("TRACE_BATCH_SIZE", "100"))
+    TRACE_FLUSH_INTERVAL_SECONDS = float(os.getenv("TRACE_FLUSH_INTERVAL_SECONDS", "1.0"))
     OLLAMA_MODEL = os.getenv("OLLAMA_MODEL")
     HF_API_KEY = os.getenv("HF_API_KEY")
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+    UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", ".cache/uploads")
+    UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(200 * 1024 * 1024)))
+    UPLOAD_READ_CHUNK_BYTES = int(os.getenv("UPLOAD_READ_CHUNK_BYTES", str(1024 * 1024)))
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+    INGEST_MAX_PENDING = int(os.getenv("INGEST_MAX_PENDING", "16"))
+    INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "500"))
+    PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(os.cpu_count() or 1, 4))))
+    PDF_PAGES_PER_SHARD = int(os.getenv("PDF_PAGES_PER_SHARD", "32"))
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+    EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "BAAI/bge-small-en-v1.5")
+    EMBED_MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", "64"))
+    EMBED_MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", "5"))
+    EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", ".cache/embeddings.sqlite3")
+    EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "200000"))
+    EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+    NEO4J_WRITE_BATCH_SIZE = int(os.getenv("NEO4J_WRITE_BATCH_SIZE", "500"))
 
 settings = Settings()
@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from services.health import readiness
+
+router = APIRouter()
+
+
+@router.get("/live", tags=["Ops"])
+def live():
+    """
+    Report that the process is up and serving requests.
+
+    Returns:
+        dict: Liveness status.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/ready", tags=["Ops"])
+def ready():
+    """
+    Report whether the process is ready to take traffic.
+
+    Answers 503 until the warm-up phase has initialized every required
+    component (vector store, embedding model and LLM client).
+
+    Returns:
+        dict | JSONResponse: Readiness report.
+    """
+    is_ready, report = readiness()
+    if not is_ready:
+        return JSONResponse(status_code=503, content=report)
+    return report
@@ -1,27 +1,89 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query
-from services.pdf_service import save_and_process_pdfs, answer_question, list_available_pdfs, get_chunks_for_pdf
-from models.models import UploadResponse, AnswerResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from services.pdf_service import (
+    save_and_process_pdfs,
+    answer_question,
+    answer_question_stream,
+    answer_questions_batch,
+    list_available_pdfs,
+    get_chunks_for_pdf,
+    get_ingestion_job,
+    get_embedder_stats,
+    has_pdf,
+)
+from services.job_service import IngestQueueFullError, has_capacity
+from services.upload_spool import UploadRejectedError, UploadTooLargeError
+from config import settings
+from models.models import UploadResponse, AnswerResponse, JobStatusResponse, BatchAskRequest
 
 router = APIRouter()
 
-@router.post("/upload", response_model=UploadResponse, tags=["PDF"])
+MAX_UPLOAD_FILES = 2
+_UPLOAD_FORM = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["files"],
+                    "properties": {
+                        "files": {"type": "array", "items": {"type": "string", "format": "binary"}, "maxItems": MAX_UPLOAD_FILES},
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+@router.post("/upload", response_model=UploadResponse, tags=["PDF"], openapi_extra=_UPLOAD_FORM)
 async def upload_pdfs(
+    request: Request,
     project_name: str = Query(..., description="Project namespace for this session"),
-    files: list[UploadFile] = File(...)
 ):
     """
     Upload PDFs scoped to a unique project name.
 
+    The multipart body is parsed as it streams in, so oversized uploads are
+    refused before they are buffered. Indexing runs in the background; poll
+    `/jobs/{job_id}` for progress.
+
     Args:
+        request (Request): Multipart request with up to 2 PDFs in "files".
         project_name (str): Unique project name for session isolation.
-        files (list[UploadFile]): Uploaded PDF files.
 
     Returns:
-        dict: Confirmation message.
+        dict: Confirmation message and ingestion job ids.
+    """
+    if not has_capacity(1):
+        raise HTTPException(status_code=503, detail="Ingestion queue is full, please retry shortly.")
+    try:
+        return await save_and_process_pdfs(request, project_name=project_name, max_files=MAX_UPLOAD_FILES)
+    except UploadRejectedError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except UploadTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except IngestQueueFullError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse, tags=["PDF"])
+def get_job_status(job_id: str):
+    """
+    Report the stage progress of a background ingestion job.
+
+    Args:
+        job_id (str): Job id returned by the upload endpoint.
+
+    Returns:
+        dict: Current job status.
     """
-    if len(files) > 2:
-        raise HTTPException(status_code=400, detail="Maximum 2 PDFs allowed.")
-    return await save_and_process_pdfs(files, project_name=project_name)
+    job = get_ingestion_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
 
 @router.get("/ask", response_model=AnswerResponse, tags=["QA"])
 async def ask(
@@ -40,9 +102,70 @@ async def ask(
     Returns:
         dict: Answer and context chunks.
     """
+    if pdf_name and not await run_in_threadpool(has_pdf, project_name, pdf_name):
+        raise HTTPException(status_code=404, detail="PDF not found in project.")
     return await answer_question(q, project_name=project_name, pdf_name=pdf_name)
 
 
+@router.get("/ask/stream", tags=["QA"])
+async def ask_stream(
+    q: str = Query(..., description="User question"),
+    project_name: str = Query(..., description="Project to scope the query"),
+    pdf_name: str | None = Query(None, description="Optional PDF scope")
+):
+    """
+    Stream the answer to a question as Server-Sent Events.
+
+    Sends a "context" event with sources and chunk preview, then "token"
+    events as the answer is generated, and a final "done" event with usage.
+
+    Args:
+        q (str): Question string.
+        project_name (str): Project namespace.
+        pdf_name (str | None): Optional PDF file name.
+
+    Returns:
+        StreamingResponse: text/event-stream response.
+    """
+    if pdf_name and not await run_in_threadpool(has_pdf, project_name, pdf_name):
+        raise HTTPException(status_code=404, detail="PDF not found in project.")
+    return StreamingResponse(
+        answer_question_stream(q, project_name=project_name, pdf_name=pdf_name),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/ask/batch", tags=["QA"])
+async def ask_batch(request: BatchAskRequest):
+    """
+    Answer many questions about a project in one request.
+
+    Streams newline-delimited JSON, one line per question in completion
+    order, each carrying the question's "index" in the request.
+
+    Args:
+        request (BatchAskRequest): Questions, project and optional PDF scope.
+
+    Returns:
+        StreamingResponse: application/x-ndjson response.
+    """
+    if not request.questions:
+        raise HTTPException(status_code=400, detail="At least one question is required.")
+    if len(request.questions) > settings.QA_BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.QA_BATCH_MAX_QUESTIONS} questions per batch.",
+        )
+    if request.pdf_name and not await run_in_threadpool(has_pdf, request.project_name, request.pdf_name):
+        raise HTTPException(status_code=404, detail="PDF not found in project.")
+    return StreamingResponse(
+        answer_questions_batch(request.questions, project_name=request.project_name, pdf_name=request.pdf_name),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/pdf/list", tags=["PDF"])
 def list_pdfs(project_name: str = Query(..., description="Project namespace")):
     """
@@ -55,3 +178,14 @@ def list_pdfs(project_name: str = Query(..., description="Project namespace")):
         dict: Available PDFs.
     """
     return list_available_pdfs(project_name=project_name)
+
+
+@router.get("/embedder/stats", tags=["Ops"])
+def embedder_stats():
+    """
+    Report batch-size and queue-wait statistics of the shared embedder.
+
+    Returns:
+        dict: Embedder micro-batching statistics.
+    """
+    return get_embedder_stats()
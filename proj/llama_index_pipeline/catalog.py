@@ -0,0 +1,356 @@
+import threading
+import time
+from datetime import datetime
+from pymongo import ASCENDING, MongoClient, UpdateOne
+from pymongo.errors import OperationFailure
+
+from config import settings
+
+
+mongo_client = None
+meta_collection = None
+_indexes_ready = False
+_collection_lock = threading.Lock()
+
+STATUS_ORDER = ("queued", "extracting", "embedding", "writing", "indexed")
+
+_listings: dict[str, tuple[float, list[str]]] = {}
+_listings_lock = threading.Lock()
+
+
+def get_collection():
+    """
+    Return the uploads collection, creating the MongoDB client on first use.
+
+    The catalog indexes are created, and records from before publishes were
+    stamped are backfilled, on first use as well. If MongoDB is unreachable
+    at that point, both are retried on the next call; pymongo reconnects on
+    its own.
+
+    Returns:
+        pymongo.collection.Collection: The `pdf_metadata.uploads` collection.
+    """
+    global mongo_client, meta_collection, _indexes_ready
+    if meta_collection is None or not _indexes_ready:
+        with _collection_lock:
+            if meta_collection is None:
+                mongo_client = MongoClient(settings.MONGO_URI)
+                meta_collection = mongo_client["pdf_metadata"]["uploads"]
+            if not _indexes_ready:
+                try:
+                    _ensure_indexes(meta_collection)
+                    _backfill_indexed_at(meta_collection)
+                    _indexes_ready = True
+                except Exception:
+                    pass
+    return meta_collection
+
+
+def _ensure_indexes(collection):
+    """
+    Create the indexes backing catalog lookups.
+
+    (project, filename) identifies a record and is unique unless the
+    collection still holds duplicates from before records were upserted;
+    (sha256, status) serves deduplication and (project, indexed_at) the
+    per-project listing, and job_id finds the record of an ingestion job.
+
+    Args:
+        collection (pymongo.collection.Collection): Catalog collection.
+
+    Returns:
+        None
+    """
+    key = [("project", ASCENDING), ("filename", ASCENDING)]
+    try:
+        collection.create_index(key, unique=True, name="project_filename")
+    except OperationFailure:
+        collection.create_index(key, name="project_filename")
+    collection.create_index([("sha256", ASCENDING), ("status", ASCENDING)], name="sha256_status")
+    collection.create_index([("project", ASCENDING), ("indexed_at", ASCENDING)], name="project_indexed_at")
+    collection.create_index([("job_id", ASCENDING)], name="job_id")
+
+
+def _backfill_indexed_at(collection):
+    """
+    Stamp `indexed_at` on indexed records written before publishes were stamped.
+
+    Listings, existence checks and the answer cache's corpus version only
+    consider records with an `indexed_at`, so legacy records with status
+    "indexed" would otherwise disappear from their project. Idempotent; the
+    filter only matches records that were never stamped.
+
+    Args:
+        collection (pymongo.collection.Collection): Catalog collection.
+
+    Returns:
+        None
+    """
+    collection.update_many(
+        {"status": "indexed", "indexed_at": None},
+        {"$set": {"indexed_at": datetime.utcnow()}},
+    )
+
+
+def check_catalog():
+    """
+    Round-trip to the catalog to verify that MongoDB is reachable.
+
+    Returns:
+        None
+
+    Raises:
+        pymongo.errors.PyMongoError: If MongoDB cannot be reached.
+    """
+    get_collection().find_one({}, {"_id": 1})
+
+
+def invalidate_listing(project_name: str):
+    """
+    Drop the cached PDF listing of a project.
+
+    Args:
+        project_name (str): Project namespace.
+
+    Returns:
+        None
+    """
+    with _listings_lock:
+        _listings.pop(project_name, None)
+
+
+def list_indexed_pdfs(project_name: str) -> list[str] | None:
+    """
+    List the PDFs of a project that have a published version.
+
+    Read through a per-process cache that is refreshed after
+    CATALOG_CACHE_TTL_SECONDS and dropped whenever this process publishes
+    into the project.
+
+    Args:
+        project_name (str): Project namespace.
+
+    Returns:
+        list[str] | None: Alphabetical list of PDF filenames, or None if
+        the catalog is unreachable.
+    """
+    now = time.monotonic()
+    with _listings_lock:
+        cached = _listings.get(project_name)
+    if cached is not None and now - cached[0] < settings.CATALOG_CACHE_TTL_SECONDS:
+        return cached[1]
+    try:
+        records = get_collection().find(
+            {"project": project_name, "indexed_at": {"$ne": None}},
+            {"filename": 1, "_id": 0},
+        )
+        filenames = sorted({record["filename"] for record in records})
+    except Exception:
+        return None
+    with _listings_lock:
+        _listings[project_name] = (now, filenames)
+    return filenames
+
+
+def pdf_exists(project_name: str, filename: str) -> bool | None:
+    """
+    Check whether a PDF has a published version in a project.
+
+    Args:
+        project_name (str): Project namespace.
+        filename (str): PDF filename.
+
+    Returns:
+        bool | None: Whether the PDF is indexed, or None if the catalog is
+        unreachable.
+    """
+    filenames = list_indexed_pdfs(project_name)
+    return None if filenames is None else filename in filenames
+
+
+def find_indexed_uploads(sha256s: list[str]) -> dict[str, list[dict]]:
+    """
+    Find the indexed uploads with the given content hashes, in one query.
+
+    Args:
+        sha256s (list[str]): SHA-256 hex digests of the PDF bytes.
+
+    Returns:
+        dict[str, list[dict]]: Catalog records of the indexed uploads of
+        each hash found, in any project and under any filename. Empty if
+        the catalog is unreachable, in which case nothing is deduplicated.
+    """
+    found = {}
+    try:
+        records = get_collection().find(
+            {"sha256": {"$in": list(sha256s)}, "status": "indexed"},
+            {"page_hashes": 0, "chunks": 0},
+        )
+        for record in records:
+            found.setdefault(record["sha256"], []).append(record)
+    except Exception:
+        return {}
+    return found
+
+
+def latest_indexed_at(project_name: str) -> datetime | None:
+    """
+    Return when a PDF was last published in a project.
+
+    Serves as a corpus version shared by every process, since each publish
+    stamps `indexed_at`.
+
+    Args:
+        project_name (str): Project namespace.
+
+    Returns:
+        datetime | None: Latest `indexed_at` of the project, or None if
+        nothing was published in it yet.
+
+    Raises:
+        pymongo.errors.PyMongoError: If MongoDB cannot be reached.
+    """
+    record = get_collection().find_one(
+        {"project": project_name, "indexed_at": {"$ne": None}},
+        {"indexed_at": 1, "_id": 0},
+        sort=[("indexed_at", -1)],
+    )
+    return record["indexed_at"] if record else None
+
+
+def get_upload(project_name: str, filename: str) -> dict | None:
+    """
+    Fetch the catalog record of a PDF within a project.
+
+    Args:
+        project_name (str): Project namespace.
+        filename (str): PDF filename.
+
+    Returns:
+        dict | None: Catalog record, or None if the PDF was never uploaded or
+        the catalog is unreachable.
+    """
+    try:
+        return get_collection().find_one({"project": project_name, "filename": filename})
+    except Exception:
+        return None
+
+
+def get_upload_by_job(job_id: str) -> dict | None:
+    """
+    Fetch the catalog record of the upload an ingestion job was queued for.
+
+    Args:
+        job_id (str): Identifier of the ingestion job.
+
+    Returns:
+        dict | None: Catalog record, or None if no record carries the job id
+        (e.g. a later upload of the same filename was queued since) or the
+        catalog is unreachable.
+    """
+    try:
+        return get_collection().find_one({"job_id": job_id})
+    except Exception:
+        return None
+
+
+def record_queued(project_name: str, filenames: list[str], job_ids: list[str] | None = None):
+    """
+    Mark a batch of uploads as queued with a single bulk write.
+
+    Only the status and job id move; the hash, chunk count and provenance
+    of any published version stay in place until the new version is
+    published.
+
+    Args:
+        project_name (str): Project namespace.
+        filenames (list[str]): PDF filenames of the batch.
+        job_ids (list[str] | None): Ingestion job id of each file, recorded
+            so the job's outcome can be looked up from any process.
+
+    Returns:
+        None
+    """
+    if not filenames:
+        return
+    now = datetime.utcnow()
+    try:
+        get_collection().bulk_write(
+            [
+                UpdateOne(
+                    {"project": project_name, "filename": filename},
+                    {"$set": {"status": "queued", "error": None, "timestamp": now, "job_id": job_id}},
+                    upsert=True,
+                )
+                for filename, job_id in zip(filenames, job_ids or [None] * len(filenames))
+            ],
+            ordered=False,
+        )
+    except Exception:
+        pass
+
+
+def record_status(project_name: str, filename: str, status: str, **fields):
+    """
+    Record an ingestion stage transition of a PDF.
+
+    Args:
+        project_name (str): Project namespace.
+        filename (str): PDF filename.
+        status (str): Stage the ingestion reached, or "failed".
+        **fields: Additional fields to store (e.g. error).
+
+    Returns:
+        None
+    """
+    try:
+        get_collection().update_one(
+            {"project": project_name, "filename": filename},
+            {"$set": {"status": status, "timestamp": datetime.utcnow(), **fields}},
+            upsert=True,
+        )
+    except Exception:
+        pass
+
+
+def record_upload(project_name: str, filename: str, sha256: str | None, status: str, **fields):
+    """
+    Upsert the catalog record for a PDF within a project.
+
+    Each (project, filename) pair has a single record, so re-uploading a
+    replaced file overwrites the previous hash and chunk count. Called once
+    the new version is published, which also stamps `indexed_at` and drops
+    the project's cached listing. Unlike the stage updates, a failed write
+    is raised: the record is what makes the published version visible, so
+    the ingestion must not be reported as linked without it.
+
+    Args:
+        project_name (str): Project namespace.
+        filename (str): PDF filename.
+        sha256 (str | None): SHA-256 hex digest of the PDF bytes.
+        status (str): Catalog status, normally "indexed".
+        **fields: Additional fields to store (e.g. num_chunks, or the
+            per-page content hashes and chunk provenance of the upload).
+
+    Returns:
+        None
+
+    Raises:
+        pymongo.errors.PyMongoError: If the record could not be written.
+    """
+    now = datetime.utcnow()
+    try:
+        get_collection().update_one(
+            {"project": project_name, "filename": filename},
+            {"$set": {
+                "sha256": sha256,
+                "status": status,
+                "error": None,
+                "timestamp": now,
+                "indexed_at": now,
+                **fields,
+            }},
+            upsert=True,
+        )
+    finally:
+        invalidate_listing(project_name)
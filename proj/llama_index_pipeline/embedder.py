@@ -0,0 +1,284 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
+
+from config import settings
+from llama_index_pipeline.embedding_cache import EmbeddingCache
+from metrics import EMBEDDER_QUEUE_DEPTH
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+EMBEDDER_QUEUE_DEPTH.set_function(lambda: _embedder.queue_depth() if _embedder is not None else 0)
+
+
+class MicroBatchEmbedder(Embeddings):
+    """
+    Embedding engine that coalesces concurrent calls into micro-batches.
+
+    Query and document embedding requests from any thread are queued and a
+    single background worker runs the model on up to `max_batch_size` texts
+    at a time, waiting at most `max_wait_ms` for more requests to arrive once
+    the first one is queued. This amortizes CPU inference across concurrent
+    `/ask` and ingestion traffic. Queries have their own queue, drained
+    before document requests are added to a batch, and requests larger than
+    `max_batch_size` are split, so a question waits for at most the one
+    model call already running rather than behind a whole ingestion backlog.
+    When an `EmbeddingCache` is attached, only texts missing from the cache
+    reach the model.
+
+    Attributes:
+        model_name (str): Name of the underlying HuggingFace model.
+        max_batch_size (int): Maximum number of texts per model call.
+        max_wait_ms (float): Maximum time a request waits for batch-mates.
+    """
+
+    def __init__(self, model, model_name: str, max_batch_size: int, max_wait_ms: float, cache: EmbeddingCache | None = None):
+        self._model = model
+        self._cache = cache
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending = threading.Condition()
+        self._queries: deque = deque()
+        self._documents: deque = deque()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "batches": 0,
+            "requests": 0,
+            "query_requests": 0,
+            "texts": 0,
+            "max_batch_size": 0,
+            "total_queue_wait_ms": 0.0,
+            "max_queue_wait_ms": 0.0,
+            "total_query_wait_ms": 0.0,
+            "max_query_wait_ms": 0.0,
+        }
+        self._worker = threading.Thread(target=self._run, name="embedder", daemon=True)
+        self._worker.start()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed a list of document texts at document priority.
+
+        Args:
+            texts (list[str]): Texts to embed.
+
+        Returns:
+            list[list[float]]: One embedding per text.
+        """
+        return self._submit(list(texts), query=False)
+
+    def embed_query(self, text: str) -> list[float]:
+        """
+        Embed a single query text at query priority.
+
+        Args:
+            text (str): Query to embed.
+
+        Returns:
+            list[float]: Query embedding.
+        """
+        return self._submit([text], query=True)[0]
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed several query texts at query priority in one request.
+
+        Args:
+            texts (list[str]): Queries to embed.
+
+        Returns:
+            list[list[float]]: One embedding per query.
+        """
+        return self._submit(list(texts), query=True)
+
+    def queue_depth(self) -> int:
+        """
+        Count the requests waiting for a micro-batch.
+
+        Returns:
+            int: Queued query and document requests.
+        """
+        with self._pending:
+            return len(self._queries) + len(self._documents)
+
+    def _submit(self, texts: list[str], query: bool) -> list[list[float]]:
+        """
+        Serve texts from the cache and queue the misses for the next micro-batches.
+
+        Args:
+            texts (list[str]): Texts to embed.
+            query (bool): Whether the texts are queries, which are batched
+                ahead of documents.
+
+        Returns:
+            list[list[float]]: One embedding per text.
+        """
+        if not texts:
+            return []
+        vectors = self._cache.get_many(texts) if self._cache is not None else [None] * len(texts)
+        missing = [position for position, vector in enumerate(vectors) if vector is None]
+        if not missing:
+            return vectors
+
+        missing_texts = [texts[position] for position in missing]
+        futures = []
+        enqueued_at = time.perf_counter()
+        with self._pending:
+            for start in range(0, len(missing_texts), self.max_batch_size):
+                future = Future()
+                request = (missing_texts[start:start + self.max_batch_size], future, enqueued_at, query)
+                (self._queries if query else self._documents).append(request)
+                futures.append(future)
+            self._pending.notify()
+        computed = [vector for future in futures for vector in future.result()]
+        if self._cache is not None:
+            self._cache.put_many(missing_texts, computed)
+        for position, vector in zip(missing, computed):
+            vectors[position] = vector
+        return vectors
+
+    def _fill(self, batch: list[tuple], size: int) -> tuple[int, bool]:
+        """
+        Move queued requests into a batch, queries first, while they fit.
+
+        Must be called with `_pending` held.
+
+        Args:
+            batch (list[tuple]): Requests of the batch being collected.
+            size (int): Number of texts already in the batch.
+
+        Returns:
+            tuple[int, bool]: Number of texts in the batch, and whether it
+            is full (a queued request no longer fits).
+        """
+        for pending in (self._queries, self._documents):
+            while pending:
+                if batch and size + len(pending[0][0]) > self.max_batch_size:
+                    return size, True
+                request = pending.popleft()
+                batch.append(request)
+                size += len(request[0])
+        return size, size >= self.max_batch_size
+
+    def _collect_batch(self) -> list[tuple]:
+        """
+        Block for the next request and gather batch-mates until full or timed out.
+
+        Returns:
+            list[tuple]: Queued (texts, future, enqueued_at, query) requests.
+        """
+        with self._pending:
+            while not self._queries and not self._documents:
+                self._pending.wait()
+            batch = []
+            size, full = self._fill(batch, 0)
+            deadline = time.perf_counter() + self.max_wait_ms / 1000
+            while not full:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._pending.wait(remaining)
+                size, full = self._fill(batch, size)
+        return batch
+
+    def _run(self):
+        """
+        Worker loop that embeds queued requests batch by batch.
+
+        Returns:
+            None
+        """
+        while True:
+            batch = self._collect_batch()
+            started = time.perf_counter()
+            texts = [text for request_texts, _, _, _ in batch for text in request_texts]
+            try:
+                vectors = self._model.embed_documents(texts)
+            except Exception as exc:
+                for _, future, _, _ in batch:
+                    future.set_exception(exc)
+                continue
+
+            offset = 0
+            for request_texts, future, _, _ in batch:
+                future.set_result(vectors[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+            waits = [(started - enqueued_at) * 1000 for _, _, enqueued_at, _ in batch]
+            query_waits = [wait for wait, (_, _, _, query) in zip(waits, batch) if query]
+            with self._stats_lock:
+                self._stats["batches"] += 1
+                self._stats["requests"] += len(batch)
+                self._stats["query_requests"] += len(query_waits)
+                self._stats["texts"] += len(texts)
+                self._stats["max_batch_size"] = max(self._stats["max_batch_size"], len(texts))
+                self._stats["total_queue_wait_ms"] += sum(waits)
+                self._stats["max_queue_wait_ms"] = max(self._stats["max_queue_wait_ms"], max(waits))
+                self._stats["total_query_wait_ms"] += sum(query_waits)
+                self._stats["max_query_wait_ms"] = max([self._stats["max_query_wait_ms"], *query_waits])
+
+    def stats(self) -> dict:
+        """
+        Report batch-size and queue-wait statistics since startup.
+
+        Returns:
+            dict: Batch counts, average/max batch size and queue wait in ms,
+            overall and for queries alone.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        batches = stats["batches"] or 1
+        requests = stats["requests"] or 1
+        query_requests = stats["query_requests"] or 1
+        return {
+            "model": self.model_name,
+            "batches": stats["batches"],
+            "requests": stats["requests"],
+            "texts": stats["texts"],
+            "queue_depth": self.queue_depth(),
+            "avg_batch_size": round(stats["texts"] / batches, 2),
+            "max_batch_size": stats["max_batch_size"],
+            "avg_queue_wait_ms": round(stats["total_queue_wait_ms"] / requests, 3),
+            "max_queue_wait_ms": round(stats["max_queue_wait_ms"], 3),
+            "query_requests": stats["query_requests"],
+            "avg_query_wait_ms": round(stats["total_query_wait_ms"] / query_requests, 3),
+            "max_query_wait_ms": round(stats["max_query_wait_ms"], 3),
+            "cache": self._cache.stats() if self._cache is not None else None,
+        }
+
+
+def get_embedder() -> MicroBatchEmbedder:
+    """
+    Return the process-wide embedding engine, loading the model on first use.
+
+    The persistent embedding cache is attached unless EMBED_CACHE_PATH is empty.
+
+    Returns:
+        MicroBatchEmbedder: Shared micro-batching embedder.
+    """
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                model = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL_NAME)
+                cache = None
+                if settings.EMBED_CACHE_PATH:
+                    cache = EmbeddingCache(
+                        settings.EMBED_CACHE_PATH,
+                        model_name=settings.EMBEDDING_MODEL_NAME,
+                        max_entries=settings.EMBED_CACHE_MAX_ENTRIES,
+                    )
+                _embedder = MicroBatchEmbedder(
+                    model,
+                    model_name=settings.EMBEDDING_MODEL_NAME,
+                    max_batch_size=settings.EMBED_MAX_BATCH_SIZE,
+                    max_wait_ms=settings.EMBED_MAX_WAIT_MS,
+                    cache=cache,
+                )
+    return _embedder
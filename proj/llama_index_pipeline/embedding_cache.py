@@ -0,0 +1,159 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+
+from metrics import CACHE_LOOKUPS
+
+
+class EmbeddingCache:
+    """
+    Disk-backed, size-bounded cache of text embeddings.
+
+    Entries are keyed by the model name plus a SHA-256 of the normalized text
+    and stored as float32 blobs in SQLite. Each hit refreshes the entry's
+    last-used time; once the cache grows past `max_entries` the least recently
+    used entries are evicted.
+
+    Attributes:
+        path (str): SQLite database file.
+        model_name (str): Embedding model the cached vectors belong to.
+        max_entries (int): Maximum number of cached embeddings.
+    """
+
+    def __init__(self, path: str, model_name: str, max_entries: int):
+        self.path = path
+        self.model_name = model_name
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _key(self, text: str) -> str:
+        """
+        Build the cache key for a text under this cache's model.
+
+        Args:
+            text (str): Raw text.
+
+        Returns:
+            str: Hex digest of the model name and normalized text.
+        """
+        normalized = unicodedata.normalize("NFC", " ".join(text.split()))
+        return hashlib.sha256(f"{self.model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: list[str]) -> list[list[float] | None]:
+        """
+        Look up cached embeddings for a list of texts.
+
+        Args:
+            texts (list[str]): Texts to look up.
+
+        Returns:
+            list[list[float] | None]: Cached embedding per text, or None on a miss.
+        """
+        keys = [self._key(text) for text in texts]
+        unique_keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for offset in range(0, len(unique_keys), 500):
+                part = unique_keys[offset:offset + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", part
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+            hits = sum(1 for key in keys if key in found)
+            self._hits += hits
+            self._misses += len(keys) - hits
+        CACHE_LOOKUPS.labels("embedding", "hit").inc(hits)
+        CACHE_LOOKUPS.labels("embedding", "miss").inc(len(keys) - hits)
+
+        results = []
+        for key in keys:
+            blob = found.get(key)
+            if blob is None:
+                results.append(None)
+                continue
+            vector = array("f")
+            vector.frombytes(blob)
+            results.append(vector.tolist())
+        return results
+
+    def put_many(self, texts: list[str], vectors: list[list[float]]):
+        """
+        Store embeddings for a list of texts, evicting LRU entries if full.
+
+        Args:
+            texts (list[str]): Texts that were embedded.
+            vectors (list[list[float]]): Embedding per text.
+
+        Returns:
+            None
+        """
+        now = time.time()
+        rows = {self._key(text): array("f", vector).tobytes() for text, vector in zip(texts, vectors)}
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(key, blob, now) for key, blob in rows.items()],
+            )
+            self._size += self._conn.total_changes - before
+            if self._size > self.max_entries:
+                overflow = self._size - int(self.max_entries * 0.9)
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self._size -= overflow
+                self._evictions += overflow
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """
+        Report hit-rate counters and size of the cache.
+
+        Returns:
+            dict: Hits, misses, hit rate, entry count and evictions.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "entries": self._size,
+                "max_entries": self.max_entries,
+                "evictions": self._evictions,
+            }
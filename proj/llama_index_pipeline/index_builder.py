@@ -1,133 +1,653 @@
 import os
-from datetime import datetime
-from pymongo import MongoClient
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from neo4j import GraphDatabase, basic_auth
-import fitz
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Neo4jVector
-from langchain.docstore.document import Document
 
 from config import settings
+from llama_index_pipeline.catalog import get_upload, record_upload
+from llama_index_pipeline.embedder import get_embedder
+from llama_index_pipeline.pdf_extract import (
+    iter_page_chunks,
+    iter_pdf_pages,
+    pdf_page_hashes,
+)
+from llama_index_pipeline.vector_store import StalePublishError, get_vector_store
+from metrics import CHUNKS_INDEXED, STAGE_SECONDS, stage_timer
 
 
-embed_model = HuggingFaceEmbeddings(model_name="BAAI/bge-small-en-v1.5")
+VECTOR_INDEX_NAME = "vector"
+EMBEDDING_DIMENSIONS = 384
 
-mongo_client = MongoClient(settings.MONGO_URI)
-meta_db = mongo_client["pdf_metadata"]
-meta_collection = meta_db["uploads"]
+_driver = None
+_schema_ready = False
+_driver_lock = threading.Lock()
 
 
-def extract_text_from_pdf_bytes(file_bytes: bytes) -> str:
+def get_neo4j_driver():
     """
-    Extract text from PDF bytes using PyMuPDF (fitz).
-    
-    Reads all pages in the PDF and concatenates their text.
+    Return the process-wide Neo4j driver, creating it on first use.
+
+    The driver keeps a connection pool of up to NEO4J_MAX_POOL_SIZE
+    connections that is shared by every request and ingestion job; it is
+    closed by `close_neo4j_driver` when the application shuts down.
     
+    Returns:
+        neo4j.GraphDatabase.driver: Configured Neo4j driver.
+    """
+    global _driver
+    if _driver is None:
+        with _driver_lock:
+            if _driver is None:
+                _driver = GraphDatabase.driver(
+                    settings.NEO4J_URI,
+                    auth=basic_auth(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+                    max_connection_pool_size=settings.NEO4J_MAX_POOL_SIZE,
+                    connection_acquisition_timeout=settings.NEO4J_ACQUISITION_TIMEOUT,
+                )
+    return _driver
+
+
+def close_neo4j_driver():
+    """
+    Close the process-wide Neo4j driver and its connection pool, if open.
+
+    Returns:
+        None
+    """
+    global _driver
+    with _driver_lock:
+        if _driver is not None:
+            _driver.close()
+            _driver = None
+
+
+def _batched(items, size: int):
+    """
+    Group an iterable into lists of at most `size` items.
+
     Args:
-        file_bytes (bytes): PDF file as a byte stream.
-        
+        items (Iterable): Items to group.
+        size (int): Maximum batch size.
+
+    Yields:
+        list: The next batch.
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _timed_iter(items, pipeline: str, stage: str):
+    """
+    Time how long each item of a lazy iterable takes to produce.
+
+    Args:
+        items (Iterable): Lazy iterable, e.g. a generator.
+        pipeline (str): Pipeline name for the stage histogram.
+        stage (str): Stage name for the stage histogram.
+
+    Yields:
+        Any: The items of `items`.
+    """
+    iterator = iter(items)
+    done = object()
+    while True:
+        with stage_timer(pipeline, stage):
+            item = next(iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+def ensure_schema():
+    """
+    Create the constraints and indexes used by ingestion and retrieval.
+
+    Covers unique `Project` names, unique `PDF` names per project, unique
+    `Chunk` ids, a composite `Chunk(project, source)` index for per-PDF
+    lookups, an index on staged chunks' `upload_id` and the `Chunk.embedding`
+    vector index. `PDF` nodes linked before publishes were stamped get an
+    `indexed_at` when published chunks of their project hang off them, so
+    they stay listed; staged uploads have no such chunks yet. Statements are
+    idempotent and run once per process.
+
     Returns:
-        str: Combined text from all PDF pages.
+        None
     """
-    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-        return "\n".join([page.get_text() for page in doc])
+    global _schema_ready
+    if _schema_ready:
+        return
+    statements = [
+        "CREATE CONSTRAINT project_name IF NOT EXISTS FOR (proj:Project) REQUIRE proj.name IS UNIQUE",
+        "CREATE CONSTRAINT pdf_project_name IF NOT EXISTS FOR (pdf:PDF) REQUIRE (pdf.project, pdf.name) IS UNIQUE",
+        "CREATE CONSTRAINT chunk_id IF NOT EXISTS FOR (chunk:Chunk) REQUIRE chunk.id IS UNIQUE",
+        "CREATE INDEX chunk_project_source IF NOT EXISTS FOR (chunk:Chunk) ON (chunk.project, chunk.source)",
+        "CREATE INDEX chunk_upload_id IF NOT EXISTS FOR (chunk:Chunk) ON (chunk.upload_id)",
+        f"""
+        CREATE VECTOR INDEX {VECTOR_INDEX_NAME} IF NOT EXISTS
+        FOR (chunk:Chunk) ON (chunk.embedding)
+        OPTIONS {{indexConfig: {{
+            `vector.dimensions`: {EMBEDDING_DIMENSIONS},
+            `vector.similarity_function`: 'cosine'
+        }}}}
+        """,
+        """
+        MATCH (proj:Project)-[:HAS_PDF]->(pdf:PDF)
+        WHERE pdf.indexed_at IS NULL
+          AND EXISTS { MATCH (pdf)-[:HAS_CHUNK]->(:Chunk {project: proj.name, source: pdf.name}) }
+        SET pdf.indexed_at = datetime()
+        """,
+    ]
+    with get_neo4j_driver().session() as session:
+        for statement in statements:
+            session.run(statement).consume()
+    _schema_ready = True
 
 
-def get_neo4j_driver():
+def _write_chunk_batch(tx, rows: list[dict], filename: str, project_name: str, upload_id: str):
     """
-    Create and return a Neo4j driver instance using credentials from config.
-    
+    Write a batch of embedded chunks and their PDF/Project links in one transaction.
+
+    Chunks are written as staged: they carry the `upload_id` but no `project`
+    property, so project-scoped reads ignore them until the upload is
+    published by `_publish_upload`.
+
+    Args:
+        tx (neo4j.ManagedTransaction): Write transaction.
+        rows (list[dict]): Chunk rows with "id", "index", "text",
+            "embedding", "page", "start" and "end" keys.
+        filename (str): PDF filename the chunks belong to.
+        project_name (str): Project namespace of the chunks.
+        upload_id (str): Identifier of the ingestion run staging the chunks.
+
     Returns:
-        neo4j.GraphDatabase.driver: Configured Neo4j driver.
+        None
+    """
+    query = """
+    MERGE (proj:Project {name: $project_name})
+    MERGE (pdf:PDF {project: $project_name, name: $filename})
+    MERGE (proj)-[:HAS_PDF]->(pdf)
+    WITH pdf
+    UNWIND $rows AS row
+    CREATE (chunk:Chunk {
+        id: row.id, index: row.index, text: row.text, source: $filename, upload_id: $upload_id,
+        page: row.page, start: row.start, end: row.end
+    })
+    CREATE (pdf)-[:HAS_CHUNK]->(chunk)
+    WITH chunk, row
+    CALL db.create.setNodeVectorProperty(chunk, 'embedding', row.embedding)
+    RETURN count(*) AS written
+    """
+    tx.run(query, rows=rows, filename=filename, project_name=project_name, upload_id=upload_id).consume()
+
+
+def _write_chunks(driver, rows: list[dict], filename: str, project_name: str, upload_id: str):
+    """
+    Write embedded chunk rows to Neo4j in NEO4J_WRITE_BATCH_SIZE transactions.
+
+    Args:
+        driver (neo4j.Driver): Neo4j driver.
+        rows (list[dict]): Chunk rows with "id", "index", "text",
+            "embedding", "page", "start" and "end" keys.
+        filename (str): PDF filename the chunks belong to.
+        project_name (str): Project namespace of the chunks.
+        upload_id (str): Identifier of the ingestion run staging the chunks.
+
+    Returns:
+        None
+    """
+    with driver.session() as session:
+        for batch in _batched(rows, settings.NEO4J_WRITE_BATCH_SIZE):
+            session.execute_write(_write_chunk_batch, batch, filename, project_name, upload_id)
+
+
+def _publish_upload(
+    tx,
+    filename: str,
+    project_name: str,
+    upload_id: str,
+    sha256: str | None,
+    keep: dict[int, int] | None = None,
+    base_sha256: str | None = None,
+):
+    """
+    Atomically replace a PDF's published chunks with the chunks of an upload.
+
+    Deletes every published chunk of the PDF in the project and publishes the
+    staged chunks of `upload_id` in the same transaction, so readers see either
+    the old version or the new one, never both. With `keep`, the published
+    chunks of unchanged pages survive and are moved to their new page numbers;
+    only the chunks of changed or removed pages are deleted. The PDF node is
+    write-locked first, so concurrent publishes of the same PDF run one after
+    the other, and a publish with `keep` checks that the version it matched
+    pages against is still the published one.
+
+    Args:
+        tx (neo4j.ManagedTransaction): Write transaction.
+        filename (str): PDF filename.
+        project_name (str): Project namespace.
+        upload_id (str): Identifier of the ingestion run to publish.
+        sha256 (str | None): Content hash recorded on the PDF node.
+        keep (dict[int, int] | None): Old page number -> new page number of
+            the pages whose chunks are kept. None replaces every chunk.
+        base_sha256 (str | None): Content hash of the published version
+            `keep` was computed against.
+
+    Returns:
+        None
+
+    Raises:
+        StalePublishError: If `keep` is given and another version has been
+            published since; the transaction is rolled back.
+    """
+    record = tx.run(
+        """
+        OPTIONAL MATCH (pdf:PDF {project: $project_name, name: $filename})
+        SET pdf.publishing = $upload_id
+        RETURN CASE WHEN pdf.indexed_at IS NULL THEN null ELSE pdf.sha256 END AS sha256
+        """,
+        filename=filename,
+        project_name=project_name,
+        upload_id=upload_id,
+    ).single()
+    published = record["sha256"] if record else None
+    if keep is not None and published != base_sha256:
+        raise StalePublishError(f"{filename} was published again while it was being indexed.")
+    pages = {str(old): new for old, new in (keep or {}).items()}
+    tx.run(
+        """
+        MATCH (old:Chunk {project: $project_name, source: $filename})
+        WHERE old.page IS NULL OR NOT toString(old.page) IN keys($pages)
+        DETACH DELETE old
+        """,
+        filename=filename,
+        project_name=project_name,
+        pages=pages,
+    ).consume()
+    if pages:
+        tx.run(
+            """
+            MATCH (old:Chunk {project: $project_name, source: $filename})
+            SET old.page = $pages[toString(old.page)]
+            """,
+            filename=filename,
+            project_name=project_name,
+            pages=pages,
+        ).consume()
+    tx.run(
+        """
+        MATCH (chunk:Chunk {upload_id: $upload_id})
+        SET chunk.project = $project_name
+        REMOVE chunk.upload_id
+        WITH count(chunk) AS staged
+        MATCH (pdf:PDF {project: $project_name, name: $filename})
+        OPTIONAL MATCH (pdf)-[:HAS_CHUNK]->(chunk:Chunk {project: $project_name})
+        WITH pdf, count(chunk) AS published
+        SET pdf.sha256 = $sha256, pdf.num_chunks = published, pdf.indexed_at = datetime()
+        REMOVE pdf.publishing
+        """,
+        filename=filename,
+        project_name=project_name,
+        upload_id=upload_id,
+        sha256=sha256,
+    ).consume()
+
+
+def get_published_sha256(filename: str, project_name: str) -> str | None:
+    """
+    Read the content hash of the published version of a PDF from Neo4j.
+
+    Args:
+        filename (str): PDF filename.
+        project_name (str): Project namespace.
+
+    Returns:
+        str | None: SHA-256 of the published version, or None.
+    """
+    query = """
+    MATCH (pdf:PDF {project: $project_name, name: $filename})
+    WHERE pdf.indexed_at IS NOT NULL
+    RETURN pdf.sha256 AS sha256
+    """
+    with get_neo4j_driver().session() as session:
+        record = session.run(query, filename=filename, project_name=project_name).single()
+        return record["sha256"] if record else None
+
+
+def _discard_staged_chunks(driver, upload_id: str, filename: str, project_name: str):
+    """
+    Delete the staged chunks of an upload that failed before publishing.
+
+    The PDF node is removed as well if no chunks remain linked to it.
+
+    Args:
+        driver (neo4j.Driver): Neo4j driver.
+        upload_id (str): Identifier of the failed ingestion run.
+        filename (str): PDF filename of the upload.
+        project_name (str): Project namespace of the upload.
+
+    Returns:
+        None
+    """
+    try:
+        with driver.session() as session:
+            session.run(
+                "MATCH (chunk:Chunk {upload_id: $upload_id}) DETACH DELETE chunk",
+                upload_id=upload_id,
+            ).consume()
+            session.run(
+                """
+                MATCH (pdf:PDF {project: $project_name, name: $filename})
+                WHERE NOT (pdf)-[:HAS_CHUNK]->()
+                DETACH DELETE pdf
+                """,
+                filename=filename,
+                project_name=project_name,
+            ).consume()
+    except Exception:
+        pass
+
+
+def _throughput(num_chunks: int, started: float) -> dict:
+    """
+    Summarize ingestion throughput since `started`.
+
+    Args:
+        num_chunks (int): Number of chunks indexed.
+        started (float): `time.perf_counter()` value at the start of ingestion.
+
+    Returns:
+        dict: Number of chunks, elapsed seconds and chunks per second.
+    """
+    seconds = time.perf_counter() - started
+    return {
+        "num_chunks": num_chunks,
+        "seconds": round(seconds, 3),
+        "chunks_per_second": round(num_chunks / seconds, 2) if seconds > 0 else 0.0,
+    }
+
+
+def _reusable_pages(previous: dict | None, page_hashes: list[str], published_sha256: str | None) -> dict[int, int] | None:
+    """
+    Match the pages of a new PDF version to unchanged pages of the published one.
+
+    Pages are matched by content hash, so unchanged pages are found even
+    when pages were inserted or removed before them. Reuse is only allowed
+    when the catalog record describes the version that is actually
+    published in the vector store.
+
+    Args:
+        previous (dict | None): Catalog record of the PDF's previous upload.
+        page_hashes (list[str]): Per-page hashes of the new version.
+        published_sha256 (str | None): Hash of the published version.
+
+    Returns:
+        dict[int, int] | None: Old page number -> new page number of every
+        reusable page, or None if the previous version cannot be reused.
     """
-    return GraphDatabase.driver(
-        settings.NEO4J_URI,
-        auth=basic_auth(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
-    )
+    if (
+        previous is None
+        or not previous.get("page_hashes")
+        or previous.get("chunks") is None
+        or previous.get("sha256") is None
+        or previous["sha256"] != published_sha256
+    ):
+        return None
+    old_pages: dict[str, list[int]] = {}
+    for number, page_hash in enumerate(previous["page_hashes"]):
+        old_pages.setdefault(page_hash, []).append(number)
+    keep = {}
+    for number, page_hash in enumerate(page_hashes):
+        candidates = old_pages.get(page_hash)
+        if candidates:
+            keep[candidates.pop(0)] = number
+    return keep
 
 
-def build_index_from_bytes(file_bytes: bytes, filename: str, project_name: str = "default"):
+def build_index_from_bytes(
+    file_bytes: bytes | str,
+    filename: str,
+    project_name: str = "default",
+    progress=None,
+    sha256: str | None = None,
+    reuse: bool = True,
+) -> dict:
     """
-    Build vector index for a PDF file using its byte content.
+    Build vector index for a PDF file using its byte content or its path.
     
-    Splits the PDF into text chunks, stores metadata in MongoDB, and embeds 
-    chunks into Neo4j.
+    Streams the PDF into text chunks, embeds them in EMBED_BATCH_SIZE batches
+    and writes them to the configured vector store (for Neo4j: `Chunk` nodes,
+    `HAS_CHUNK` edges and `PDF`/`Project` links in batched transactions).
+    Writing a batch overlaps with embedding the next one, so throughput stays
+    flat as document size grows. The new chunks are staged and then swapped
+    in for any previous version of the same filename atomically. Metadata and
+    throughput are recorded in the MongoDB upload catalog once the new
+    version is published; failures are left to the caller. Given a path, the
+    PDF is read from disk page by page and never loaded into memory whole.
+
+    Pages are chunked independently and every chunk records its page and
+    character offsets. The catalog keeps a content hash per page, so when a
+    new version of an already-indexed filename arrives only its changed pages
+    are extracted, embedded and written; the chunks of unchanged pages are
+    kept (renumbered if pages moved) and those of changed or removed pages
+    are deleted on publish. If another version of the filename is published
+    while the upload is being indexed, the pages matched against the old
+    version are no longer valid: the staged chunks are dropped and the PDF is
+    indexed again in full.
     
     Args:
-        file_bytes (bytes): PDF file content as bytes.
+        file_bytes (bytes | str): PDF file content as bytes, or the path of
+            a spooled PDF file.
         filename (str): Original filename for metadata.
         project_name (str): Project namespace for chunk isolation.
+        progress (callable | None): Optional callback invoked with the name of
+            each stage ("extracting", "embedding", "writing", "linked"), the
+            running `num_chunks` count and, once the pages to extract are
+            known, `pages_done` out of `pages_total`: the changed pages whose
+            chunks are all embedded (a batch's last page may continue in the
+            next batch), reaching the total once the last batch is written.
+        sha256 (str | None): SHA-256 hex digest of the PDF, recorded in
+            the catalog for content-addressed deduplication.
+        reuse (bool): Whether the chunks of unchanged pages of the published
+            version may be kept.
         
     Returns:
-        None
+        dict: Number of chunks indexed, elapsed seconds and chunks per second.
     """
-    raw_text = extract_text_from_pdf_bytes(file_bytes)
+    report = progress or (lambda stage, **info: None)
+    started = time.perf_counter()
+    upload_id = uuid.uuid4().hex
+    num_chunks = 0
+    provenance = []
+
+    report("extracting", num_chunks=0)
     splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
-    chunks = splitter.split_text(raw_text)[:10] 
-
-    if not chunks:
-        meta_collection.insert_one({
-            "project": project_name,
-            "filename": filename,
-            "timestamp": datetime.utcnow(),
-            "num_chunks": 0,
-            "status": "failed"
-        })
-        return
 
+    embedder = get_embedder()
+    store = get_vector_store()
     try:
-        meta_collection.insert_one({
-            "project": project_name,
-            "filename": filename,
-            "timestamp": datetime.utcnow(),
-            "num_chunks": len(chunks),
-            "status": "indexed"
-        })
-    except Exception:
-        pass
+        store.prepare()
 
-    try:
-        docs = [Document(page_content=chunk, metadata={"source": filename, "project": project_name}) for chunk in chunks]
-        Neo4jVector.from_documents(
-            documents=docs,
-            embedding=embed_model,
-            url=settings.NEO4J_URI,
-            username=settings.NEO4J_USER,
-            password=settings.NEO4J_PASSWORD,
-            node_label="Chunk",
-            text_node_property="text",
-            embedding_node_property="embedding"
-        )
-        _link_chunks_to_pdf_and_project(filename, project_name)
+        with stage_timer("ingest", "page_hashes"):
+            page_hashes = pdf_page_hashes(file_bytes)
+            previous = get_upload(project_name, filename) if reuse else None
+            published_sha256 = store.published_sha256(filename, project_name)
+            keep = _reusable_pages(previous, page_hashes, published_sha256)
+        kept_pages = {} if keep is None else {new: old for old, new in keep.items()}
+        changed = [number for number in range(len(page_hashes)) if number not in kept_pages]
+        if keep is not None:
+            provenance = [
+                {**chunk, "page": keep[chunk["page"]]}
+                for chunk in previous["chunks"]
+                if chunk["page"] in keep
+            ]
+        reused_chunks = len(provenance)
+        positions = {number: index for index, number in enumerate(changed)}
+        report("extracting", num_chunks=0, pages_done=0, pages_total=len(changed))
+        chunk_stream = iter_page_chunks(changed, iter_pdf_pages(file_bytes, pages=changed), splitter)
+
+        def write(rows):
+            with stage_timer("ingest", "write"):
+                store.write_chunks(rows, filename, project_name, upload_id)
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-writer") as writer:
+            pending_write = None
+            pages_done = 0
+            for batch in _timed_iter(_batched(chunk_stream, settings.EMBED_BATCH_SIZE), "ingest", "extract_split"):
+                report("embedding", num_chunks=num_chunks, pages_done=pages_done)
+                with stage_timer("ingest", "embed"):
+                    vectors = embedder.embed_documents([chunk["text"] for chunk in batch])
+                rows = [
+                    {"id": uuid.uuid4().hex, "index": num_chunks + offset, "embedding": vector, **chunk}
+                    for offset, (chunk, vector) in enumerate(zip(batch, vectors))
+                ]
+                provenance.extend({"page": chunk["page"], "start": chunk["start"], "end": chunk["end"]} for chunk in batch)
+                num_chunks += len(rows)
+                pages_done = positions[batch[-1]["page"]]
+                if pending_write is not None:
+                    with stage_timer("ingest", "write_wait"):
+                        pending_write.result()
+                report("writing", num_chunks=num_chunks, pages_done=pages_done)
+                pending_write = writer.submit(write, rows)
+            if pending_write is not None:
+                with stage_timer("ingest", "write_wait"):
+                    pending_write.result()
+            report("writing", num_chunks=num_chunks, pages_done=len(changed))
+
+        if num_chunks or reused_chunks:
+            with stage_timer("ingest", "publish"):
+                store.publish(filename, project_name, upload_id, sha256, keep=keep, base_sha256=published_sha256)
+    except StalePublishError:
+        store.discard(upload_id, filename, project_name)
+        return build_index_from_bytes(file_bytes, filename, project_name, progress, sha256, reuse=False)
     except Exception:
-        pass
+        store.discard(upload_id, filename, project_name)
+        raise
+
+    stats = _throughput(num_chunks, started)
+    STAGE_SECONDS.labels("ingest", "total").observe(stats["seconds"])
+    CHUNKS_INDEXED.labels("embedded").inc(num_chunks)
+    CHUNKS_INDEXED.labels("reused").inc(reused_chunks)
+    stats["num_chunks"] += reused_chunks
+    stats["reused_chunks"] = reused_chunks
+    stats["changed_pages"] = len(changed)
+    if stats["num_chunks"]:
+        with stage_timer("ingest", "catalog"):
+            record_upload(
+                project_name,
+                filename,
+                sha256,
+                "indexed",
+                page_hashes=page_hashes,
+                chunks=sorted(provenance, key=lambda chunk: (chunk["page"], chunk["start"])),
+                **stats,
+            )
+        report("linked", num_chunks=stats["num_chunks"])
+    return stats
 
 
-def _link_chunks_to_pdf_and_project(filename: str, project_name: str):
+def _copy_chunk_batch(tx, source_project: str, source_filename: str, filename: str, project_name: str, upload_id: str) -> int:
     """
-    Link indexed chunks in Neo4j to their respective PDF and Project nodes.
-    
-    Ensures data relationships for future querying and retrieval.
-    
+    Stage copies of another upload's chunks, reusing their stored embeddings.
+
     Args:
-        filename (str): PDF's filename whose chunks to link.
-        project_name (str): Project name for namespace.
-        
+        tx (neo4j.ManagedTransaction): Write transaction.
+        source_project (str): Project of the already-indexed PDF.
+        source_filename (str): Filename of the already-indexed PDF.
+        filename (str): Filename to index the copies under.
+        project_name (str): Project to index the copies into.
+        upload_id (str): Identifier of the ingestion run staging the copies.
+
     Returns:
-        None
+        int: Number of chunks copied.
     """
     query = """
     MERGE (proj:Project {name: $project_name})
-    MERGE (pdf:PDF {name: $filename})
+    MERGE (pdf:PDF {project: $project_name, name: $filename})
     MERGE (proj)-[:HAS_PDF]->(pdf)
     WITH pdf
-    MATCH (chunk:Chunk)
-    WHERE chunk.source = $filename AND chunk.project = $project_name
-    MERGE (pdf)-[:HAS_CHUNK]->(chunk)
+    MATCH (src:Chunk {project: $source_project, source: $source_filename})
+    CREATE (chunk:Chunk {
+        id: randomUUID(), index: src.index, text: src.text, source: $filename, upload_id: $upload_id,
+        page: src.page, start: src.start, end: src.end
+    })
+    CREATE (pdf)-[:HAS_CHUNK]->(chunk)
+    WITH chunk, src
+    CALL db.create.setNodeVectorProperty(chunk, 'embedding', src.embedding)
+    RETURN count(*) AS copied
     """
-    with get_neo4j_driver().session() as session:
-        session.run(query, filename=filename, project_name=project_name)
+    record = tx.run(
+        query,
+        source_project=source_project,
+        source_filename=source_filename,
+        filename=filename,
+        project_name=project_name,
+        upload_id=upload_id,
+    ).single()
+    return record["copied"] if record else 0
+
+
+def copy_indexed_pdf(source_project: str, source_filename: str, filename: str, project_name: str, sha256: str, progress=None) -> dict:
+    """
+    Index a PDF whose content is already indexed elsewhere, without re-embedding.
+
+    The chunks of the existing upload are copied inside the vector store,
+    staged and published with the same atomic swap as a regular ingestion.
+    The source's page hashes and chunk provenance are carried over, so later
+    versions of the copy can be re-indexed incrementally.
+
+    Args:
+        source_project (str): Project of the already-indexed PDF.
+        source_filename (str): Filename of the already-indexed PDF.
+        filename (str): Filename to index the content under.
+        project_name (str): Project to index the content into.
+        sha256 (str): SHA-256 hex digest shared by both uploads.
+        progress (callable | None): Optional stage callback, as for
+            `build_index_from_bytes`.
+
+    Returns:
+        dict: Number of chunks indexed, elapsed seconds and chunks per second.
+    """
+    report = progress or (lambda stage, **info: None)
+    started = time.perf_counter()
+    upload_id = uuid.uuid4().hex
+
+    report("writing", num_chunks=0)
+    store = get_vector_store()
+    try:
+        store.prepare()
+        with stage_timer("ingest", "copy"):
+            num_chunks = store.copy_pdf(source_project, source_filename, filename, project_name, upload_id)
+        if num_chunks:
+            with stage_timer("ingest", "publish"):
+                store.publish(filename, project_name, upload_id, sha256)
+    except Exception:
+        store.discard(upload_id, filename, project_name)
+        raise
+
+    stats = _throughput(num_chunks, started)
+    CHUNKS_INDEXED.labels("copied").inc(num_chunks)
+    if num_chunks:
+        source = get_upload(source_project, source_filename) or {}
+        record_upload(
+            project_name,
+            filename,
+            sha256,
+            "indexed",
+            page_hashes=source.get("page_hashes"),
+            chunks=source.get("chunks"),
+            **stats,
+        )
+        report("linked", num_chunks=num_chunks)
+    return stats
 
 
 def get_chunks_from_neo4j(pdf_name: str, project_name: str = "default") -> list[str]:
@@ -142,10 +662,9 @@ def get_chunks_from_neo4j(pdf_name: str, project_name: str = "default") -> list[
         list[str]: List of text chunks for that PDF.
     """
     query = """
-    MATCH (chunk:Chunk)
-    WHERE chunk.source = $pdf_name AND chunk.project = $project_name
+    MATCH (chunk:Chunk {project: $project_name, source: $pdf_name})
     RETURN chunk.text AS text
-    ORDER BY chunk.index ASC
+    ORDER BY chunk.page ASC, chunk.index ASC
     """
     with get_neo4j_driver().session() as session:
         result = session.run(query, pdf_name=pdf_name, project_name=project_name)
@@ -155,6 +674,9 @@ def get_chunks_from_neo4j(pdf_name: str, project_name: str = "default") -> list[
 def get_available_pdfs(project_name: str = "default") -> list[str]:
     """
     List all distinct PDF filenames indexed within a given project namespace.
+
+    Answered from the `Project-[:HAS_PDF]->PDF` catalog nodes, so the cost
+    grows with the number of PDFs rather than the number of chunks.
     
     Args:
         project_name (str): Project name for filtering. Default is "default".
@@ -163,9 +685,9 @@ def get_available_pdfs(project_name: str = "default") -> list[str]:
         list[str]: Alphabetical list of unique PDF filenames for the project.
     """
     query = """
-    MATCH (chunk:Chunk)
-    WHERE chunk.project = $project_name
-    RETURN DISTINCT chunk.source AS name
+    MATCH (:Project {name: $project_name})-[:HAS_PDF]->(pdf:PDF)
+    WHERE pdf.indexed_at IS NOT NULL
+    RETURN DISTINCT pdf.name AS name
     ORDER BY name
     """
     with get_neo4j_driver().session() as session:
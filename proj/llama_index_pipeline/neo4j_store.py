@@ -0,0 +1,194 @@
+from langchain.docstore.document import Document
+
+from llama_index_pipeline.index_builder import (
+    _copy_chunk_batch,
+    _discard_staged_chunks,
+    _publish_upload,
+    _write_chunks,
+    close_neo4j_driver,
+    ensure_schema,
+    get_available_pdfs,
+    get_chunks_from_neo4j,
+    get_neo4j_driver,
+    get_published_sha256,
+)
+from llama_index_pipeline.retrieval import similarity_search, similarity_search_many
+from llama_index_pipeline.vector_store import VectorStore
+
+
+class Neo4jVectorStore(VectorStore):
+    """
+    Vector store keeping chunks as `Chunk` nodes in Neo4j.
+
+    Embeddings live on the nodes and are searched through the graph's vector
+    index, so every query is a Bolt round-trip.
+    """
+
+    def prepare(self):
+        """
+        Open the driver and create the constraints and indexes.
+
+        Returns:
+            None
+        """
+        get_neo4j_driver()
+        ensure_schema()
+
+    def close(self):
+        """
+        Close the Neo4j driver and its connection pool.
+
+        Returns:
+            None
+        """
+        close_neo4j_driver()
+
+    def write_chunks(self, rows: list[dict], filename: str, project_name: str, upload_id: str):
+        """
+        Write staged `Chunk` nodes in NEO4J_WRITE_BATCH_SIZE transactions.
+
+        Args:
+            rows (list[dict]): Chunk rows with "id", "index", "text",
+                "embedding", "page", "start" and "end" keys, in index order.
+            filename (str): PDF filename the chunks belong to.
+            project_name (str): Project namespace of the chunks.
+            upload_id (str): Identifier of the ingestion run staging the chunks.
+
+        Returns:
+            None
+        """
+        _write_chunks(get_neo4j_driver(), rows, filename, project_name, upload_id)
+
+    def copy_pdf(self, source_project: str, source_filename: str, filename: str, project_name: str, upload_id: str) -> int:
+        """
+        Stage copies of an indexed PDF's `Chunk` nodes inside the graph.
+
+        Args:
+            source_project (str): Project of the already-indexed PDF.
+            source_filename (str): Filename of the already-indexed PDF.
+            filename (str): Filename to index the copies under.
+            project_name (str): Project to index the copies into.
+            upload_id (str): Identifier of the ingestion run staging the copies.
+
+        Returns:
+            int: Number of chunks copied, 0 if the source is not indexed.
+        """
+        with get_neo4j_driver().session() as session:
+            return session.execute_write(
+                _copy_chunk_batch, source_project, source_filename, filename, project_name, upload_id
+            )
+
+    def publish(
+        self,
+        filename: str,
+        project_name: str,
+        upload_id: str,
+        sha256: str | None,
+        keep: dict[int, int] | None = None,
+        base_sha256: str | None = None,
+    ):
+        """
+        Swap an upload's staged chunks in for the PDF's published ones in one transaction.
+
+        Args:
+            filename (str): PDF filename.
+            project_name (str): Project namespace.
+            upload_id (str): Identifier of the ingestion run to publish.
+            sha256 (str | None): Content hash recorded on the PDF node.
+            keep (dict[int, int] | None): Old page number -> new page number
+                of the pages whose published chunks are kept.
+            base_sha256 (str | None): Content hash of the published version
+                `keep` was computed against.
+
+        Returns:
+            None
+
+        Raises:
+            StalePublishError: If `keep` is given and the published version
+                is no longer `base_sha256`.
+        """
+        with get_neo4j_driver().session() as session:
+            session.execute_write(_publish_upload, filename, project_name, upload_id, sha256, keep, base_sha256)
+
+    def published_sha256(self, filename: str, project_name: str) -> str | None:
+        """
+        Return the content hash recorded on the PDF node at publish time.
+
+        Args:
+            filename (str): PDF filename.
+            project_name (str): Project namespace.
+
+        Returns:
+            str | None: SHA-256 of the published version, or None.
+        """
+        return get_published_sha256(filename, project_name)
+
+    def discard(self, upload_id: str, filename: str, project_name: str):
+        """
+        Delete the staged `Chunk` nodes of a failed upload.
+
+        Args:
+            upload_id (str): Identifier of the failed ingestion run.
+            filename (str): PDF filename of the upload.
+            project_name (str): Project namespace of the upload.
+
+        Returns:
+            None
+        """
+        _discard_staged_chunks(get_neo4j_driver(), upload_id, filename, project_name)
+
+    def search(self, query_embedding: list[float], project_name: str, k: int = 5, pdf_name: str | None = None) -> list[Document]:
+        """
+        Return the top-k published chunks through the graph's vector index.
+
+        Args:
+            query_embedding (list[float]): Embedded question.
+            project_name (str): Project namespace to search.
+            k (int): Number of chunks to return.
+            pdf_name (str | None): Optional PDF filename to restrict the search to.
+
+        Returns:
+            list[Document]: Chunks ordered by similarity, with source, project
+            and score in their metadata.
+        """
+        return similarity_search(query_embedding, project_name=project_name, k=k, pdf_name=pdf_name)
+
+    def search_many(self, query_embeddings: list[list[float]], project_name: str, k: int = 5, pdf_name: str | None = None) -> list[list[Document]]:
+        """
+        Search several embedded questions in one Cypher statement.
+
+        Args:
+            query_embeddings (list[list[float]]): Embedded questions.
+            project_name (str): Project namespace to search.
+            k (int): Number of chunks to return per question.
+            pdf_name (str | None): Optional PDF filename to restrict the search to.
+
+        Returns:
+            list[list[Document]]: Chunks per question, in question order.
+        """
+        return similarity_search_many(query_embeddings, project_name=project_name, k=k, pdf_name=pdf_name)
+
+    def get_chunks(self, pdf_name: str, project_name: str) -> list[str]:
+        """
+        Return the published chunk texts of a PDF in document order.
+
+        Args:
+            pdf_name (str): PDF file name.
+            project_name (str): Project namespace.
+
+        Returns:
+            list[str]: Text chunks of the PDF.
+        """
+        return get_chunks_from_neo4j(pdf_name, project_name=project_name)
+
+    def list_pdfs(self, project_name: str) -> list[str]:
+        """
+        List the published PDF nodes of a project.
+
+        Args:
+            project_name (str): Project namespace.
+
+        Returns:
+            list[str]: Alphabetical list of PDF filenames.
+        """
+        return get_available_pdfs(project_name=project_name)
@@ -0,0 +1,264 @@
+import hashlib
+import multiprocessing
+import re
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz
+
+from config import settings
+
+
+_REFERENCE = re.compile(r"(\d+) \d+ R\b")
+
+_extract_pool = None
+_extract_pool_lock = threading.Lock()
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared process pool used for sharded page extraction.
+
+    The pool is created lazily with the "spawn" start method so workers never
+    inherit model weights or client sockets from the API process.
+
+    Returns:
+        ProcessPoolExecutor: Process pool for page-range extraction.
+    """
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            _extract_pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _extract_pool
+
+
+def _open_pdf(source: bytes | str) -> fitz.Document:
+    """
+    Open a PDF from bytes or from a file path.
+
+    Opening by path lets MuPDF read pages from disk on demand instead of
+    holding the whole document in memory.
+
+    Args:
+        source (bytes | str): PDF file content, or the path of a PDF file.
+
+    Returns:
+        fitz.Document: Open document.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source, filetype="pdf")
+
+
+def _extract_pages(source: bytes | str, numbers: list[int]) -> list[str]:
+    """
+    Extract the text of the given pages from a PDF.
+
+    Runs inside an extraction worker process; each shard opens its own handle.
+
+    Args:
+        source (bytes | str): PDF file content, or the path of a PDF file.
+        numbers (list[int]): Zero-based page numbers.
+
+    Returns:
+        list[str]: Text of each page, in the order of `numbers`.
+    """
+    with _open_pdf(source) as doc:
+        return [doc[number].get_text() for number in numbers]
+
+
+def count_pdf_pages(source: bytes | str) -> int:
+    """
+    Count the pages of a PDF without extracting any text.
+
+    Args:
+        source (bytes | str): PDF file content, or the path of a PDF file.
+
+    Returns:
+        int: Number of pages in the document.
+    """
+    with _open_pdf(source) as doc:
+        return doc.page_count
+
+
+def _object_digest(doc: fitz.Document, xref: int, digests: dict[int, bytes]) -> bytes:
+    """
+    Hash a PDF object together with every object it references, recursively.
+
+    Object numbers are left out of the hash so the digest only depends on
+    content: a page keeps its hash when a rewrite of the file renumbers its
+    objects. Digests are memoized in `digests`, so fonts and images shared by
+    many pages are hashed once per document; reference cycles hash the
+    revisited object as a fixed marker.
+
+    Args:
+        doc (fitz.Document): Open document.
+        xref (int): Object number to hash.
+        digests (dict[int, bytes]): Memoized digests, per object number.
+
+    Returns:
+        bytes: SHA-256 digest of the object and the objects it references.
+    """
+    if xref in digests:
+        return digests[xref]
+    if not 0 < xref < doc.xref_length():
+        return b"missing"
+    digests[xref] = b"cycle"
+    definition = doc.xref_object(xref, compressed=True)
+    digest = hashlib.sha256(_REFERENCE.sub("R", definition).encode("latin-1", "replace"))
+    if doc.xref_is_stream(xref):
+        digest.update(doc.xref_stream_raw(xref) or b"")
+    for match in _REFERENCE.finditer(definition):
+        digest.update(_object_digest(doc, int(match.group(1)), digests))
+    digests[xref] = digest.digest()
+    return digests[xref]
+
+
+def _page_resources(doc: fitz.Document, page: fitz.Page) -> tuple[str, str]:
+    """
+    Return the resource dictionary of a page, following inheritance from the page tree.
+
+    Args:
+        doc (fitz.Document): Open document.
+        page (fitz.Page): Page to look up.
+
+    Returns:
+        tuple[str, str]: Kind ("xref", "dict" or "null") and value of the
+        page's /Resources entry, as returned by `Document.xref_get_key`.
+    """
+    xref = page.xref
+    while xref:
+        kind, value = doc.xref_get_key(xref, "Resources")
+        if kind != "null":
+            return kind, value
+        kind, parent = doc.xref_get_key(xref, "Parent")
+        xref = int(parent.split()[0]) if kind == "xref" else 0
+    return "null", "null"
+
+
+def pdf_page_hashes(source: bytes | str) -> list[str]:
+    """
+    Hash what every PDF page draws, without extracting text.
+
+    Each hash covers the page's size, its content stream and its resources,
+    i.e. the fonts, images and form XObjects the content stream paints, each
+    with the objects it references in turn. Pages that only paint a form
+    XObject (as produced by imposition or `show_pdf_page`) therefore differ
+    by the form they paint. A page whose hash is unchanged between two
+    versions of a document draws the same content, so its text and chunks
+    can be reused.
+
+    Args:
+        source (bytes | str): PDF file content, or the path of a PDF file.
+
+    Returns:
+        list[str]: SHA-256 hex digest per page, in page order.
+    """
+    hashes = []
+    digests: dict[int, bytes] = {}
+    with _open_pdf(source) as doc:
+        for page in doc:
+            digest = hashlib.sha256(repr(tuple(page.rect)).encode("ascii"))
+            digest.update(page.read_contents())
+            kind, value = _page_resources(doc, page)
+            if kind == "xref":
+                digest.update(_object_digest(doc, int(value.split()[0]), digests))
+            else:
+                digest.update(_REFERENCE.sub("R", value).encode("latin-1", "replace"))
+                for match in _REFERENCE.finditer(value):
+                    digest.update(_object_digest(doc, int(match.group(1)), digests))
+            hashes.append(digest.hexdigest())
+    return hashes
+
+
+def iter_pdf_pages(source: bytes | str, parallel: bool | None = None, pages: list[int] | None = None) -> Iterator[str]:
+    """
+    Yield the text of each PDF page in order as soon as it is available.
+
+    Small documents are read serially. Large documents are split into page
+    ranges that are extracted on a process pool; shards are submitted through
+    a bounded window so only a few pages are held in memory at once, and
+    consumers can start working on the first pages while later shards are
+    still being extracted. Passing a file path keeps the document on disk and
+    only ships the path to the extraction workers.
+
+    Args:
+        source (bytes | str): PDF file content, or the path of a PDF file.
+        parallel (bool | None): Force sharded (True) or serial (False)
+            extraction. Defaults to sharding when at least
+            PDF_PARALLEL_MIN_PAGES pages are extracted.
+        pages (list[int] | None): Zero-based page numbers to extract, in
+            the order to yield them. Defaults to every page.
+
+    Yields:
+        str: Text of the next page.
+    """
+    numbers = list(range(count_pdf_pages(source))) if pages is None else list(pages)
+    if parallel is None:
+        parallel = len(numbers) >= settings.PDF_PARALLEL_MIN_PAGES
+    if not parallel or settings.PDF_EXTRACT_WORKERS <= 1:
+        with _open_pdf(source) as doc:
+            for number in numbers:
+                yield doc[number].get_text()
+        return
+
+    shard_size = settings.PDF_PAGES_PER_SHARD
+    shards = deque(numbers[start:start + shard_size] for start in range(0, len(numbers), shard_size))
+    pool = _get_extract_pool()
+    in_flight = deque()
+    try:
+        while shards or in_flight:
+            while shards and len(in_flight) < settings.PDF_EXTRACT_WORKERS * 2:
+                in_flight.append(pool.submit(_extract_pages, source, shards.popleft()))
+            yield from in_flight.popleft().result()
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def iter_page_chunks(numbers: Iterable[int], pages: Iterable[str], splitter) -> Iterator[dict]:
+    """
+    Split each page into chunks on its own and record where every chunk came from.
+
+    Chunks never span pages, so the chunks of a page depend only on that
+    page's text and can be reused while the page is unchanged.
+
+    Args:
+        numbers (Iterable[int]): Zero-based page number of each page text.
+        pages (Iterable[str]): Page texts, in the order of `numbers`.
+        splitter: LangChain text splitter used to produce chunks.
+
+    Yields:
+        dict: Chunk "text" with its "page" and the "start"/"end" character
+        offsets of the chunk within the page text.
+    """
+    for number, page_text in zip(numbers, pages):
+        cursor = 0
+        for piece in splitter.split_text(page_text):
+            start = page_text.find(piece, cursor)
+            if start < 0:
+                start = max(page_text.find(piece), 0)
+            cursor = start + 1
+            yield {"text": piece, "page": number, "start": start, "end": start + len(piece)}
+
+
+def extract_text_from_pdf_bytes(file_bytes: bytes | str, parallel: bool | None = None) -> str:
+    """
+    Extract text from PDF bytes using PyMuPDF (fitz).
+
+    Reads all pages in the PDF and concatenates their text.
+
+    Args:
+        file_bytes (bytes | str): PDF file as a byte stream, or its path.
+        parallel (bool | None): Force or disable page-range sharding on the
+            extraction process pool. Defaults to automatic.
+
+    Returns:
+        str: Combined text from all PDF pages.
+    """
+    return "\n".join(iter_pdf_pages(file_bytes, parallel=parallel))
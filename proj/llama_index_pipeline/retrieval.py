@@ -0,0 +1,278 @@
+import threading
+import time
+
+from langchain.docstore.document import Document
+
+from config import settings
+from llama_index_pipeline.index_builder import VECTOR_INDEX_NAME, get_neo4j_driver
+
+
+_overfetch_hints: dict[tuple, int] = {}
+_scope_sizes: dict[tuple, tuple[float, int | None]] = {}
+_overfetch_lock = threading.Lock()
+
+
+def _ann_search(session, query_embedding: list[float], candidates: int, k: int, project_name: str, pdf_name: str | None) -> tuple[list, int]:
+    """
+    Query the vector index for `candidates` nodes and keep the tenant's top-k.
+
+    Args:
+        session (neo4j.Session): Open Neo4j session.
+        query_embedding (list[float]): Embedded question.
+        candidates (int): Number of nearest neighbours to fetch from the index.
+        k (int): Number of results to return.
+        project_name (str): Project namespace to filter on.
+        pdf_name (str | None): Optional PDF filename to filter on.
+
+    Returns:
+        tuple[list[dict], int]: Hits with text, source and score, and the
+        number of candidates that belonged to the tenant.
+    """
+    query = """
+    CALL db.index.vector.queryNodes($index_name, $candidates, $embedding)
+    YIELD node, score
+    WHERE node.project = $project_name AND ($pdf_name IS NULL OR node.source = $pdf_name)
+    WITH node, score
+    ORDER BY score DESC
+    WITH collect({text: node.text, source: node.source, score: score}) AS hits
+    RETURN hits[..$k] AS hits, size(hits) AS matched
+    """
+    record = session.run(
+        query,
+        index_name=VECTOR_INDEX_NAME,
+        candidates=candidates,
+        embedding=query_embedding,
+        project_name=project_name,
+        pdf_name=pdf_name,
+        k=k,
+    ).single()
+    return (record["hits"], record["matched"]) if record else ([], 0)
+
+
+def _exact_search(session, query_embedding: list[float], k: int, project_name: str, pdf_name: str | None) -> list:
+    """
+    Score every chunk of the tenant exactly and return the top-k.
+
+    Used directly for scopes small enough to scan, and when over-fetching
+    from the global index cannot fill k results, typically because the
+    tenant holds a small share of all chunks.
+
+    Args:
+        session (neo4j.Session): Open Neo4j session.
+        query_embedding (list[float]): Embedded question.
+        k (int): Number of results to return.
+        project_name (str): Project namespace to filter on.
+        pdf_name (str | None): Optional PDF filename to filter on.
+
+    Returns:
+        list[neo4j.Record]: Records with text, source and score.
+    """
+    query = """
+    MATCH (node:Chunk {project: $project_name})
+    WHERE $pdf_name IS NULL OR node.source = $pdf_name
+    WITH node, vector.similarity.cosine(node.embedding, $embedding) AS score
+    RETURN node.text AS text, node.source AS source, score
+    ORDER BY score DESC
+    LIMIT $k
+    """
+    return list(session.run(
+        query,
+        embedding=query_embedding,
+        project_name=project_name,
+        pdf_name=pdf_name,
+        k=k,
+    ))
+
+
+def _scope_size(session, project_name: str, pdf_name: str | None) -> int | None:
+    """
+    Return the number of published chunks in a scope, from the PDF nodes' `num_chunks`.
+
+    Sizes are cached per scope for CATALOG_CACHE_TTL_SECONDS. A stale size
+    only picks the slower of two exact strategies, never wrong results.
+
+    Args:
+        session (neo4j.Session): Open Neo4j session.
+        project_name (str): Project namespace.
+        pdf_name (str | None): Optional PDF filename.
+
+    Returns:
+        int | None: Number of chunks, or None if the scope has no published
+        PDF node to count from (e.g. chunks indexed before PDF nodes were
+        scoped by project).
+    """
+    scope = (project_name, pdf_name)
+    now = time.monotonic()
+    with _overfetch_lock:
+        cached = _scope_sizes.get(scope)
+    if cached is not None and now - cached[0] < settings.CATALOG_CACHE_TTL_SECONDS:
+        return cached[1]
+    query = """
+    MATCH (pdf:PDF {project: $project_name})
+    WHERE pdf.num_chunks IS NOT NULL AND ($pdf_name IS NULL OR pdf.name = $pdf_name)
+    RETURN count(pdf) AS pdfs, sum(pdf.num_chunks) AS size
+    """
+    record = session.run(query, project_name=project_name, pdf_name=pdf_name).single()
+    size = record["size"] if record and record["pdfs"] else None
+    with _overfetch_lock:
+        _scope_sizes[scope] = (now, size)
+    return size
+
+
+def _is_small(size: int | None, k: int) -> bool:
+    """
+    Decide whether a scope is scanned exactly instead of through the vector index.
+
+    A scope of at most VECTOR_MAX_CANDIDATES chunks costs no more to score
+    exactly than the largest index query, and one of at most k chunks can
+    never be filled from the index.
+
+    Args:
+        size (int | None): Number of chunks in the scope, None if unknown.
+        k (int): Number of results requested.
+
+    Returns:
+        bool: True if the scope should be scanned exactly.
+    """
+    return size is not None and size <= max(k, settings.VECTOR_MAX_CANDIDATES)
+
+
+def _to_documents(hits, project_name: str) -> list[Document]:
+    """
+    Convert search hits to LangChain documents.
+
+    Args:
+        hits (Iterable): Hits or records with text, source and score.
+        project_name (str): Project namespace of the hits.
+
+    Returns:
+        list[Document]: Chunks with source, project and score in their metadata.
+    """
+    return [
+        Document(
+            page_content=hit["text"],
+            metadata={"source": hit["source"], "project": project_name, "score": hit["score"]},
+        )
+        for hit in hits
+    ]
+
+
+def similarity_search(query_embedding: list[float], project_name: str, k: int = 5, pdf_name: str | None = None) -> list[Document]:
+    """
+    Return the true top-k chunks of a project (and optionally a PDF).
+
+    The project/PDF filter runs inside Neo4j. Scopes small enough to scan
+    (typically a single PDF) are scored exactly in one query. Larger scopes
+    query the vector index with an over-fetch factor that doubles until k
+    tenant chunks are found or VECTOR_MAX_CANDIDATES is reached, after which
+    an exact filtered scan is used. The factor that worked is remembered per
+    scope as the starting point for the next query, and only relaxed when
+    the tenant matched at least 4k candidates, so that half the factor is
+    still expected to fill k with room to spare and the hint does not
+    oscillate.
+
+    Args:
+        query_embedding (list[float]): Embedded question.
+        project_name (str): Project namespace to search.
+        k (int): Number of chunks to return.
+        pdf_name (str | None): Optional PDF filename to restrict the search to.
+
+    Returns:
+        list[Document]: Chunks ordered by similarity, with source, project and
+        score in their metadata.
+    """
+    scope = (project_name, pdf_name)
+    with get_neo4j_driver().session() as session:
+        if _is_small(_scope_size(session, project_name, pdf_name), k):
+            return _to_documents(_exact_search(session, query_embedding, k, project_name, pdf_name), project_name)
+
+        with _overfetch_lock:
+            overfetch = _overfetch_hints.get(scope, settings.VECTOR_OVERFETCH)
+        while True:
+            candidates = min(k * overfetch, settings.VECTOR_MAX_CANDIDATES)
+            hits, matched = _ann_search(session, query_embedding, candidates, k, project_name, pdf_name)
+            if len(hits) >= k or candidates >= settings.VECTOR_MAX_CANDIDATES:
+                break
+            overfetch *= 2
+        if len(hits) < k:
+            hits = _exact_search(session, query_embedding, k, project_name, pdf_name)
+
+    if matched >= 4 * k:
+        overfetch = max(overfetch // 2, settings.VECTOR_OVERFETCH)
+    with _overfetch_lock:
+        _overfetch_hints[scope] = overfetch
+
+    return _to_documents(hits, project_name)
+
+
+def similarity_search_many(query_embeddings: list[list[float]], project_name: str, k: int = 5, pdf_name: str | None = None) -> list[list[Document]]:
+    """
+    Return the top-k chunks of several questions with a single Cypher query.
+
+    All questions are UNWIND-ed into one statement that scores small scopes
+    exactly and otherwise queries the vector index with the scope's current
+    over-fetch factor. Questions for which the index did not yield k tenant
+    chunks fall back to `similarity_search`.
+
+    Args:
+        query_embeddings (list[list[float]]): Embedded questions.
+        project_name (str): Project namespace to search.
+        k (int): Number of chunks to return per question.
+        pdf_name (str | None): Optional PDF filename to restrict the search to.
+
+    Returns:
+        list[list[Document]]: Chunks per question, in question order.
+    """
+    if not query_embeddings:
+        return []
+    with _overfetch_lock:
+        overfetch = _overfetch_hints.get((project_name, pdf_name), settings.VECTOR_OVERFETCH)
+
+    exact_query = """
+    UNWIND range(0, size($embeddings) - 1) AS position
+    CALL {
+        WITH position
+        MATCH (node:Chunk {project: $project_name})
+        WHERE $pdf_name IS NULL OR node.source = $pdf_name
+        WITH node, vector.similarity.cosine(node.embedding, $embeddings[position]) AS score
+        RETURN node.text AS text, node.source AS source, score
+        ORDER BY score DESC
+        LIMIT $k
+    }
+    RETURN position, collect({text: text, source: source, score: score}) AS hits
+    """
+    ann_query = """
+    UNWIND range(0, size($embeddings) - 1) AS position
+    CALL {
+        WITH position
+        CALL db.index.vector.queryNodes($index_name, $candidates, $embeddings[position])
+        YIELD node, score
+        WHERE node.project = $project_name AND ($pdf_name IS NULL OR node.source = $pdf_name)
+        RETURN node.text AS text, node.source AS source, score
+        ORDER BY score DESC
+        LIMIT $k
+    }
+    RETURN position, collect({text: text, source: source, score: score}) AS hits
+    """
+    results = [[] for _ in query_embeddings]
+    with get_neo4j_driver().session() as session:
+        small = _is_small(_scope_size(session, project_name, pdf_name), k)
+        for record in session.run(
+            exact_query if small else ann_query,
+            index_name=VECTOR_INDEX_NAME,
+            candidates=min(k * overfetch, settings.VECTOR_MAX_CANDIDATES),
+            embeddings=query_embeddings,
+            project_name=project_name,
+            pdf_name=pdf_name,
+            k=k,
+        ):
+            results[record["position"]] = _to_documents(
+                sorted(record["hits"], key=lambda hit: hit["score"], reverse=True), project_name
+            )
+    if small:
+        return results
+
+    for position, docs in enumerate(results):
+        if len(docs) < k:
+            results[position] = similarity_search(query_embeddings[position], project_name, k=k, pdf_name=pdf_name)
+    return results
@@ -0,0 +1,251 @@
+import threading
+
+from langchain.docstore.document import Document
+
+from config import settings
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class StalePublishError(Exception):
+    """
+    Raised when a publish that keeps chunks finds another version published since its ingestion started.
+    """
+
+
+class VectorStore:
+    """
+    Storage backend for embedded chunks and their similarity search.
+
+    Ingestion stages the chunks of an upload under an `upload_id` with
+    `write_chunks` and then swaps them in for the PDF's previous version with
+    `publish`, or drops them with `discard` on failure. Readers only ever see
+    published chunks. Chunks carry their provenance (page and character
+    offsets within the page), which lets `publish` keep the chunks of
+    unchanged pages when a new version of a PDF is indexed.
+    """
+
+    def prepare(self):
+        """
+        Create whatever schema or directories the backend needs.
+
+        Returns:
+            None
+        """
+
+    def close(self):
+        """
+        Release connections or file handles held by the backend.
+
+        Returns:
+            None
+        """
+
+    def write_chunks(self, rows: list[dict], filename: str, project_name: str, upload_id: str):
+        """
+        Stage a batch of embedded chunks of an upload.
+
+        Args:
+            rows (list[dict]): Chunk rows with "id", "index", "text",
+                "embedding", "page", "start" and "end" keys, in index order.
+            filename (str): PDF filename the chunks belong to.
+            project_name (str): Project namespace of the chunks.
+            upload_id (str): Identifier of the ingestion run staging the chunks.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError
+
+    def copy_pdf(self, source_project: str, source_filename: str, filename: str, project_name: str, upload_id: str) -> int:
+        """
+        Stage copies of an indexed PDF's chunks, reusing their embeddings.
+
+        Args:
+            source_project (str): Project of the already-indexed PDF.
+            source_filename (str): Filename of the already-indexed PDF.
+            filename (str): Filename to index the copies under.
+            project_name (str): Project to index the copies into.
+            upload_id (str): Identifier of the ingestion run staging the copies.
+
+        Returns:
+            int: Number of chunks copied, 0 if the source is not indexed.
+        """
+        raise NotImplementedError
+
+    def publish(
+        self,
+        filename: str,
+        project_name: str,
+        upload_id: str,
+        sha256: str | None,
+        keep: dict[int, int] | None = None,
+        base_sha256: str | None = None,
+    ):
+        """
+        Atomically replace a PDF's published chunks with the staged chunks of an upload.
+
+        With `keep`, the published version is compared with `base_sha256`
+        in the same atomic step, so a version published by an overlapping
+        ingestion is never merged with pages matched against another one.
+
+        Args:
+            filename (str): PDF filename.
+            project_name (str): Project namespace.
+            upload_id (str): Identifier of the ingestion run to publish.
+            sha256 (str | None): Content hash of the PDF.
+            keep (dict[int, int] | None): Old page number -> new page number
+                of unchanged pages whose published chunks are kept (and
+                renumbered) alongside the staged ones. Chunks of any other
+                page are deleted. None replaces every chunk.
+            base_sha256 (str | None): Content hash of the published version
+                `keep` was computed against.
+
+        Returns:
+            None
+
+        Raises:
+            StalePublishError: If `keep` is given and the published version
+                is no longer `base_sha256`; nothing is published then.
+        """
+        raise NotImplementedError
+
+    def published_sha256(self, filename: str, project_name: str) -> str | None:
+        """
+        Return the content hash of the currently published version of a PDF.
+
+        Args:
+            filename (str): PDF filename.
+            project_name (str): Project namespace.
+
+        Returns:
+            str | None: SHA-256 recorded at publish time, or None if the PDF
+            has no published version.
+        """
+        raise NotImplementedError
+
+    def discard(self, upload_id: str, filename: str, project_name: str):
+        """
+        Drop the staged chunks of an upload that failed before publishing.
+
+        Args:
+            upload_id (str): Identifier of the failed ingestion run.
+            filename (str): PDF filename of the upload.
+            project_name (str): Project namespace of the upload.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError
+
+    def search(self, query_embedding: list[float], project_name: str, k: int = 5, pdf_name: str | None = None) -> list[Document]:
+        """
+        Return the top-k published chunks of a project (and optionally a PDF).
+
+        Args:
+            query_embedding (list[float]): Embedded question.
+            project_name (str): Project namespace to search.
+            k (int): Number of chunks to return.
+            pdf_name (str | None): Optional PDF filename to restrict the search to.
+
+        Returns:
+            list[Document]: Chunks ordered by similarity, with source, project
+            and score in their metadata.
+        """
+        raise NotImplementedError
+
+    def search_many(self, query_embeddings: list[list[float]], project_name: str, k: int = 5, pdf_name: str | None = None) -> list[list[Document]]:
+        """
+        Run `search` for several embedded questions at once.
+
+        Backends override this to answer the whole batch in one round-trip;
+        the default searches the questions one by one.
+
+        Args:
+            query_embeddings (list[list[float]]): Embedded questions.
+            project_name (str): Project namespace to search.
+            k (int): Number of chunks to return per question.
+            pdf_name (str | None): Optional PDF filename to restrict the search to.
+
+        Returns:
+            list[list[Document]]: Chunks per question, in question order.
+        """
+        return [self.search(query_embedding, project_name, k=k, pdf_name=pdf_name) for query_embedding in query_embeddings]
+
+    def get_chunks(self, pdf_name: str, project_name: str) -> list[str]:
+        """
+        Return the published text chunks of a PDF in document order.
+
+        Args:
+            pdf_name (str): PDF file name.
+            project_name (str): Project namespace.
+
+        Returns:
+            list[str]: Text chunks of the PDF.
+        """
+        raise NotImplementedError
+
+    def list_pdfs(self, project_name: str) -> list[str]:
+        """
+        List the PDFs with published chunks in a project.
+
+        Args:
+            project_name (str): Project namespace.
+
+        Returns:
+            list[str]: Alphabetical list of PDF filenames.
+        """
+        raise NotImplementedError
+
+
+def get_vector_store() -> VectorStore:
+    """
+    Return the process-wide vector store selected by VECTOR_BACKEND.
+
+    "neo4j" (the default) stores chunks in the graph and searches its vector
+    index; "local" keeps memory-mapped per-project indexes on disk under
+    LOCAL_VECTOR_PATH and needs no database. LOCAL_VECTOR_DTYPE="int8"
+    makes the local backend map and scan int8 vectors only and rerank its
+    best LOCAL_RERANK_CANDIDATES candidates with float32 rows read from
+    disk; Neo4j always stores and searches float32 embeddings.
+
+    Returns:
+        VectorStore: Shared vector store.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                backend = settings.VECTOR_BACKEND
+                if backend == "neo4j":
+                    from llama_index_pipeline.neo4j_store import Neo4jVectorStore
+
+                    _store = Neo4jVectorStore()
+                elif backend == "local":
+                    from llama_index_pipeline.local_store import LocalVectorStore
+
+                    _store = LocalVectorStore(
+                        settings.LOCAL_VECTOR_PATH,
+                        hnsw_min_chunks=settings.LOCAL_HNSW_MIN_CHUNKS,
+                        hnsw_m=settings.LOCAL_HNSW_M,
+                        hnsw_ef_construction=settings.LOCAL_HNSW_EF_CONSTRUCTION,
+                        hnsw_ef_search=settings.LOCAL_HNSW_EF_SEARCH,
+                        dtype=settings.LOCAL_VECTOR_DTYPE,
+                        rerank_candidates=settings.LOCAL_RERANK_CANDIDATES,
+                    )
+                else:
+                    raise ValueError(f"Unknown VECTOR_BACKEND: {backend!r}")
+    return _store
+
+
+def close_vector_store():
+    """
+    Close the process-wide vector store if it was ever created.
+
+    Returns:
+        None
+    """
+    if _store is not None:
+        _store.close()
@@ -1,19 +1,56 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from prometheus_client import make_asgi_app
+from config import settings
+from controllers.health_controller import router as health_router
 from controllers.pdf_controller import router as pdf_router
+from llama_index_pipeline.vector_store import close_vector_store
+from services.clients import close_clients
+from services.health import warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Manage process-wide clients for the lifetime of the application.
+
+    Importing the app creates no clients: the vector store, embedding model,
+    Gemini, Langfuse and MongoDB clients are all created on first use. With
+    WARMUP_ON_STARTUP, they are initialized in parallel in the background
+    right after startup, while `/health/live` already answers and
+    `/health/ready` reports 503 until the required ones are up. The vector
+    store and Langfuse buffers are closed and flushed on shutdown.
+
+    Args:
+        app (FastAPI): The application instance.
+    """
+    warmup = asyncio.create_task(warm_up()) if settings.WARMUP_ON_STARTUP else None
+    yield
+    if warmup is not None:
+        warmup.cancel()
+    close_vector_store()
+    close_clients()
+
 
-app = FastAPI(title="PDF Uploader App")
+app = FastAPI(title="PDF Uploader App", lifespan=lifespan)
 """
 FastAPI application instance for the PDF Uploader Service.
 
 This app includes the PDF API router under the "/pdf" prefix, which provides
 endpoints for uploading PDFs, querying questions, listing PDFs, and retrieving
-PDF text chunks.
+PDF text chunks, liveness and readiness probes under "/health", and serves
+Prometheus metrics under "/metrics".
 
 Attributes:
     title (str): The title of the FastAPI application, shown in OpenAPI docs.
 
 Routers:
     pdf_router: Router handling all PDF-related API endpoints.
+    health_router: Router handling the health probes.
 """
 
 app.include_router(pdf_router, prefix="/pdf")
+app.include_router(health_router, prefix="/health")
+app.mount("/metrics", make_asgi_app())
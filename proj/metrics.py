@@ -0,0 +1,73 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import Counter, Gauge, Histogram
+
+
+current_trace_id: ContextVar[str | None] = ContextVar("current_trace_id", default=None)
+
+STAGE_SECONDS = Histogram(
+    "wizvault_stage_seconds",
+    "Latency of each stage of the QA and ingestion pipelines.",
+    ["pipeline", "stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+CHUNKS_INDEXED = Counter(
+    "wizvault_chunks_indexed_total",
+    "Chunks published to the vector store.",
+    ["mode"],
+)
+CACHE_LOOKUPS = Counter(
+    "wizvault_cache_lookups_total",
+    "Cache lookups by cache and result.",
+    ["cache", "result"],
+)
+LLM_TOKENS = Counter(
+    "wizvault_llm_tokens_total",
+    "LLM tokens used by QA generations.",
+    ["kind"],
+)
+QA_IN_FLIGHT = Gauge(
+    "wizvault_qa_stage_in_flight",
+    "QA requests currently holding a slot of a concurrency-limited stage.",
+    ["stage"],
+)
+INGEST_PENDING = Gauge(
+    "wizvault_ingest_jobs_pending",
+    "Ingestion jobs queued or running.",
+)
+EMBEDDER_QUEUE_DEPTH = Gauge(
+    "wizvault_embedder_queue_depth",
+    "Embedding requests waiting for the micro-batching worker.",
+)
+TRACE_QUEUE_DEPTH = Gauge(
+    "wizvault_trace_queue_depth",
+    "Langfuse generations waiting to be exported.",
+)
+
+
+@contextmanager
+def stage_timer(pipeline: str, stage: str):
+    """
+    Time a pipeline stage into the `wizvault_stage_seconds` histogram.
+
+    The observation carries the current Langfuse trace id as an exemplar,
+    so a slow bucket can be followed to the trace that produced it.
+
+    Args:
+        pipeline (str): Pipeline name, "qa" or "ingest".
+        stage (str): Stage name.
+
+    Yields:
+        None
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace_id = current_trace_id.get()
+        STAGE_SECONDS.labels(pipeline, stage).observe(
+            time.perf_counter() - started,
+            exemplar={"trace_id": trace_id} if trace_id else None,
+        )
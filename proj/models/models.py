@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Union
 
 
 class UploadResponse(BaseModel):
@@ -7,9 +8,50 @@ class UploadResponse(BaseModel):
     Response model for PDF upload endpoint.
 
     Attributes:
-        message (str): Confirmation message after processing uploaded PDFs.
+        message (str): Confirmation message after queueing uploaded PDFs.
+        job_ids (List[str]): Ingestion job ids, one per uploaded file, that can
+                             be polled on the jobs endpoint.
+        unchanged (List[str]): Uploaded filenames whose content was already
+                               indexed in the project and were skipped.
     """
     message: str
+    job_ids: List[str] = []
+    unchanged: List[str] = []
+
+
+class JobStatusResponse(BaseModel):
+    """
+    Response model for the ingestion job status endpoint.
+
+    Attributes:
+        job_id (str): Identifier of the ingestion job.
+        project (str): Project namespace the PDF is indexed into.
+        filename (str): Name of the uploaded PDF.
+        stage (str): Current stage: queued, extracting, embedding, writing,
+                     linked or failed.
+        done (bool): Whether the job has finished (successfully or not).
+        num_chunks (int): Number of chunks indexed so far.
+        pages_done (Optional[int]): Pages extracted and embedded so far.
+        pages_total (Optional[int]): Pages to extract, once known; unchanged
+                                     pages of a re-upload are not counted.
+        chunks_per_second (Optional[float]): Ingestion throughput once the
+                                             job completes.
+        error (Optional[str]): Failure reason when the stage is "failed".
+        created_at (datetime): When the job was queued.
+        updated_at (datetime): When the job last changed stage.
+    """
+    job_id: str
+    project: str
+    filename: str
+    stage: str
+    done: bool
+    num_chunks: int = 0
+    pages_done: Optional[int] = None
+    pages_total: Optional[int] = None
+    chunks_per_second: Optional[float] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
 
 
 class AnswerResponse(BaseModel):
@@ -21,7 +63,39 @@ class AnswerResponse(BaseModel):
         pdf_name (str): The name of the PDF file from which the answer was derived.
         context_chunks (Optional[List[str]]): Optional list of text chunks (context) 
                                              relevant to the answer.
+        num_chunks (Optional[int]): Number of chunks packed into the prompt.
+        context_preview (Optional[List[str]]): First packed chunks, for display.
+        prompt_tokens (Optional[int]): Tokens in the compiled prompt.
+        completion_tokens (Optional[int]): Tokens in the generated answer.
+        total_tokens (Optional[int]): Prompt plus completion tokens.
+        context_tokens (Optional[int]): Estimated tokens of context sent.
+        context_token_budget (Optional[int]): Context tokens available.
+        cached (Union[bool, str]): Whether the answer was served from the
+            answer cache: True for the same question, "semantic" for an
+            answer reused from a near-duplicate question.
     """
     answer: str
     pdf_name: str
     context_chunks: Optional[List[str]] = None
+    num_chunks: Optional[int] = None
+    context_preview: Optional[List[str]] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
+    context_tokens: Optional[int] = None
+    context_token_budget: Optional[int] = None
+    cached: Union[bool, str] = False
+
+
+class BatchAskRequest(BaseModel):
+    """
+    Request model for the batch question answering endpoint.
+
+    Attributes:
+        questions (List[str]): Questions to answer.
+        project_name (str): Project to scope the questions.
+        pdf_name (Optional[str]): Optional PDF scope shared by all questions.
+    """
+    questions: List[str]
+    project_name: str
+    pdf_name: Optional[str] = None
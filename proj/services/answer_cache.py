@@ -0,0 +1,436 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config import settings
+from llama_index_pipeline.catalog import latest_indexed_at
+from metrics import CACHE_LOOKUPS
+
+
+_WORD = re.compile(r"\w+")
+_STOPWORDS = frozenset("""
+    a about an and are as at be been being by can could did do does for from
+    had has have how i in into is it its me my of on or our please should so
+    tell than that the their them there these this those to was we were what
+    when where which who whom whose why will with would you your
+""".split())
+
+
+class _ScopeIndex:
+    """
+    Question embeddings of the cached answers of one scope, as one matrix.
+
+    Rows are appended on insert and freed by moving the last row into the
+    gap, so a near-duplicate lookup is a single matrix product.
+
+    Attributes:
+        keys (list[tuple]): Cache key of each row.
+        rows (dict[tuple, int]): Row of each cache key.
+        matrix (np.ndarray): Unit question embeddings; rows past
+            `len(keys)` are unused capacity.
+    """
+
+    def __init__(self, dim: int):
+        self.keys: list[tuple] = []
+        self.rows: dict[tuple, int] = {}
+        self.matrix = np.empty((16, dim), dtype=np.float32)
+
+    def add(self, key: tuple, vector: np.ndarray):
+        """
+        Insert or overwrite the embedding of a cache key.
+
+        Args:
+            key (tuple): Cache key.
+            vector (np.ndarray): Unit question embedding.
+
+        Returns:
+            None
+        """
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self.matrix):
+                self.matrix = np.concatenate([self.matrix, np.empty_like(self.matrix)])
+            self.rows[key] = row
+            self.keys.append(key)
+        self.matrix[row] = vector
+
+    def remove(self, key: tuple):
+        """
+        Drop the embedding of a cache key, if present.
+
+        Args:
+            key (tuple): Cache key.
+
+        Returns:
+            None
+        """
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        last = self.keys.pop()
+        if last != key:
+            self.matrix[row] = self.matrix[len(self.keys)]
+            self.keys[row] = last
+            self.rows[last] = row
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Score every cached question against the queries.
+
+        Args:
+            queries (np.ndarray): Unit query embeddings, one per row.
+
+        Returns:
+            np.ndarray: Cosine similarities, one row per cached question and
+            one column per query.
+        """
+        return self.matrix[:len(self.keys)] @ queries.T
+
+
+class AnswerCache:
+    """
+    In-process cache of generated answers with near-duplicate matching.
+
+    Entries are keyed by project, PDF scope, the project's corpus version and
+    the normalized question. A lookup that misses the exact key falls back to
+    the entry in the same scope whose question embedding is most similar, if
+    its cosine similarity reaches `similarity_threshold` and both questions
+    have the same keywords (words other than stopwords; negations count),
+    since embeddings alone rate "when was X founded" and "when was X closed"
+    as near-duplicates. The embeddings of a
+    scope are kept in one matrix so that search is a single matrix product.
+    Returned payloads carry "cached": True for an exact hit and "semantic"
+    for an answer reused from a similar question.
+    Entries expire after `ttl_seconds` and the least recently used ones are
+    evicted beyond `max_entries`.
+
+    The corpus version combines a version shared by every process, read
+    from `version_source` at most every `version_ttl_seconds`, with a local
+    counter bumped by `invalidate_project`. A publish in another worker
+    therefore invalidates this worker's answers within
+    `version_ttl_seconds`; a publish in this worker does so immediately.
+    Lookups may call `version_source` and are meant to run off the event loop.
+
+    Attributes:
+        max_entries (int): Maximum number of cached answers.
+        ttl_seconds (float): Lifetime of a cached answer.
+        similarity_threshold (float): Minimum cosine similarity for a
+            near-duplicate question to reuse an answer.
+        version_source (callable | None): Returns the shared corpus version
+            of a project; may raise if its backing store is unreachable.
+        version_ttl_seconds (float): How long a shared version is trusted
+            before it is read again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        similarity_threshold: float,
+        version_source=None,
+        version_ttl_seconds: float = 30.0,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.version_source = version_source
+        self.version_ttl_seconds = version_ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._indexes: dict[tuple, _ScopeIndex] = {}
+        self._versions: dict[str, dict] = {}
+        self._hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _normalize(question: str) -> str:
+        """
+        Normalize a question for exact-match lookups.
+
+        Args:
+            question (str): Raw question.
+
+        Returns:
+            str: Lower-cased question with collapsed whitespace.
+        """
+        return " ".join(question.lower().split())
+
+    @staticmethod
+    def _keywords(question: str) -> frozenset:
+        """
+        Extract the words of a question that must match for a semantic hit.
+
+        Args:
+            question (str): Raw question.
+
+        Returns:
+            frozenset: Lower-cased words other than stopwords.
+        """
+        return frozenset(_WORD.findall(question.lower())) - _STOPWORDS
+
+    @staticmethod
+    def _unit(embedding: list[float]) -> np.ndarray:
+        """
+        Convert an embedding to a unit-length float32 vector.
+
+        Args:
+            embedding (list[float]): Question embedding.
+
+        Returns:
+            np.ndarray: Normalized vector.
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def _version(self, project_name: str) -> dict:
+        """
+        Return the version state of a project. Must be called with `_lock` held.
+
+        Args:
+            project_name (str): Project namespace.
+
+        Returns:
+            dict: Shared version, local counter and when the shared version
+            was last read.
+        """
+        return self._versions.setdefault(project_name, {"shared": None, "local": 0, "checked_at": None})
+
+    def _refresh_version(self, project_name: str):
+        """
+        Re-read the shared corpus version of a project once it is older than `version_ttl_seconds`.
+
+        Only one caller per project reads at a time; the others keep using
+        the known version. If the read fails, the known version is kept
+        until the next refresh is due.
+
+        Args:
+            project_name (str): Project namespace.
+
+        Returns:
+            None
+        """
+        if self.version_source is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            version = self._version(project_name)
+            if version["checked_at"] is not None and now - version["checked_at"] < self.version_ttl_seconds:
+                return
+            version["checked_at"] = now
+        try:
+            shared = self.version_source(project_name)
+        except Exception:
+            return
+        with self._lock:
+            version = self._version(project_name)
+            if shared != version["shared"]:
+                version["shared"] = shared
+                self._drop_project(project_name)
+
+    def _scope(self, project_name: str, pdf_name: str | None) -> tuple:
+        """
+        Build the (project, PDF scope, corpus version) prefix of cache keys.
+
+        Must be called with `_lock` held.
+
+        Args:
+            project_name (str): Project namespace.
+            pdf_name (str | None): Optional PDF scope.
+
+        Returns:
+            tuple: Scope prefix for the current corpus version.
+        """
+        version = self._version(project_name)
+        return project_name, pdf_name or "", version["shared"], version["local"]
+
+    def _drop(self, key: tuple):
+        """
+        Remove an entry and its embedding. Must be called with `_lock` held.
+
+        Args:
+            key (tuple): Cache key.
+
+        Returns:
+            None
+        """
+        self._entries.pop(key, None)
+        index = self._indexes.get(key[:4])
+        if index is not None:
+            index.remove(key)
+            if not index.keys:
+                del self._indexes[key[:4]]
+
+    def _drop_project(self, project_name: str):
+        """
+        Remove every entry of a project. Must be called with `_lock` held.
+
+        Args:
+            project_name (str): Project namespace.
+
+        Returns:
+            None
+        """
+        for key in [key for key in self._entries if key[0] == project_name]:
+            self._drop(key)
+
+    def get(self, project_name: str, pdf_name: str | None, question: str, embedding: list[float]) -> dict | None:
+        """
+        Look up a cached answer for a question or a near-duplicate of it.
+
+        Args:
+            project_name (str): Project namespace.
+            pdf_name (str | None): Optional PDF scope.
+            question (str): User question.
+            embedding (list[float]): Embedding of the question.
+
+        Returns:
+            dict | None: Copy of the cached answer payload with "cached" set
+            to True or "semantic", or None on a miss.
+        """
+        return self.get_many(project_name, pdf_name, [question], [embedding])[0]
+
+    def get_many(self, project_name: str, pdf_name: str | None, questions: list[str], embeddings: list[list[float]]) -> list[dict | None]:
+        """
+        Look up cached answers for several questions of the same scope at once.
+
+        Questions without an exact match are scored against the scope's
+        cached questions with one matrix product.
+
+        Args:
+            project_name (str): Project namespace.
+            pdf_name (str | None): Optional PDF scope.
+            questions (list[str]): User questions.
+            embeddings (list[list[float]]): Embedding of each question.
+
+        Returns:
+            list[dict | None]: Copy of the cached answer payload per
+            question, with "cached" set to True or "semantic", or None on a
+            miss.
+        """
+        self._refresh_version(project_name)
+        now = time.monotonic()
+        results = [None] * len(questions)
+        with self._lock:
+            scope = self._scope(project_name, pdf_name)
+            misses = []
+            for position, question in enumerate(questions):
+                key = scope + (self._normalize(question),)
+                entry = self._entries.get(key)
+                if entry is not None and entry["expires_at"] > now:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    CACHE_LOOKUPS.labels("answer", "hit").inc()
+                    results[position] = {**entry["answer"], "cached": True}
+                else:
+                    if entry is not None:
+                        self._drop(key)
+                    misses.append(position)
+
+            index = self._indexes.get(scope)
+            if misses and index is not None:
+                queries = np.stack([self._unit(embeddings[position]) for position in misses])
+                scores = index.scores(queries)
+                keys = list(index.keys)
+                expired = set()
+                for column, position in enumerate(misses):
+                    keywords = self._keywords(questions[position])
+                    candidates = np.flatnonzero(scores[:, column] >= self.similarity_threshold)
+                    for row in candidates[np.argsort(-scores[candidates, column])]:
+                        entry = self._entries[keys[row]]
+                        if entry["expires_at"] <= now:
+                            expired.add(keys[row])
+                            continue
+                        if entry["keywords"] != keywords:
+                            continue
+                        self._entries.move_to_end(keys[row])
+                        results[position] = {**entry["answer"], "cached": "semantic"}
+                        break
+                for key in expired:
+                    self._drop(key)
+
+            for position in misses:
+                if results[position] is None:
+                    self._misses += 1
+                    CACHE_LOOKUPS.labels("answer", "miss").inc()
+                else:
+                    self._semantic_hits += 1
+                    CACHE_LOOKUPS.labels("answer", "semantic_hit").inc()
+        return results
+
+    def put(self, project_name: str, pdf_name: str | None, question: str, embedding: list[float], answer: dict):
+        """
+        Cache the answer payload for a question.
+
+        Filed under the corpus version last seen by a lookup; the shared
+        version is not re-read.
+
+        Args:
+            project_name (str): Project namespace.
+            pdf_name (str | None): Optional PDF scope.
+            question (str): User question.
+            embedding (list[float]): Embedding of the question.
+            answer (dict): Answer payload returned to the client.
+
+        Returns:
+            None
+        """
+        vector = self._unit(embedding)
+        with self._lock:
+            scope = self._scope(project_name, pdf_name)
+            key = scope + (self._normalize(question),)
+            self._entries[key] = {
+                "answer": dict(answer),
+                "keywords": self._keywords(question),
+                "expires_at": time.monotonic() + self.ttl_seconds,
+            }
+            self._entries.move_to_end(key)
+            index = self._indexes.get(scope)
+            if index is None:
+                index = self._indexes[scope] = _ScopeIndex(len(vector))
+            index.add(key, vector)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_project(self, project_name: str):
+        """
+        Drop every cached answer of a project after its corpus changed.
+
+        Args:
+            project_name (str): Project namespace whose corpus changed.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._version(project_name)["local"] += 1
+            self._drop_project(project_name)
+
+    def stats(self) -> dict:
+        """
+        Report hit counters and size of the cache.
+
+        Returns:
+            dict: Exact hits, semantic hits, misses and entry count.
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "semantic_hits": self._semantic_hits,
+                "misses": self._misses,
+                "entries": len(self._entries),
+            }
+
+
+answer_cache = AnswerCache(
+    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+    similarity_threshold=settings.ANSWER_CACHE_SIMILARITY,
+    version_source=latest_indexed_at,
+    version_ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+)
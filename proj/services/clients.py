@@ -0,0 +1,59 @@
+import threading
+
+from google import genai
+from langfuse import get_client
+
+from config import settings
+
+
+_langfuse = None
+_llm_client = None
+_clients_lock = threading.Lock()
+
+
+def get_langfuse():
+    """
+    Return the process-wide Langfuse client, creating it on first use.
+
+    Creating the client does not contact Langfuse; credentials are checked
+    by the warm-up phase instead of at import time, so an unreachable
+    Langfuse degrades tracing without keeping the worker from starting.
+
+    Returns:
+        Langfuse: Shared Langfuse client.
+    """
+    global _langfuse
+    if _langfuse is None:
+        with _clients_lock:
+            if _langfuse is None:
+                _langfuse = get_client()
+    return _langfuse
+
+
+def get_llm_client() -> genai.Client:
+    """
+    Return the process-wide Gemini client, creating it on first use.
+
+    Returns:
+        genai.Client: Shared Gemini client.
+    """
+    global _llm_client
+    if _llm_client is None:
+        with _clients_lock:
+            if _llm_client is None:
+                _llm_client = genai.Client(api_key=settings.GOOGLE_API_KEY)
+    return _llm_client
+
+
+def close_clients():
+    """
+    Flush buffered Langfuse events if the client was ever created.
+
+    Returns:
+        None
+    """
+    if _langfuse is not None:
+        try:
+            _langfuse.flush()
+        except Exception:
+            pass
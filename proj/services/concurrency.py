@@ -0,0 +1,78 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from config import settings
+from metrics import QA_IN_FLIGHT
+
+
+_STAGE_LIMITS = {
+    "embed": settings.QA_EMBED_CONCURRENCY,
+    "retrieve": settings.QA_RETRIEVAL_CONCURRENCY,
+    "prompt": settings.QA_PROMPT_CONCURRENCY,
+    "llm": settings.QA_LLM_CONCURRENCY,
+}
+
+_executors = {
+    stage: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"qa-{stage}")
+    for stage, limit in _STAGE_LIMITS.items()
+    if stage != "llm"
+}
+_semaphores = {stage: asyncio.Semaphore(limit) for stage, limit in _STAGE_LIMITS.items()}
+
+
+def _in_flight(stage: str) -> int:
+    """
+    Count the requests currently holding a slot of a stage.
+
+    Args:
+        stage (str): Stage name.
+
+    Returns:
+        int: Slots in use.
+    """
+    return _STAGE_LIMITS[stage] - _semaphores[stage]._value
+
+
+for _stage in _STAGE_LIMITS:
+    QA_IN_FLIGHT.labels(_stage).set_function(functools.partial(_in_flight, _stage))
+
+
+def stage_slot(stage: str) -> asyncio.Semaphore:
+    """
+    Return the semaphore bounding concurrent work in a QA stage.
+
+    Used directly for stages that are natively async, such as LLM calls.
+
+    Args:
+        stage (str): One of "embed", "retrieve", "prompt" or "llm".
+
+    Returns:
+        asyncio.Semaphore: Semaphore to hold while the stage runs.
+    """
+    return _semaphores[stage]
+
+
+async def run_stage(stage: str, fn, *args, **kwargs):
+    """
+    Run a blocking QA stage on its own sized executor without blocking the event loop.
+
+    Each stage has a dedicated thread pool and semaphore, so CPU-bound
+    embedding, Neo4j retrieval and prompt fetching cannot starve each other or
+    the event loop. The caller's context variables (such as the current
+    trace id) are visible to `fn`.
+
+    Args:
+        stage (str): One of "embed", "retrieve" or "prompt".
+        fn (callable): Blocking function to run.
+        *args: Positional arguments for `fn`.
+        **kwargs: Keyword arguments for `fn`.
+
+    Returns:
+        Any: Result of `fn`.
+    """
+    async with _semaphores[stage]:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(_executors[stage], functools.partial(context.run, fn, *args, **kwargs))
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+
+from config import settings
+from llama_index_pipeline.catalog import check_catalog
+from llama_index_pipeline.embedder import get_embedder
+from llama_index_pipeline.vector_store import get_vector_store
+from services.clients import get_langfuse, get_llm_client
+from services.pdf_service import QA_PROMPT_NAME, get_prompt_registry
+
+
+_components: dict[str, dict] = {}
+_components_lock = threading.Lock()
+_warmup_started = False
+
+
+def _check_langfuse():
+    """
+    Verify the Langfuse credentials.
+
+    Returns:
+        None
+
+    Raises:
+        RuntimeError: If Langfuse rejects the credentials.
+    """
+    if not get_langfuse().auth_check():
+        raise RuntimeError("Langfuse authentication failed.")
+
+
+def _warm_embedder():
+    """
+    Load the embedding model and run it once.
+
+    Returns:
+        None
+    """
+    get_embedder().embed_query("warm-up")
+
+
+def _warm_prompts():
+    """
+    Fetch the QA prompt into the prompt registry.
+
+    Returns:
+        None
+
+    Raises:
+        RuntimeError: If Langfuse could not be reached and the fallback
+            prompt is served instead.
+    """
+    _, lf_prompt = get_prompt_registry().get(QA_PROMPT_NAME, label="production")
+    if lf_prompt is None:
+        raise RuntimeError("QA prompt unavailable, serving the fallback template.")
+
+
+# (name, warm-up function, required for readiness)
+WARMUP_STEPS = (
+    ("vector_store", lambda: get_vector_store().prepare(), True),
+    ("embedder", _warm_embedder, True),
+    ("llm", get_llm_client, True),
+    ("catalog", check_catalog, False),
+    ("langfuse", _check_langfuse, False),
+    ("prompts", _warm_prompts, False),
+)
+
+
+def _run_step(name: str, fn, required: bool) -> bool:
+    """
+    Run one warm-up step and record its outcome.
+
+    Args:
+        name (str): Component name.
+        fn (callable): Warm-up function.
+        required (bool): Whether readiness depends on the component.
+
+    Returns:
+        bool: True if the step succeeded.
+    """
+    started = time.perf_counter()
+    try:
+        fn()
+        status, error = "ready", None
+    except Exception as exc:
+        status, error = "failed", str(exc)
+    with _components_lock:
+        _components[name] = {
+            "status": status,
+            "required": required,
+            "error": error,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+    return status == "ready"
+
+
+async def warm_up():
+    """
+    Initialize the heavy clients of the process in parallel.
+
+    Every step runs in its own thread. Required steps that fail are retried
+    every WARMUP_RETRY_SECONDS until they succeed; optional ones are left to
+    initialize lazily on first use.
+
+    Returns:
+        None
+    """
+    global _warmup_started
+    with _components_lock:
+        _warmup_started = True
+        for name, _, required in WARMUP_STEPS:
+            _components[name] = {"status": "pending", "required": required, "error": None, "seconds": None}
+
+    pending = list(WARMUP_STEPS)
+    while pending:
+        results = await asyncio.gather(*(asyncio.to_thread(_run_step, *step) for step in pending))
+        pending = [step for step, ok in zip(pending, results) if not ok and step[2]]
+        if pending:
+            await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
+
+
+def readiness() -> tuple[bool, dict]:
+    """
+    Report whether the process is ready to take traffic.
+
+    Without a warm-up phase the process is always ready and initializes its
+    clients on first use.
+
+    Returns:
+        tuple[bool, dict]: Readiness and a per-component report.
+    """
+    with _components_lock:
+        components = {name: dict(component) for name, component in _components.items()}
+        started = _warmup_started
+    ready = not started or all(
+        component["status"] == "ready" for component in components.values() if component["required"]
+    )
+    return ready, {"ready": ready, "warmup": started, "components": components}
@@ -0,0 +1,266 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from config import settings
+from metrics import INGEST_PENDING
+from llama_index_pipeline.catalog import STATUS_ORDER, record_status
+from llama_index_pipeline.index_builder import build_index_from_bytes, copy_indexed_pdf
+from services.answer_cache import answer_cache
+
+
+JOB_STAGES = ("queued", "extracting", "embedding", "writing", "linked", "failed")
+
+_executor = ThreadPoolExecutor(max_workers=settings.INGEST_WORKERS, thread_name_prefix="ingest")
+_jobs: "OrderedDict[str, dict]" = OrderedDict()
+_jobs_lock = threading.Lock()
+_pending = 0
+INGEST_PENDING.set_function(lambda: _pending)
+
+
+class IngestQueueFullError(Exception):
+    """
+    Raised when queueing jobs would exceed INGEST_MAX_PENDING.
+    """
+
+
+def _update_job(job_id: str, **fields):
+    """
+    Apply field updates to a tracked job and refresh its timestamp.
+
+    Args:
+        job_id (str): Identifier of the job to update.
+        **fields: Job fields to overwrite.
+
+    Returns:
+        None
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            job.update(fields)
+            job["updated_at"] = datetime.utcnow()
+
+
+def _run_ingestion_job(job_id: str, file_path: str, filename: str, project_name: str, sha256: str | None, copy_from: dict | None):
+    """
+    Execute a single ingestion job inside the worker pool.
+
+    Stage transitions reported by the index builder are recorded on the job so
+    they can be polled through the jobs endpoint, and mirrored to the upload
+    catalog each time the ingestion advances to a later stage (the builder
+    alternates between embedding and writing per batch, which the catalog
+    does not need to see). Failures are recorded there too. Content already indexed
+    under another filename or in another project is copied inside the vector
+    store instead of being re-embedded,
+    falling back to a full ingestion if the source chunks are gone. Cached
+    answers of the project are invalidated once its corpus has changed, and
+    after a failure too, since the vector store may have published a version
+    whose catalog record could not be written. The
+    spooled upload is deleted when the job finishes, whatever its outcome.
+
+    Args:
+        job_id (str): Identifier of the job being executed.
+        file_path (str): Path of the spooled PDF upload.
+        filename (str): Original filename of the PDF.
+        project_name (str): Project namespace for the upload.
+        sha256 (str | None): SHA-256 hex digest of the PDF bytes.
+        copy_from (dict | None): Catalog record of an indexed upload with the
+            same content, if any.
+
+    Returns:
+        None
+    """
+    global _pending
+
+    reached = [STATUS_ORDER.index("queued")]
+
+    def progress(stage, **info):
+        _update_job(job_id, stage=stage, **info)
+        if stage in STATUS_ORDER[:-1] and STATUS_ORDER.index(stage) > reached[0]:
+            reached[0] = STATUS_ORDER.index(stage)
+            record_status(project_name, filename, stage)
+
+    try:
+        stats = {"num_chunks": 0}
+        if copy_from is not None:
+            stats = copy_indexed_pdf(
+                copy_from["project"],
+                copy_from["filename"],
+                filename=filename,
+                project_name=project_name,
+                sha256=sha256,
+                progress=progress,
+            )
+        if not stats["num_chunks"]:
+            stats = build_index_from_bytes(
+                file_path,
+                filename=filename,
+                project_name=project_name,
+                progress=progress,
+                sha256=sha256,
+            )
+        if stats["num_chunks"]:
+            answer_cache.invalidate_project(project_name)
+            _update_job(
+                job_id,
+                stage="linked",
+                num_chunks=stats["num_chunks"],
+                chunks_per_second=stats["chunks_per_second"],
+                done=True,
+            )
+        else:
+            error = "No text could be extracted from the PDF."
+            record_status(project_name, filename, "failed", error=error)
+            _update_job(job_id, stage="failed", error=error, done=True)
+    except Exception as exc:
+        answer_cache.invalidate_project(project_name)
+        record_status(project_name, filename, "failed", error=str(exc))
+        _update_job(job_id, stage="failed", error=str(exc), done=True)
+    finally:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+        with _jobs_lock:
+            _pending -= 1
+
+
+def has_capacity(num_jobs: int = 1) -> bool:
+    """
+    Check whether the ingestion queue can accept more jobs.
+
+    Advisory only, for rejecting a request before its files are read:
+    concurrent requests can pass the check together, so the slots are
+    taken with `reserve_capacity`.
+
+    Args:
+        num_jobs (int): Number of jobs about to be submitted.
+
+    Returns:
+        bool: True if the jobs fit under the pending-job limit.
+    """
+    with _jobs_lock:
+        return _pending + num_jobs <= settings.INGEST_MAX_PENDING
+
+
+def reserve_capacity(num_jobs: int):
+    """
+    Take slots in the ingestion queue for jobs about to be submitted.
+
+    Args:
+        num_jobs (int): Number of jobs to reserve slots for.
+
+    Returns:
+        None
+
+    Raises:
+        IngestQueueFullError: If the jobs do not fit under the pending-job
+            limit; no slot is taken in that case.
+    """
+    global _pending
+    with _jobs_lock:
+        if _pending + num_jobs > settings.INGEST_MAX_PENDING:
+            raise IngestQueueFullError("Ingestion queue is full, please retry shortly.")
+        _pending += num_jobs
+
+
+def release_capacity(num_jobs: int):
+    """
+    Give back reserved slots whose jobs will not be submitted.
+
+    Args:
+        num_jobs (int): Number of reserved slots to release.
+
+    Returns:
+        None
+    """
+    global _pending
+    with _jobs_lock:
+        _pending -= num_jobs
+
+
+def submit_ingestion_job(
+    file_path: str,
+    filename: str,
+    project_name: str,
+    sha256: str | None = None,
+    copy_from: dict | None = None,
+    reserved: bool = False,
+    job_id: str | None = None,
+) -> str:
+    """
+    Queue a PDF for background ingestion and return its job id immediately.
+
+    The job takes ownership of the spooled file and deletes it when done,
+    and frees its queue slot when it finishes.
+
+    Args:
+        file_path (str): Path of the spooled PDF upload.
+        filename (str): Original filename of the PDF.
+        project_name (str): Project namespace for the upload.
+        sha256 (str | None): SHA-256 hex digest of the PDF bytes.
+        copy_from (dict | None): Catalog record of an indexed upload with the
+            same content to copy chunks from instead of re-embedding.
+        reserved (bool): Whether the caller already took a queue slot for
+            the job with `reserve_capacity`.
+        job_id (str | None): Identifier to track the job under, e.g. one
+            already recorded in the catalog; a new one is generated if None.
+
+    Returns:
+        str: Identifier that can be polled for job status.
+
+    Raises:
+        IngestQueueFullError: If no slot was reserved and the queue is full.
+    """
+    if not reserved:
+        reserve_capacity(1)
+    job_id = job_id or uuid.uuid4().hex
+    now = datetime.utcnow()
+    with _jobs_lock:
+        _jobs[job_id] = {
+            "job_id": job_id,
+            "project": project_name,
+            "filename": filename,
+            "stage": "queued",
+            "done": False,
+            "num_chunks": 0,
+            "pages_done": None,
+            "pages_total": None,
+            "chunks_per_second": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        while len(_jobs) > settings.INGEST_JOB_HISTORY:
+            oldest_id, oldest = next(iter(_jobs.items()))
+            if not oldest["done"]:
+                break
+            _jobs.pop(oldest_id)
+    try:
+        _executor.submit(_run_ingestion_job, job_id, file_path, filename, project_name, sha256, copy_from)
+    except BaseException:
+        with _jobs_lock:
+            _jobs.pop(job_id, None)
+        if not reserved:
+            release_capacity(1)
+        raise
+    return job_id
+
+
+def get_job(job_id: str) -> dict | None:
+    """
+    Look up the current state of an ingestion job.
+
+    Args:
+        job_id (str): Identifier returned at upload time.
+
+    Returns:
+        dict | None: Snapshot of the job, or None if it is unknown.
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job is not None else None
@@ -1,47 +1,190 @@
 from config import settings
 
+import asyncio
+import functools
+import json
 import os
 import re
-from fastapi import UploadFile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
 
 from google import genai
-from langfuse import get_client, Langfuse
-from langfuse.langchain import CallbackHandler
-from langchain.prompts import PromptTemplate
-from langchain_community.vectorstores import Neo4jVector
 from langchain.docstore.document import Document
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from llama_index_pipeline.index_builder import (
-    build_index_from_bytes,
-    get_available_pdfs,
-    get_chunks_from_neo4j,
-    embed_model,
-)
+from llama_index_pipeline.vector_store import get_vector_store
+from llama_index_pipeline.catalog import find_indexed_uploads, get_upload_by_job, list_indexed_pdfs, pdf_exists, record_queued
+from llama_index_pipeline.embedder import get_embedder
+from services.answer_cache import answer_cache
+from services.clients import get_langfuse, get_llm_client
+from services.concurrency import run_stage, stage_slot
+from services.token_usage import estimate_tokens, resolve_usage
+from services.job_service import get_job, release_capacity, reserve_capacity, submit_ingestion_job
+from services.prompt_registry import PromptRegistry
+from services.trace_queue import TraceQueue
+from services.upload_spool import discard_spool, spool_uploads
+from metrics import LLM_TOKENS, TRACE_QUEUE_DEPTH, current_trace_id, stage_timer
 
-langfuse = get_client()
-assert langfuse.auth_check(), "Langfuse authentication failed."
 
-client = genai.Client(api_key=settings.GOOGLE_API_KEY)
-embed_model = HuggingFaceEmbeddings(model_name="BAAI/bge-small-en-v1.5")
+def _copy_source(records: list[dict], project_name: str) -> dict | None:
+    """
+    Pick the indexed upload to copy the chunks of a new upload from.
+
+    Args:
+        records (list[dict]): Catalog records of the indexed uploads with the
+            same content.
+        project_name (str): Project the new upload targets.
+
+    Returns:
+        dict | None: A record from the same project if there is one, else
+        any record, or None if the content is not indexed anywhere.
+    """
+    for record in records:
+        if record["project"] == project_name:
+            return record
+    return records[0] if records else None
 
 
-async def save_and_process_pdfs(files: list[UploadFile], project_name: str):
+async def save_and_process_pdfs(request: Request, project_name: str, max_files: int):
     """
-    Save and process uploaded PDFs under a specific project namespace.
+    Queue uploaded PDFs for background indexing under a specific project namespace.
 
-    Each file is read in its entirety and indexed into the vector database.
+    The multipart request body is parsed as it arrives and each file is
+    streamed straight to a spool file on disk and hashed on the way.
+    Indexed uploads with the same content are looked up for the whole batch
+    in one catalog query (nothing is deduplicated if the catalog is down): a file is skipped when the same filename in the
+    project is already indexed with that content, and its chunks are copied
+    from another indexed upload (another filename or project) when there is
+    one. The remaining files take their slots in the ingestion queue all at
+    once, are marked as queued in
+    the catalog, under their job ids, with one bulk write and handed to the
+    ingestion worker pool by
+    path, so the request returns before
+    extraction, embedding and vector store writes run, and no upload is held
+    in memory whole.
 
     Args:
-        files (list[UploadFile]): List of uploaded PDF files.
+        request (Request): Upload request with the PDFs in its "files" field.
         project_name (str): Unique project name for session isolation.
+        max_files (int): Maximum number of PDFs per upload.
+
+    Returns:
+        dict: Confirmation message, the ids of the queued ingestion jobs and
+        the filenames that were already indexed with the same content.
+
+    Raises:
+        UploadTooLargeError: If a file exceeds UPLOAD_MAX_BYTES; no job is
+            queued for any of the files in that case.
+        UploadRejectedError: If the request is not a multipart form of
+            1 to `max_files` files. On this or any other
+            failure, the spool files not yet handed to a job are deleted
+            and their queue slots released.
+        IngestQueueFullError: If the files to index do not fit in the
+            ingestion queue; none of them is queued.
+    """
+    spooled = []
+    job_ids = []
+    unchanged = []
+    handed_off = set()
+    reserved = 0
+    try:
+        spooled = await spool_uploads(request, "files", max_files)
+
+        indexed = await run_in_threadpool(find_indexed_uploads, [sha256 for _, _, sha256 in spooled])
+        queued = []
+        for filename, path, sha256 in spooled:
+            records = indexed.get(sha256, [])
+            if any(record["project"] == project_name and record["filename"] == filename for record in records):
+                discard_spool(path)
+                unchanged.append(filename)
+            else:
+                queued.append((uuid.uuid4().hex, filename, path, sha256, _copy_source(records, project_name)))
+        reserve_capacity(len(queued))
+        reserved = len(queued)
+        await run_in_threadpool(
+            record_queued, project_name, [job[1] for job in queued], [job[0] for job in queued]
+        )
+
+        for job_id, filename, path, sha256, existing in queued:
+            job_ids.append(
+                submit_ingestion_job(
+                    path,
+                    filename=filename,
+                    project_name=project_name,
+                    sha256=sha256,
+                    copy_from=existing,
+                    reserved=True,
+                    job_id=job_id,
+                )
+            )
+            handed_off.add(path)
+            reserved -= 1
+    except BaseException:
+        if reserved:
+            release_capacity(reserved)
+        for _, path, _ in spooled:
+            if path not in handed_off:
+                discard_spool(path)
+        raise
+    return {
+        "message": f"PDFs queued for indexing under project: {project_name}",
+        "job_ids": job_ids,
+        "unchanged": unchanged,
+    }
+
+
+def _job_from_record(job_id: str, record: dict) -> dict:
+    """
+    Describe an ingestion job from the catalog record it was queued under.
+
+    Args:
+        job_id (str): Identifier of the ingestion job.
+        record (dict): Catalog record carrying the job id.
 
     Returns:
-        dict: Confirmation message on successful processing.
+        dict: Job status in the shape of the jobs endpoint; the catalog's
+        "indexed" status is reported as the "linked" stage.
+    """
+    status = record.get("status") or "queued"
+    timestamp = record.get("timestamp") or datetime.utcnow()
+    return {
+        "job_id": job_id,
+        "project": record["project"],
+        "filename": record["filename"],
+        "stage": "linked" if status == "indexed" else status,
+        "done": status in ("indexed", "failed"),
+        "num_chunks": record.get("num_chunks") or 0,
+        "pages_done": None,
+        "pages_total": None,
+        "chunks_per_second": record.get("chunks_per_second"),
+        "error": record.get("error"),
+        "created_at": timestamp,
+        "updated_at": timestamp,
+    }
+
+
+def get_ingestion_job(job_id: str):
     """
-    for file in files:
-        file_bytes = await file.read()
-        build_index_from_bytes(file_bytes, filename=file.filename, project_name=project_name)
-    return {"message": f"PDFs processed and indexed under project: {project_name}"}
+    Retrieve the status of a background ingestion job.
+
+    Jobs are tracked in memory by the process that runs them, so a job that
+    was evicted from the history, queued by another worker process or lost
+    to a restart is looked up in the catalog, which records the job id of
+    each queued upload and the stage it reached.
+
+    Args:
+        job_id (str): Identifier returned by the upload endpoint.
+
+    Returns:
+        dict | None: Job status, or None if the job is unknown.
+    """
+    job = get_job(job_id)
+    if job is not None:
+        return job
+    record = get_upload_by_job(job_id)
+    return _job_from_record(job_id, record) if record is not None else None
 
 
 def get_chunks_for_pdf(pdf_name: str, project_name: str):
@@ -55,7 +198,9 @@ def get_chunks_for_pdf(pdf_name: str, project_name: str):
     Returns:
         dict: Dictionary with list of extracted text chunks.
     """
-    chunks = get_chunks_from_neo4j(pdf_name, project_name=project_name)
+    if pdf_exists(project_name, pdf_name) is False:
+        return {"chunks": []}
+    chunks = get_vector_store().get_chunks(pdf_name, project_name=project_name)
     return {"chunks": chunks}
 
 
@@ -79,10 +224,38 @@ def filter_clean_chunks(chunks: list[str]) -> list[str]:
     return clean
 
 
+def pack_chunks(chunks: list[str], token_budget: int) -> tuple[list[str], int]:
+    """
+    Pack the best chunks into a token budget, preserving their ranking order.
+
+    Chunks are taken in order; a chunk that does not fit is skipped so that
+    smaller, lower-ranked chunks can still use the remaining budget.
+
+    Args:
+        chunks (list[str]): Chunks ordered from most to least relevant.
+        token_budget (int): Maximum number of context tokens.
+
+    Returns:
+        tuple[list[str], int]: Packed chunks and the tokens they use.
+    """
+    packed = []
+    used = 0
+    for chunk in chunks:
+        tokens = estimate_tokens(chunk)
+        if used + tokens > token_budget:
+            continue
+        packed.append(chunk)
+        used += tokens
+    return packed, used
+
+
 def count_tokens(client, model_name, text):
     """
     Count tokens for a given text prompt using the specified model.
 
+    This is a network round-trip; the QA path only uses it for deferred,
+    background recounts.
+
     Args:
         client: Google Generative AI client instance.
         model_name (str): Model name (e.g., 'gemini-2.5-flash').
@@ -98,135 +271,775 @@ def count_tokens(client, model_name, text):
     return token_data.total_tokens
 
 
-async def answer_question(question: str, project_name: str, pdf_name: str | None = None):
+MODEL_NAME = settings.LLM_MODEL_NAME
+QA_PROMPT_NAME = "pdf_qa_prompt"
+
+FALLBACK_PROMPT = """You are a helpful assistant. Use the following context to answer the question.
+
+Context:
+{context}
+
+Question:
+{question}
+
+Answer:"""
+
+_prompt_registry = None
+_trace_queue = None
+_registry_lock = threading.Lock()
+TRACE_QUEUE_DEPTH.set_function(lambda: _trace_queue.stats()["queue_depth"] if _trace_queue is not None else 0)
+
+
+def get_prompt_registry() -> PromptRegistry:
     """
-    Answer a user question by retrieving and using indexed PDF context.
+    Return the process-wide prompt registry, creating it on first use.
 
-    Retrieves top-k relevant chunks from Neo4j vector store and passes them to a language model.
-    Also manages Langfuse tracing for prompt/response usage.
+    Returns:
+        PromptRegistry: Shared registry of Langfuse prompt templates.
+    """
+    global _prompt_registry
+    if _prompt_registry is None:
+        with _registry_lock:
+            if _prompt_registry is None:
+                _prompt_registry = PromptRegistry(
+                    get_langfuse(),
+                    ttl_seconds=settings.PROMPT_CACHE_TTL_SECONDS,
+                    fallback=FALLBACK_PROMPT,
+                    retry_seconds=settings.PROMPT_RETRY_SECONDS,
+                )
+    return _prompt_registry
+
+
+def get_trace_queue() -> TraceQueue:
+    """
+    Return the process-wide Langfuse export queue, creating it on first use.
+
+    Returns:
+        TraceQueue: Shared generation export queue.
+    """
+    global _trace_queue
+    if _trace_queue is None:
+        with _registry_lock:
+            if _trace_queue is None:
+                _trace_queue = TraceQueue(
+                    get_langfuse(),
+                    max_size=settings.TRACE_QUEUE_SIZE,
+                    batch_size=settings.TRACE_BATCH_SIZE,
+                    flush_interval=settings.TRACE_FLUSH_INTERVAL_SECONDS,
+                )
+    return _trace_queue
+
+
+def _embed_questions(questions: list[str]) -> list[list[float]]:
+    """
+    Embed a batch of questions with the shared embedder in one request, at query priority.
+
+    Args:
+        questions (list[str]): Question strings.
+
+    Returns:
+        list[list[float]]: One embedding per question.
+    """
+    return get_embedder().embed_queries(questions)
+
+
+def _embed_question(question: str) -> list[float]:
+    """
+    Embed a question with the shared embedder.
 
     Args:
         question (str): User's question string.
+
+    Returns:
+        list[float]: Question embedding.
+    """
+    return get_embedder().embed_query(question)
+
+
+def _retrieve_context(query_embedding: list[float], project_name: str, pdf_name: str | None) -> dict:
+    """
+    Retrieve the packed context chunks for an embedded question.
+
+    Searches the project's (or a single PDF's) top-k chunks in the vector
+    store, cleans them and packs the best of them into
+    CONTEXT_TOKEN_BUDGET tokens.
+
+    Args:
+        query_embedding (list[float]): Embedded question.
         project_name (str): Project namespace for isolation.
         pdf_name (str|None): Optional PDF filename to restrict context source.
 
     Returns:
-        dict: Answer, source PDF(s), chunk preview, and token usage.
+        dict: Packed chunks, joined context, context token count and source
+        PDF names.
     """
-    langfuse_handler = CallbackHandler()
-    clean_chunks = []
-    context = ""
-    source_pdfs = []
+    with stage_timer("qa", "vector_search"):
+        docs = get_vector_store().search(
+            query_embedding, project_name=project_name, k=_search_k(pdf_name), pdf_name=pdf_name
+        )
+    return _context_from_docs(docs, pdf_name)
+
 
+def _search_k(pdf_name: str | None) -> int:
+    """
+    Return how many chunks to retrieve for a project- or PDF-scoped question.
+
+    Args:
+        pdf_name (str|None): Optional PDF filename the question is scoped to.
+
+    Returns:
+        int: Number of chunks to retrieve.
+    """
+    return settings.PDF_SCOPE_TOP_K if pdf_name else 5
+
+
+def _context_from_docs(docs: list[Document], pdf_name: str | None, cleaned: dict | None = None) -> dict:
+    """
+    Clean retrieved chunks and pack the best of them into CONTEXT_TOKEN_BUDGET tokens.
+
+    Args:
+        docs (list[Document]): Retrieved chunks, most relevant first.
+        pdf_name (str|None): Optional PDF filename the question is scoped to.
+        cleaned (dict | None): Cache of cleaned chunks by raw text, shared
+            across the questions of a batch so each chunk is cleaned once.
+
+    Returns:
+        dict: Packed chunks, joined context, context token count and source
+        PDF names.
+    """
     if pdf_name:
-        raw_chunks = get_chunks_from_neo4j(pdf_name, project_name=project_name)
-        clean_chunks = filter_clean_chunks(raw_chunks)
-        context = "\n\n".join(clean_chunks)
         source_pdfs = [pdf_name]
     else:
-        vector_store = Neo4jVector(
-            embedding=embed_model,
-            url=settings.NEO4J_URI,
-            username=settings.NEO4J_USER,
-            password=settings.NEO4J_PASSWORD,
-            node_label="Chunk",
-            text_node_property="text",
-            embedding_node_property="embedding"
+        source_pdfs = list({doc.metadata.get("source", "unknown") for doc in docs})
+
+    raw_chunks = [doc.page_content for doc in docs]
+    with stage_timer("qa", "clean_chunks"):
+        if cleaned is None:
+            filtered = filter_clean_chunks(raw_chunks)
+        else:
+            for text in raw_chunks:
+                if text not in cleaned:
+                    cleaned[text] = filter_clean_chunks([text])
+            filtered = [chunk for text in raw_chunks for chunk in cleaned[text]]
+    with stage_timer("qa", "pack_context"):
+        clean_chunks, context_tokens = pack_chunks(filtered, settings.CONTEXT_TOKEN_BUDGET)
+    return {
+        "chunks": clean_chunks,
+        "context": "\n\n".join(clean_chunks),
+        "context_tokens": context_tokens,
+        "source_pdfs": source_pdfs,
+    }
+
+
+def _retrieve_contexts(query_embeddings: list[list[float]], project_name: str, pdf_name: str | None) -> list[dict]:
+    """
+    Retrieve the packed context of several embedded questions at once.
+
+    The vector store answers all questions in one round-trip. Chunks
+    retrieved by several questions are cleaned once, and questions that
+    retrieved the same chunks share a single packed context.
+
+    Args:
+        query_embeddings (list[list[float]]): Embedded questions.
+        project_name (str): Project namespace for isolation.
+        pdf_name (str|None): Optional PDF filename to restrict context source.
+
+    Returns:
+        list[dict]: Packed context per question, as returned by
+        `_retrieve_context`.
+    """
+    with stage_timer("qa", "batch_vector_search"):
+        results = get_vector_store().search_many(
+            query_embeddings, project_name=project_name, k=_search_k(pdf_name), pdf_name=pdf_name
         )
-        retriever = vector_store.as_retriever(search_kwargs={"k": 5})
-        docs = retriever.invoke(question)
+    cleaned = {}
+    packed = {}
+    contexts = []
+    for docs in results:
+        key = tuple((doc.metadata.get("source"), doc.page_content) for doc in docs)
+        if key not in packed:
+            packed[key] = _context_from_docs(docs, pdf_name, cleaned)
+        contexts.append(packed[key])
+    return contexts
 
-        docs = [doc for doc in docs if doc.metadata.get('project') == project_name]
-        raw_chunks = [doc.page_content for doc in docs]
-        clean_chunks = filter_clean_chunks(raw_chunks)
-        context = "\n\n".join(clean_chunks)
-        source_pdfs = list({doc.metadata.get("source", "unknown") for doc in docs})
 
-    if not clean_chunks:
-        return {
-            "answer": "No readable content found in the retrieved chunks.",
-            "pdf_name": ", ".join(source_pdfs) if source_pdfs else "unknown",
-            "context_chunks": [],
-        }
+def _no_context_response(source_pdfs: list[str]) -> dict:
+    """
+    Build the response returned when no readable context was retrieved.
+
+    Args:
+        source_pdfs (list[str]): Source PDF names of the retrieved chunks.
 
+    Returns:
+        dict: Answer payload without LLM output.
+    """
+    return {
+        "answer": "No readable content found in the retrieved chunks.",
+        "pdf_name": ", ".join(source_pdfs) if source_pdfs else "unknown",
+        "context_chunks": [],
+        "context_tokens": 0,
+        "context_token_budget": settings.CONTEXT_TOKEN_BUDGET,
+        "cached": False,
+    }
+
+
+def _compile_prompt(context: str, question: str) -> tuple[str, object | None]:
+    """
+    Compile the QA prompt from the cached Langfuse template, or the local fallback.
+
+    Args:
+        context (str): Packed context chunks.
+        question (str): User's question string.
+
+    Returns:
+        tuple[str, object | None]: Compiled prompt text and the Langfuse
+        prompt it was compiled from, if any.
+    """
+    with stage_timer("qa", "prompt_fetch"):
+        template, lf_prompt = get_prompt_registry().get(QA_PROMPT_NAME, label="production")
+    with stage_timer("qa", "prompt_compile"):
+        return template.format(context=context, question=question), lf_prompt
+
+
+def _start_generation(lf_prompt=None):
+    """
+    Open the Langfuse generation of a QA LLM call as the call starts.
+
+    Args:
+        lf_prompt: Langfuse prompt the generation uses, linked in the trace.
+
+    Returns:
+        LangfuseGeneration | None: Open generation in the request's trace,
+        or None if it could not be created.
+    """
+    trace_id = current_trace_id.get()
+    return get_trace_queue().start(
+        "pdf_qa",
+        trace_context={"trace_id": trace_id} if trace_id else None,
+        model=MODEL_NAME,
+        prompt=lf_prompt,
+    )
+
+
+def _record_usage(prompt_tokens: int, completion_tokens: int, generation=None, end_time: int | None = None, **fields):
+    """
+    Count token usage of a QA generation and queue it for export to Langfuse.
+
+    Args:
+        prompt_tokens (int): Tokens in the compiled prompt.
+        completion_tokens (int): Tokens in the generated answer.
+        generation (LangfuseGeneration | None): Generation opened by
+            `_start_generation` for the LLM call.
+        end_time (int | None): When the LLM call ended, in nanoseconds
+            since the epoch.
+        **fields: Further generation fields, such as input, output and
+            completion_start_time.
+
+    Returns:
+        None
+    """
+    LLM_TOKENS.labels("prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels("completion").inc(completion_tokens)
+    get_trace_queue().submit(
+        generation,
+        end_time=end_time,
+        usage_details={
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+        **fields,
+    )
+
+
+def _record_failure(generation, compiled_prompt: str, exc: Exception):
+    """
+    Queue a QA generation whose LLM call failed for export to Langfuse.
+
+    Args:
+        generation (LangfuseGeneration | None): Generation opened by
+            `_start_generation` for the LLM call.
+        compiled_prompt (str): Prompt sent to the LLM.
+        exc (Exception): Error raised by the call.
+
+    Returns:
+        None
+    """
+    get_trace_queue().submit(
+        generation,
+        end_time=time.time_ns(),
+        input=compiled_prompt,
+        level="ERROR",
+        status_message=str(exc) or type(exc).__name__,
+    )
+
+
+def _exact_token_count(text: str) -> int:
+    """
+    Count tokens exactly with the Gemini API, for background recounts.
+
+    Args:
+        text (str): Text to count.
+
+    Returns:
+        int: Number of tokens in the text.
+    """
+    with stage_timer("qa", "count_tokens"):
+        return count_tokens(get_llm_client(), MODEL_NAME, text)
+
+
+def _answer_payload(retrieved: dict, response_text: str, prompt_tokens: int, completion_tokens: int) -> dict:
+    """
+    Build the answer payload returned to clients and stored in the answer cache.
+
+    Args:
+        retrieved (dict): Output of `_retrieve_context`.
+        response_text (str): Generated answer.
+        prompt_tokens (int): Tokens in the compiled prompt.
+        completion_tokens (int): Tokens in the generated answer.
+
+    Returns:
+        dict: Answer, sources, chunk preview, token usage and context budget.
+    """
+    return {
+        "answer": response_text,
+        "pdf_name": ", ".join(retrieved["source_pdfs"]),
+        "num_chunks": len(retrieved["chunks"]),
+        "context_preview": retrieved["chunks"][:2],
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "context_tokens": retrieved["context_tokens"],
+        "context_token_budget": settings.CONTEXT_TOKEN_BUDGET,
+    }
+
+
+async def answer_question(question: str, project_name: str, pdf_name: str | None = None):
+    """
+    Answer a user question by retrieving and using indexed PDF context.
+
+    Retrieves the top-k relevant chunks of the project (or of a single PDF) from the vector store,
+    packs the best of them into CONTEXT_TOKEN_BUDGET tokens and passes them to a language model.
+    Answers are served from the semantic answer cache when the same or a near-duplicate
+    question was answered for the current corpus. The prompt template comes from the in-process prompt
+    registry and token usage is exported to Langfuse through a background queue.
+
+    Blocking stages (embedding, vector retrieval, prompt fetching) run on their own sized executors and
+    the LLM call uses the async Gemini client, each bounded by a per-stage semaphore, so the event loop
+    keeps serving other requests while a question is in flight.
+
+    Args:
+        question (str): User's question string.
+        project_name (str): Project namespace for isolation.
+        pdf_name (str|None): Optional PDF filename to restrict context source.
+
+    Returns:
+        dict: Answer, source PDF(s), chunk preview, token usage, context
+        tokens sent versus the context token budget, and whether the answer
+        came from the cache: "cached" is True for the same question and
+        "semantic" for an answer reused from a near-duplicate.
+    """
+    current_trace_id.set(get_langfuse().create_trace_id())
+    with stage_timer("qa", "total"):
+        return await _answer_question(question, project_name, pdf_name)
+
+
+async def _answer_question(question: str, project_name: str, pdf_name: str | None):
+    """
+    Run the QA pipeline for `answer_question`.
+
+    Args:
+        question (str): User's question string.
+        project_name (str): Project namespace for isolation.
+        pdf_name (str|None): Optional PDF filename to restrict context source.
+
+    Returns:
+        dict: Answer payload, as returned by `answer_question`.
+    """
+    with stage_timer("qa", "embed"):
+        query_embedding = await run_stage("embed", _embed_question, question)
+
+    cached = await run_stage("retrieve", answer_cache.get, project_name, pdf_name, question, query_embedding)
+    if cached is not None:
+        return cached
+
+    with stage_timer("qa", "retrieve"):
+        retrieved = await run_stage("retrieve", _retrieve_context, query_embedding, project_name, pdf_name)
+    if not retrieved["chunks"]:
+        return _no_context_response(retrieved["source_pdfs"])
+
+    result, generated = await _generate_answer(question, retrieved)
+    if generated:
+        answer_cache.put(project_name, pdf_name, question, query_embedding, result)
+    return {**result, "cached": False}
+
+
+def _finished(response) -> bool:
+    """
+    Check that a Gemini response, or the last chunk of a stream, ended normally.
+
+    Args:
+        response: `GenerateContentResponse` or last streamed chunk, if any.
+
+    Returns:
+        bool: True if the first candidate finished with STOP or reports no
+        finish reason; False if it was cut short (token limit, safety,
+        recitation) or there is no response.
+    """
+    if response is None:
+        return False
+    candidates = getattr(response, "candidates", None)
+    reason = getattr(candidates[0], "finish_reason", None) if candidates else None
+    return reason is None or getattr(reason, "name", reason) == "STOP"
+
+
+async def _generate_answer(question: str, retrieved: dict) -> tuple[dict, bool]:
+    """
+    Compile the prompt for a retrieved context and generate the answer.
+
+    Args:
+        question (str): User's question string.
+        retrieved (dict): Output of `_retrieve_context`.
+
+    Returns:
+        tuple[dict, bool]: Answer payload and whether it may be cached: the
+        LLM produced a non-empty answer that was not cut short (False when
+        the fallback message was used).
+    """
+    with stage_timer("qa", "prompt"):
+        compiled_prompt, lf_prompt = await run_stage("prompt", _compile_prompt, retrieved["context"], question)
+
+    generation = None
+    end_time = None
     try:
-        lf_prompt = langfuse.get_prompt("pdf_qa_prompt", label="production")
-        template = PromptTemplate.from_template(
-            lf_prompt.get_langchain_prompt(),
-            metadata={"langfuse_prompt": lf_prompt}
+        async with stage_slot("llm"):
+            generation = _start_generation(lf_prompt)
+            with stage_timer("qa", "llm"):
+                response = await get_llm_client().aio.models.generate_content(
+                    model=MODEL_NAME,
+                    contents=compiled_prompt
+                )
+        end_time = time.time_ns()
+        response_text = response.candidates[0].content.parts[0].text.strip()
+
+        if not isinstance(response_text, str):
+            response_text = str(response_text)
+
+        record = functools.partial(
+            _record_usage, generation=generation, end_time=end_time, input=compiled_prompt, output=response_text
         )
-    except Exception:
-        template = PromptTemplate.from_template(
-            """You are a helpful assistant. Use the following context to answer the question.
+        with stage_timer("qa", "token_usage"):
+            prompt_tokens, completion_tokens = await run_stage(
+                "prompt", resolve_usage, response, compiled_prompt, response_text, count=_exact_token_count, record=record
+            )
+        generated = bool(response_text) and _finished(response)
+    except Exception as exc:
+        if end_time is None:
+            _record_failure(generation, compiled_prompt, exc)
+        response_text = "Sorry, I couldn't generate a response at the moment."
+        prompt_tokens = 0
+        completion_tokens = 0
+        generated = False
 
-Context:
-{context}
+    return _answer_payload(retrieved, response_text, prompt_tokens, completion_tokens), generated
 
-Question:
-{question}
 
-Answer:"""
+async def answer_questions_batch(questions: list[str], project_name: str, pdf_name: str | None = None):
+    """
+    Answer many questions about a project, streaming each answer as it completes.
+
+    The questions are embedded with one embedder request and searched with
+    one vector store round-trip. Repeated questions are answered once,
+    chunks retrieved by several questions are cleaned once, and questions
+    with the same retrieved chunks share one packed context. Cached answers
+    are sent immediately; the remaining questions call the LLM concurrently,
+    at most QA_BATCH_LLM_CONCURRENCY at a time for the batch and within the
+    process-wide LLM limit, and are streamed back in completion order.
+
+    Args:
+        questions (list[str]): Question strings.
+        project_name (str): Project namespace for isolation.
+        pdf_name (str|None): Optional PDF filename to restrict context source.
+
+    Yields:
+        str: One JSON line per question with its "index" in `questions`, the
+        "question" and the answer payload of `answer_question`, or an
+        "error" message.
+    """
+    current_trace_id.set(get_langfuse().create_trace_id())
+    with stage_timer("qa", "batch_total"):
+        async for line in _answer_questions_batch(questions, project_name, pdf_name):
+            yield line
+
+
+async def _answer_questions_batch(questions: list[str], project_name: str, pdf_name: str | None):
+    """
+    Run the batch QA pipeline for `answer_questions_batch`.
+
+    Args:
+        questions (list[str]): Question strings.
+        project_name (str): Project namespace for isolation.
+        pdf_name (str|None): Optional PDF filename to restrict context source.
+
+    Yields:
+        str: JSON lines, as documented on `answer_questions_batch`.
+    """
+    positions: dict[str, list[int]] = {}
+    for index, question in enumerate(questions):
+        positions.setdefault(question, []).append(index)
+    unique = list(positions)
+
+    def lines(question: str, payload: dict) -> str:
+        return "".join(
+            json.dumps({"index": index, "question": question, **payload}) + "\n"
+            for index in positions[question]
         )
 
-    try:
-        compiled_prompt = template.invoke(
-            {"context": context, "question": question},
-            config={"callbacks": [langfuse_handler]}
+    with stage_timer("qa", "batch_embed"):
+        embeddings = await run_stage("embed", _embed_questions, unique)
+
+    pending = []
+    cached_answers = await run_stage("retrieve", answer_cache.get_many, project_name, pdf_name, unique, embeddings)
+    for question, embedding, cached in zip(unique, embeddings, cached_answers):
+        if cached is not None:
+            yield lines(question, cached)
+        else:
+            pending.append((question, embedding))
+    if not pending:
+        return
+
+    with stage_timer("qa", "batch_retrieve"):
+        contexts = await run_stage(
+            "retrieve", _retrieve_contexts, [embedding for _, embedding in pending], project_name, pdf_name
         )
-    except Exception:
-        compiled_prompt = template.format(context=context, question=question)
 
-    if not isinstance(compiled_prompt, str):
-        compiled_prompt = str(compiled_prompt)
+    limit = asyncio.Semaphore(settings.QA_BATCH_LLM_CONCURRENCY)
 
+    async def answer(question: str, embedding: list[float], retrieved: dict) -> tuple[str, dict]:
+        if not retrieved["chunks"]:
+            return question, _no_context_response(retrieved["source_pdfs"])
+        try:
+            async with limit:
+                result, generated = await _generate_answer(question, retrieved)
+        except Exception:
+            return question, {"error": "Sorry, I couldn't generate a response at the moment."}
+        if generated:
+            answer_cache.put(project_name, pdf_name, question, embedding, result)
+        return question, {**result, "cached": False}
+
+    tasks = [
+        asyncio.ensure_future(answer(question, embedding, retrieved))
+        for (question, embedding), retrieved in zip(pending, contexts)
+    ]
     try:
-        model_name = "gemini-2.5-flash"
-        prompt_tokens = count_tokens(client, model_name, compiled_prompt)
-        response = client.models.generate_content(
-            model=model_name,
-            contents=compiled_prompt
-        )
-        response_text = response.candidates[0].content.parts[0].text.strip()
+        for completed in asyncio.as_completed(tasks):
+            question, payload = await completed
+            yield lines(question, payload)
+    finally:
+        for task in tasks:
+            task.cancel()
 
-        if not isinstance(response_text, str):
-            response_text = str(response_text)
 
-        completion_tokens = count_tokens(client, model_name, response_text)
+_STREAM_END = object()
 
-        if hasattr(langfuse_handler, "update_current_trace"):
-            langfuse_handler.update_current_trace(
-                usage_details={
-                    "prompt_tokens": prompt_tokens,
-                    "completion_tokens": completion_tokens,
-                    "total_tokens": prompt_tokens + completion_tokens,
-                },
-                metadata={"model": model_name},
-            )
 
+def _sse(event: str, data: dict) -> str:
+    """
+    Format a Server-Sent Events message.
+
+    Args:
+        event (str): Event name.
+        data (dict): JSON-serializable payload.
+
+    Returns:
+        str: Encoded SSE message.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def answer_question_stream(question: str, project_name: str, pdf_name: str | None = None):
+    """
+    Stream an answer to a user question as Server-Sent Events.
+
+    Emits a "context" event with the sources, chunk preview and context budget
+    as soon as retrieval finishes, then one "token" event per text fragment
+    produced by Gemini's streaming API, and finally a "done" event with token
+    usage. Cached answers are sent as a single "token" event. Failures are
+    reported with an "error" event.
+
+    Generation runs in its own task that buffers the chunks, so the LLM
+    slot is released as soon as Gemini is done rather than when a slow
+    client has read the answer; the task is cancelled if the client goes
+    away. Only non-empty answers that were not cut short are cached.
+
+    Args:
+        question (str): User's question string.
+        project_name (str): Project namespace for isolation.
+        pdf_name (str|None): Optional PDF filename to restrict context source.
+
+    Yields:
+        str: Encoded SSE messages.
+    """
+    current_trace_id.set(get_langfuse().create_trace_id())
+    with stage_timer("qa", "stream_total"):
+        async for message in _answer_question_stream(question, project_name, pdf_name):
+            yield message
+
+
+async def _answer_question_stream(question: str, project_name: str, pdf_name: str | None):
+    """
+    Run the streaming QA pipeline for `answer_question_stream`.
+
+    Args:
+        question (str): User's question string.
+        project_name (str): Project namespace for isolation.
+        pdf_name (str|None): Optional PDF filename to restrict context source.
+
+    Yields:
+        str: Encoded SSE messages.
+    """
+    with stage_timer("qa", "embed"):
+        query_embedding = await run_stage("embed", _embed_question, question)
+
+    cached = await run_stage("retrieve", answer_cache.get, project_name, pdf_name, question, query_embedding)
+    if cached is not None:
+        answer = cached.pop("answer")
+        yield _sse("context", cached)
+        yield _sse("token", {"text": answer})
+        yield _sse("done", {"cached": cached["cached"]})
+        return
+
+    with stage_timer("qa", "retrieve"):
+        retrieved = await run_stage("retrieve", _retrieve_context, query_embedding, project_name, pdf_name)
+    if not retrieved["chunks"]:
+        response = _no_context_response(retrieved["source_pdfs"])
+        answer = response.pop("answer")
+        yield _sse("context", response)
+        yield _sse("token", {"text": answer})
+        yield _sse("done", {"cached": False})
+        return
+
+    context_event = _answer_payload(retrieved, "", 0, 0)
+    for key in ("answer", "prompt_tokens", "completion_tokens", "total_tokens"):
+        context_event.pop(key)
+    yield _sse("context", {**context_event, "cached": False})
+
+    with stage_timer("qa", "prompt"):
+        compiled_prompt, lf_prompt = await run_stage("prompt", _compile_prompt, retrieved["context"], question)
+    chunks = asyncio.Queue()
+    timing = {"generation": None, "first_token_at": None, "end_time": None}
+
+    async def generate():
+        try:
+            async with stage_slot("llm"):
+                timing["generation"] = _start_generation(lf_prompt)
+                with stage_timer("qa", "llm_stream"):
+                    stream = await get_llm_client().aio.models.generate_content_stream(
+                        model=MODEL_NAME,
+                        contents=compiled_prompt
+                    )
+                    async for chunk in stream:
+                        if timing["first_token_at"] is None:
+                            timing["first_token_at"] = datetime.now(timezone.utc)
+                        chunks.put_nowait(chunk)
+            timing["end_time"] = time.time_ns()
+        except Exception as exc:
+            _record_failure(timing["generation"], compiled_prompt, exc)
+            chunks.put_nowait(exc)
+        except asyncio.CancelledError as exc:
+            _record_failure(timing["generation"], compiled_prompt, exc)
+            raise
+        finally:
+            chunks.put_nowait(_STREAM_END)
+
+    producer = asyncio.create_task(generate())
+    parts = []
+    last_chunk = None
+    try:
+        while (chunk := await chunks.get()) is not _STREAM_END:
+            if isinstance(chunk, Exception):
+                yield _sse("error", {"message": "Sorry, I couldn't generate a response at the moment."})
+                return
+            last_chunk = chunk
+            if chunk.text:
+                parts.append(chunk.text)
+                yield _sse("token", {"text": chunk.text})
+    finally:
+        producer.cancel()
+
+    response_text = "".join(parts).strip()
+    record = functools.partial(
+        _record_usage,
+        generation=timing["generation"],
+        end_time=timing["end_time"],
+        input=compiled_prompt,
+        output=response_text,
+        completion_start_time=timing["first_token_at"],
+    )
+    try:
+        with stage_timer("qa", "token_usage"):
+            prompt_tokens, completion_tokens = await run_stage(
+                "prompt", resolve_usage, last_chunk, compiled_prompt, response_text, count=_exact_token_count, record=record
+            )
     except Exception:
-        response_text = "Sorry, I couldn't generate a response at the moment."
         prompt_tokens = 0
         completion_tokens = 0
 
-    return {
-        "answer": response_text,
-        "pdf_name": ", ".join(source_pdfs),
-        "num_chunks": len(clean_chunks),
-        "context_preview": clean_chunks[:2],
+    if response_text and _finished(last_chunk):
+        result = _answer_payload(retrieved, response_text, prompt_tokens, completion_tokens)
+        answer_cache.put(project_name, pdf_name, question, query_embedding, result)
+    yield _sse("done", {
         "prompt_tokens": prompt_tokens,
         "completion_tokens": completion_tokens,
         "total_tokens": prompt_tokens + completion_tokens,
-    }
+        "cached": False,
+    })
 
 
 def list_available_pdfs(project_name: str):
     """
     List all PDFs indexed under the specified project name.
 
+    Served from the upload catalog's cached listing; the vector store is only
+    asked when the catalog is unreachable.
+
     Args:
         project_name (str): Project namespace for filtering.
 
     Returns:
         dict: Dictionary with list of PDF filenames.
     """
-    return {"pdfs": get_available_pdfs(project_name=project_name)}
+    pdfs = list_indexed_pdfs(project_name)
+    if pdfs is None:
+        pdfs = get_vector_store().list_pdfs(project_name=project_name)
+    return {"pdfs": pdfs}
+
+
+def has_pdf(project_name: str, pdf_name: str) -> bool:
+    """
+    Check whether a PDF is indexed in a project.
+
+    Answered from the upload catalog's cached listing; the vector store is
+    only asked when the catalog is unreachable.
+
+    Args:
+        project_name (str): Project namespace.
+        pdf_name (str): PDF file name.
+
+    Returns:
+        bool: True if the PDF has published chunks.
+    """
+    exists = pdf_exists(project_name, pdf_name)
+    if exists is None:
+        exists = pdf_name in get_vector_store().list_pdfs(project_name=project_name)
+    return exists
+
+
+def get_embedder_stats():
+    """
+    Report micro-batching statistics of the shared embedding engine.
+
+    Returns:
+        dict: Batch-size and queue-wait statistics.
+    """
+    return get_embedder().stats()
@@ -0,0 +1,126 @@
+import threading
+import time
+
+from langchain.prompts import PromptTemplate
+
+
+class PromptRegistry:
+    """
+    In-process registry of Langfuse prompt templates.
+
+    Prompts are fetched once and served from memory. After `ttl_seconds` the
+    cached version keeps being served while a background thread fetches the
+    latest one (stale-while-revalidate); if Langfuse is unreachable the stale
+    version stays in use and the fetch is retried every `retry_seconds`. A
+    prompt whose first fetch fails is cached as the fallback template and
+    retried the same way, so only that first lookup waits on Langfuse.
+    Compiled `PromptTemplate` objects are memoized per prompt version, so a
+    template is only parsed when Langfuse publishes a new version.
+
+    Attributes:
+        client (Langfuse): Langfuse client used to fetch prompts.
+        ttl_seconds (float): Age after which a cached prompt is refreshed.
+        retry_seconds (float): Delay before a failed fetch is retried.
+        fallback (PromptTemplate): Template used when a prompt was never
+            fetched successfully.
+    """
+
+    def __init__(self, client, ttl_seconds: float, fallback: str, retry_seconds: float = 5.0):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self.fallback = PromptTemplate.from_template(fallback)
+        self._lock = threading.Lock()
+        self._entries: dict[tuple, dict] = {}
+        self._templates: dict[tuple, PromptTemplate] = {}
+        self._refreshing: set[tuple] = set()
+
+    def _fetch(self, name: str, label: str) -> dict:
+        """
+        Fetch a prompt from Langfuse and compile it, reusing compiled versions.
+
+        Args:
+            name (str): Langfuse prompt name.
+            label (str): Prompt label, e.g. "production".
+
+        Returns:
+            dict: Langfuse prompt, compiled template and when to refresh it.
+        """
+        lf_prompt = self.client.get_prompt(name, label=label, cache_ttl_seconds=0)
+        version_key = (name, lf_prompt.version)
+        with self._lock:
+            template = self._templates.get(version_key)
+        if template is None:
+            template = PromptTemplate.from_template(
+                lf_prompt.get_langchain_prompt(),
+                metadata={"langfuse_prompt": lf_prompt}
+            )
+            with self._lock:
+                self._templates[version_key] = template
+        return {"prompt": lf_prompt, "template": template, "refresh_at": time.monotonic() + self.ttl_seconds}
+
+    def _fetch_or_retry_later(self, key: tuple, entry: dict | None) -> dict:
+        """
+        Fetch a prompt, or keep serving `entry` (the fallback if None) and retry later.
+
+        Args:
+            key (tuple): Prompt name and label.
+            entry (dict | None): Currently cached entry.
+
+        Returns:
+            dict: Entry to cache.
+        """
+        try:
+            return self._fetch(*key)
+        except Exception:
+            stale = entry or {"prompt": None, "template": self.fallback}
+            return {**stale, "refresh_at": time.monotonic() + self.retry_seconds}
+
+    def _refresh(self, key: tuple):
+        """
+        Refresh a cached prompt in the background.
+
+        Args:
+            key (tuple): Prompt name and label.
+
+        Returns:
+            None
+        """
+        try:
+            with self._lock:
+                entry = self._entries.get(key)
+            entry = self._fetch_or_retry_later(key, entry)
+            with self._lock:
+                self._entries[key] = entry
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, name: str, label: str = "production") -> tuple[PromptTemplate, object | None]:
+        """
+        Return the compiled template of a prompt.
+
+        Only the very first lookup of a prompt waits on Langfuse; expired
+        entries, including a cached fallback, are refreshed in the background.
+
+        Args:
+            name (str): Langfuse prompt name.
+            label (str): Prompt label.
+
+        Returns:
+            tuple[PromptTemplate, object | None]: Compiled template and the
+            Langfuse prompt it came from, or the fallback template and None.
+        """
+        key = (name, label)
+        with self._lock:
+            entry = self._entries.get(key)
+            due = entry is not None and time.monotonic() >= entry["refresh_at"]
+            if due and key not in self._refreshing:
+                self._refreshing.add(key)
+                threading.Thread(target=self._refresh, args=(key,), name="prompt-refresh", daemon=True).start()
+
+        if entry is None:
+            entry = self._fetch_or_retry_later(key, None)
+            with self._lock:
+                entry = self._entries.setdefault(key, entry)
+        return entry["template"], entry["prompt"]
@@ -0,0 +1,137 @@
+import queue
+import threading
+from functools import lru_cache
+
+from config import settings
+
+
+_recount_queue = queue.Queue(maxsize=settings.TOKEN_RECOUNT_QUEUE_SIZE)
+_recount_worker = None
+_recount_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _get_local_tokenizer():
+    """
+    Load Gemini's local SentencePiece tokenizer, if it is available.
+
+    Returns:
+        LocalTokenizer | None: Local tokenizer, or None when the optional
+        `sentencepiece` dependency or the tokenizer model is unavailable.
+    """
+    try:
+        from google.genai.local_tokenizer import LocalTokenizer
+
+        return LocalTokenizer(model_name=settings.LLM_MODEL_NAME)
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of LLM tokens in a text without a network call.
+
+    Uses Gemini's local tokenizer when installed and falls back to the common
+    ~4 characters per token approximation. Results are memoized, so chunks
+    that recur across questions are only tokenized once.
+
+    Args:
+        text (str): Text to estimate.
+
+    Returns:
+        int: Estimated token count.
+    """
+    tokenizer = _get_local_tokenizer()
+    if tokenizer is not None:
+        try:
+            return tokenizer.count_tokens(text).total_tokens
+        except Exception:
+            pass
+    return max(1, (len(text) + 3) // 4)
+
+
+def usage_from_response(response) -> tuple[int, int] | None:
+    """
+    Read prompt and completion token counts from a Gemini response.
+
+    Args:
+        response: `GenerateContentResponse`, or the last chunk of a stream.
+
+    Returns:
+        tuple[int, int] | None: Prompt and completion tokens, or None if the
+        response carries no usage metadata.
+    """
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata is None or metadata.prompt_token_count is None:
+        return None
+    return metadata.prompt_token_count, metadata.candidates_token_count or 0
+
+
+def _run_recounts():
+    """
+    Worker loop that recounts estimated usage exactly and records it.
+
+    Returns:
+        None
+    """
+    while True:
+        count, prompt, completion, record = _recount_queue.get()
+        try:
+            record(count(prompt), count(completion))
+        except Exception:
+            pass
+
+
+def _schedule_recount(count, prompt: str, completion: str, record) -> bool:
+    """
+    Queue an exact token recount on the background reporter.
+
+    Args:
+        count (callable): Exact (network) token counter for a text.
+        prompt (str): Compiled prompt.
+        completion (str): Generated answer.
+        record (callable): Receives the exact prompt and completion tokens.
+
+    Returns:
+        bool: False if the reporter queue is full.
+    """
+    global _recount_worker
+    with _recount_lock:
+        if _recount_worker is None:
+            _recount_worker = threading.Thread(target=_run_recounts, name="token-recount", daemon=True)
+            _recount_worker.start()
+    try:
+        _recount_queue.put_nowait((count, prompt, completion, record))
+        return True
+    except queue.Full:
+        return False
+
+
+def resolve_usage(response, prompt: str, completion: str, count, record) -> tuple[int, int]:
+    """
+    Determine token usage for a generation without blocking on the network.
+
+    Usage metadata from the generation response is used when present and
+    recorded right away. Otherwise the usage is estimated locally and an
+    exact recount is deferred to the background reporter, which records the
+    exact figures once available (or the estimates if its queue is full).
+
+    Args:
+        response: Gemini response (or last stream chunk), may be None.
+        prompt (str): Compiled prompt.
+        completion (str): Generated answer.
+        count (callable): Exact (network) token counter for a text.
+        record (callable): Records prompt and completion tokens in tracing.
+
+    Returns:
+        tuple[int, int]: Prompt and completion tokens returned to the client.
+    """
+    usage = usage_from_response(response)
+    if usage is not None:
+        record(*usage)
+        return usage
+    estimated = (estimate_tokens(prompt), estimate_tokens(completion))
+    if not _schedule_recount(count, prompt, completion, record):
+        record(*estimated)
+    return estimated
@@ -0,0 +1,137 @@
+import queue
+import threading
+import time
+
+
+class TraceQueue:
+    """
+    Bounded queue that exports Langfuse generations off the request path.
+
+    A generation is opened with `start` right before the LLM call, which only
+    creates an in-memory span so that its start time is the real one. Once
+    the call is over, requests enqueue its completion with `submit`, which
+    never blocks. A daemon worker drains
+    the queue in batches of up to `batch_size` events, or whatever arrived
+    within `flush_interval` seconds, sets the prompt, answer and usage on
+    each generation and ends it at the time the LLM call ended.
+    When the queue is full, events are dropped and counted rather than
+    slowing answers down.
+
+    Attributes:
+        client (Langfuse): Langfuse client to export to.
+        batch_size (int): Maximum number of events exported per batch.
+        flush_interval (float): Maximum time an event waits for its batch.
+    """
+
+    def __init__(self, client, max_size: int, batch_size: int, flush_interval: float):
+        self.client = client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._exported = 0
+        self._dropped = 0
+        self._failed = 0
+
+    def start(self, name: str, **fields):
+        """
+        Open a generation when its LLM call starts.
+
+        Args:
+            name (str): Generation name.
+            **fields: Keyword arguments for `Langfuse.start_generation`.
+
+        Returns:
+            LangfuseGeneration | None: The open generation, or None if
+            Langfuse could not create it (counted as failed).
+        """
+        try:
+            return self.client.start_generation(name=name, **fields)
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            return None
+
+    def submit(self, generation, end_time: int | None = None, **fields) -> bool:
+        """
+        Queue the completion of a generation opened with `start` for export.
+
+        Args:
+            generation (LangfuseGeneration | None): Generation to complete.
+            end_time (int | None): When the LLM call ended, in nanoseconds
+                since the epoch; None ends it at export time.
+            **fields: Keyword arguments for `LangfuseGeneration.update`,
+                such as input, output, usage_details or level.
+
+        Returns:
+            bool: False if there is no generation or the queue was full and
+            the event was dropped.
+        """
+        if generation is None:
+            return False
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="trace-export", daemon=True)
+                self._worker.start()
+        try:
+            self._queue.put_nowait((generation, end_time, fields))
+            return True
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+
+    def _next_batch(self) -> list:
+        """
+        Wait for the next batch of queued events.
+
+        Returns:
+            list[tuple]: Generations with their end times and fields.
+        """
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """
+        Worker loop that exports queued generations in batches.
+
+        Returns:
+            None
+        """
+        while True:
+            batch = self._next_batch()
+            exported = failed = 0
+            for generation, end_time, fields in batch:
+                try:
+                    generation.update(**fields).end(end_time=end_time)
+                    exported += 1
+                except Exception:
+                    failed += 1
+            with self._lock:
+                self._exported += exported
+                self._failed += failed
+
+    def stats(self) -> dict:
+        """
+        Report export counters and queue depth.
+
+        Returns:
+            dict: Exported, dropped and failed events and the queue depth.
+        """
+        with self._lock:
+            return {
+                "exported": self._exported,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "queue_depth": self._queue.qsize(),
+            }
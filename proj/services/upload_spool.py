@@ -0,0 +1,197 @@
+import hashlib
+import os
+import tempfile
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from config import settings
+
+
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """
+    Raised when an uploaded file exceeds UPLOAD_MAX_BYTES.
+    """
+
+
+class UploadRejectedError(Exception):
+    """
+    Raised when an upload request is not a multipart form of at most the allowed number of files.
+    """
+
+
+def discard_spool(path: str):
+    """
+    Delete a spooled upload, ignoring files that are already gone.
+
+    Args:
+        path (str): Path of the spooled file.
+
+    Returns:
+        None
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class _SpoolingParser:
+    """
+    Multipart callbacks that write the file parts of a form to spool files.
+
+    Each file part of `field` goes to its own spool file in UPLOAD_SPOOL_DIR
+    and is hashed on the way; other parts are skipped. Parts are written as
+    they are parsed, so no file is ever held in memory or written twice.
+
+    Attributes:
+        field (str): Form field holding the files.
+        max_files (int): Maximum number of files accepted.
+        spooled (list[tuple[str, str, str]]): Filename, spool path and
+            SHA-256 hex digest of each complete file.
+    """
+
+    def __init__(self, boundary: bytes, field: str, max_files: int):
+        self.field = field
+        self.max_files = max_files
+        self.spooled = []
+        self._paths = []
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+        self._part = None
+        self.parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if options.get(b"name", b"").decode("utf-8", "replace") != self.field or b"filename" not in options:
+            self._part = None
+            return
+        if len(self._paths) == self.max_files:
+            raise UploadRejectedError(f"Maximum {self.max_files} PDFs allowed.")
+        os.makedirs(settings.UPLOAD_SPOOL_DIR, exist_ok=True)
+        handle = tempfile.NamedTemporaryFile(dir=settings.UPLOAD_SPOOL_DIR, suffix=".pdf", delete=False)
+        self._paths.append(handle.name)
+        self._part = {
+            "filename": options[b"filename"].decode("utf-8", "replace"),
+            "handle": handle,
+            "digest": hashlib.sha256(),
+            "size": 0,
+        }
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        part = self._part
+        if part is None:
+            return
+        part["size"] += end - start
+        if part["size"] > settings.UPLOAD_MAX_BYTES:
+            raise UploadTooLargeError(
+                f"{part['filename']} exceeds the upload limit of {settings.UPLOAD_MAX_BYTES} bytes."
+            )
+        chunk = data[start:end]
+        part["digest"].update(chunk)
+        part["handle"].write(chunk)
+
+    def _on_part_end(self):
+        part = self._part
+        if part is None:
+            return
+        part["handle"].close()
+        self.spooled.append((part["filename"], part["handle"].name, part["digest"].hexdigest()))
+        self._part = None
+
+    def discard(self):
+        """
+        Close and delete every spool file written so far.
+
+        Returns:
+            None
+        """
+        if self._part is not None:
+            self._part["handle"].close()
+            self._part = None
+        for path in self._paths:
+            discard_spool(path)
+
+
+async def spool_uploads(request: Request, field: str, max_files: int) -> list[tuple[str, str, str]]:
+    """
+    Stream the files of a multipart upload request into spool files.
+
+    The request body is parsed as it arrives, in the chunks the server
+    hands over, and each file is written once, straight to its spool file,
+    and hashed on the way; nothing is buffered by the framework first. A
+    request whose Content-Length exceeds what `max_files` files of
+    UPLOAD_MAX_BYTES can take is rejected before its body is read, and a
+    body without a length is cut off as soon as a file crosses the limit.
+    On any failure, the spool files written so far are deleted.
+
+    Args:
+        request (Request): Incoming `multipart/form-data` request.
+        field (str): Form field holding the files.
+        max_files (int): Maximum number of files accepted.
+
+    Returns:
+        list[tuple[str, str, str]]: Filename, spool path and SHA-256 hex
+        digest of each file, in upload order. The caller owns the files.
+
+    Raises:
+        UploadTooLargeError: If the request or a file exceeds the limits.
+        UploadRejectedError: If the request is not a well-formed multipart
+            form, holds no file or more than `max_files` files.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadRejectedError("Expected a multipart/form-data upload.")
+    limit = max_files * settings.UPLOAD_MAX_BYTES + FORM_OVERHEAD_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+        raise UploadTooLargeError(f"Uploads are limited to {max_files} files of {settings.UPLOAD_MAX_BYTES} bytes.")
+
+    spool = _SpoolingParser(boundary, field, max_files)
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > limit:
+                raise UploadTooLargeError(f"Uploads are limited to {max_files} files of {settings.UPLOAD_MAX_BYTES} bytes.")
+            if chunk:
+                await run_in_threadpool(spool.parser.write, chunk)
+        spool.parser.finalize()
+        if not spool.spooled:
+            raise UploadRejectedError("At least one PDF is required.")
+    except MultipartParseError as exc:
+        spool.discard()
+        raise UploadRejectedError("Malformed multipart upload.") from exc
+    except BaseException:
+        spool.discard()
+        raise
+    return spool.spooled
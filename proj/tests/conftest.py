@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run import _install_stand_ins  # noqa: E402
+
+_install_stand_ins(
+    tempfile.mkdtemp(prefix="pdf-qa-tests-"),
+    argparse.Namespace(hnsw_min_chunks=20000, llm_latency_ms=0, embed_latency_ms=0),
+)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def indexed_project(client):
+    """Upload one PDF into a project shared by the QA tests and wait until it is indexed."""
+    from benchmarks.fakes import make_pdf
+
+    response = client.post(
+        "/pdf/upload",
+        params={"project_name": "qa"},
+        files=[("files", ("spells.pdf", make_pdf(3, seed=1), "application/pdf"))],
+    )
+    assert response.status_code == 200
+    for job_id in response.json()["job_ids"]:
+        wait_for_job(client, job_id)
+    return "qa"
+
+
+def wait_for_job(client, job_id: str, timeout: float = 30.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/pdf/jobs/{job_id}").json()
+        if job["done"]:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
@@ -0,0 +1,70 @@
+import numpy as np
+
+from services.answer_cache import AnswerCache
+
+
+def _embedding(*values: float) -> list[float]:
+    return list(values) + [0.0] * (4 - len(values))
+
+
+def _cache(**kwargs) -> AnswerCache:
+    return AnswerCache(max_entries=kwargs.pop("max_entries", 8), ttl_seconds=60, similarity_threshold=0.97, **kwargs)
+
+
+def test_exact_hit_ignores_case_and_whitespace():
+    cache = _cache()
+    cache.put("p", None, "What is a wand?", _embedding(1), {"answer": "A stick."})
+    assert cache.get("p", None, "  what is   a WAND? ", _embedding(0, 1)) == {"answer": "A stick.", "cached": True}
+    assert cache.stats()["hits"] == 1
+
+
+def test_near_duplicate_reuses_answer_only_above_threshold():
+    cache = _cache()
+    cache.put("p", None, "what is a wand", _embedding(1), {"answer": "A stick."})
+    close = _embedding(1, np.tan(np.arccos(0.99)))
+    far = _embedding(1, np.tan(np.arccos(0.9)))
+    assert cache.get("p", None, "what is a wand?", close) == {"answer": "A stick.", "cached": "semantic"}
+    assert cache.get("p", None, "what is a wand?!", far) is None
+
+
+def test_near_duplicate_with_different_keywords_is_a_miss():
+    cache = _cache()
+    cache.put("p", None, "when was the castle founded", _embedding(1), {"answer": "Long ago."})
+    assert cache.get("p", None, "when was the castle closed", _embedding(1)) is None
+    assert cache.get("p", None, "why was the castle not founded", _embedding(1)) is None
+    assert cache.get("p", None, "When was the castle founded?", _embedding(1))["cached"] == "semantic"
+
+def test_scopes_do_not_share_answers():
+    cache = _cache()
+    cache.put("p", "a.pdf", "what is a wand", _embedding(1), {"answer": "A stick."})
+    assert cache.get("p", "b.pdf", "what is a wand", _embedding(1)) is None
+    assert cache.get("q", "a.pdf", "what is a wand", _embedding(1)) is None
+
+
+def test_invalidate_project_drops_its_answers():
+    cache = _cache()
+    cache.put("p", None, "what is a wand", _embedding(1), {"answer": "A stick."})
+    cache.put("q", None, "what is a wand", _embedding(1), {"answer": "A twig."})
+    cache.invalidate_project("p")
+    assert cache.get("p", None, "what is a wand", _embedding(1)) is None
+    assert cache.get("q", None, "what is a wand", _embedding(1)) ["answer"] == "A twig."
+
+
+def test_shared_version_change_invalidates_answers():
+    versions = {"p": 1}
+    cache = _cache(version_source=versions.get, version_ttl_seconds=0)
+    cache.get("p", None, "what is a wand", _embedding(1))
+    cache.put("p", None, "what is a wand", _embedding(1), {"answer": "A stick."})
+    assert cache.get("p", None, "what is a wand", _embedding(1))["answer"] == "A stick."
+    versions["p"] = 2
+    assert cache.get("p", None, "what is a wand", _embedding(1)) is None
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = _cache(max_entries=2)
+    cache.put("p", None, "first", _embedding(1), {"answer": "1"})
+    cache.put("p", None, "second", _embedding(0, 1), {"answer": "2"})
+    cache.get("p", None, "first", _embedding(1))
+    cache.put("p", None, "third", _embedding(0, 0, 1), {"answer": "3"})
+    assert cache.get("p", None, "second", _embedding(0, 1)) is None
+    assert cache.get("p", None, "first", _embedding(1))["answer"] == "1"
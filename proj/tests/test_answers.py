@@ -0,0 +1,99 @@
+import json
+
+from config import settings
+from services.answer_cache import answer_cache
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for message in body.strip().split("\n\n"):
+        event, data = message.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_ask_answers_from_the_indexed_pdf_then_from_the_cache(client, indexed_project):
+    answer_cache.invalidate_project(indexed_project)
+    params = {"q": "what do dragons guard?", "project_name": indexed_project, "pdf_name": "spells.pdf"}
+    first = client.get("/pdf/ask", params=params).json()
+    assert first["cached"] is False and first["pdf_name"] == "spells.pdf"
+    assert first["answer"].startswith("Deterministic answer")
+    again = client.get("/pdf/ask", params={**params, "q": "What do  dragons guard?"}).json()
+    assert again["cached"] is True and again["answer"] == first["answer"]
+
+
+def test_ask_about_unknown_pdf_is_not_found(client, indexed_project):
+    response = client.get("/pdf/ask", params={"q": "owls?", "project_name": indexed_project, "pdf_name": "missing.pdf"})
+    assert response.status_code == 404
+
+
+def test_stream_sends_context_tokens_and_usage(client, indexed_project):
+    answer_cache.invalidate_project(indexed_project)
+    body = client.get("/pdf/ask/stream", params={"q": "where do owls live?", "project_name": indexed_project}).text
+    events = _events(body)
+    names = [name for name, _ in events]
+    assert names[0] == "context" and names[-1] == "done" and "token" in names
+    assert events[0][1]["pdf_name"] == "spells.pdf"
+    answer = "".join(data["text"] for name, data in events if name == "token")
+    assert answer.startswith("Deterministic answer")
+    assert events[-1][1]["cached"] is False and events[-1][1]["total_tokens"] > 0
+
+    cached = _events(client.get("/pdf/ask/stream", params={"q": "where do owls live?", "project_name": indexed_project}).text)
+    assert [name for name, _ in cached] == ["context", "token", "done"]
+    assert cached[1][1]["text"] == answer.strip()
+    assert cached[0][1]["cached"] is True and cached[-1][1]["cached"] is True
+
+
+def test_batch_answers_every_question_once_per_distinct_question(client, indexed_project):
+    answer_cache.invalidate_project(indexed_project)
+    questions = ["what is a wand?", "who brews potions?", "what is a wand?"]
+    body = client.post("/pdf/ask/batch", json={"questions": questions, "project_name": indexed_project}).text
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+    by_index = {line["index"]: line for line in lines}
+    assert by_index[0]["answer"] == by_index[2]["answer"]
+    assert by_index[0]["answer"] != by_index[1]["answer"]
+
+
+def test_batch_rejects_empty_and_oversized_requests(client, indexed_project):
+    assert client.post("/pdf/ask/batch", json={"questions": [], "project_name": indexed_project}).status_code == 400
+    too_many = ["what is a wand?"] * (settings.QA_BATCH_MAX_QUESTIONS + 1)
+    assert client.post("/pdf/ask/batch", json={"questions": too_many, "project_name": indexed_project}).status_code == 400
+
+
+def _stream_returning(chunks, fail=False):
+    async def generate_content_stream(model, contents):
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+            if fail:
+                raise RuntimeError("connection reset")
+
+        return stream()
+
+    return generate_content_stream
+
+
+def test_stream_does_not_cache_truncated_or_failed_answers(client, indexed_project, monkeypatch):
+    from types import SimpleNamespace
+
+    from services import pdf_service
+
+    answer_cache.invalidate_project(indexed_project)
+    models = pdf_service.get_llm_client().aio.models
+    params = {"q": "how tall is the tower?", "project_name": indexed_project}
+    truncated = SimpleNamespace(
+        text="The tower is",
+        usage_metadata=None,
+        candidates=[SimpleNamespace(finish_reason=SimpleNamespace(name="MAX_TOKENS"))],
+    )
+    monkeypatch.setattr(models, "generate_content_stream", _stream_returning([truncated]))
+    assert _events(client.get("/pdf/ask/stream", params=params).text)[-1][1]["cached"] is False
+
+    partial = SimpleNamespace(text="The tower", usage_metadata=None)
+    monkeypatch.setattr(models, "generate_content_stream", _stream_returning([partial], fail=True))
+    names = [name for name, _ in _events(client.get("/pdf/ask/stream", params=params).text)]
+    assert names[-1] == "error"
+
+    monkeypatch.undo()
+    assert _events(client.get("/pdf/ask/stream", params=params).text)[-1][1]["cached"] is False
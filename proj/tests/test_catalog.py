@@ -0,0 +1,57 @@
+import pytest
+
+from benchmarks.fakes import FakeCollection, make_pdf
+from conftest import wait_for_job
+from llama_index_pipeline import catalog
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    fake = FakeCollection()
+    monkeypatch.setattr(catalog, "meta_collection", fake)
+    monkeypatch.setattr(catalog, "_listings", {})
+    return fake
+
+
+def test_listing_only_includes_published_pdfs(collection):
+    catalog.record_queued("p", ["new.pdf"])
+    catalog.record_upload("p", "old.pdf", "abc", "indexed")
+    catalog.record_upload("q", "other.pdf", "def", "indexed")
+    assert catalog.list_indexed_pdfs("p") == ["old.pdf"]
+
+
+def test_requeued_pdf_stays_listed_until_republished(collection):
+    catalog.record_upload("p", "a.pdf", "abc", "indexed")
+    catalog.record_queued("p", ["a.pdf"])
+    catalog.record_status("p", "a.pdf", "failed", error="boom")
+    assert catalog.list_indexed_pdfs("p") == ["a.pdf"]
+
+
+def test_publish_drops_cached_listing(collection):
+    assert catalog.list_indexed_pdfs("p") == []
+    catalog.record_upload("p", "a.pdf", "abc", "indexed")
+    assert catalog.list_indexed_pdfs("p") == ["a.pdf"]
+
+
+def test_find_indexed_uploads_skips_unfinished_uploads(collection):
+    catalog.record_upload("p", "a.pdf", "abc", "indexed")
+    catalog.record_upload("q", "b.pdf", "abc", "indexed")
+    catalog.record_status("p", "c.pdf", "embedding", sha256="def")
+    found = catalog.find_indexed_uploads(["abc", "def"])
+    assert sorted(record["filename"] for record in found["abc"]) == ["a.pdf", "b.pdf"]
+    assert "def" not in found
+
+
+def test_reupload_of_same_content_is_skipped_and_copy_is_not_reembedded(client):
+    pdf = make_pdf(2, seed=7)
+    first = client.post("/pdf/upload", params={"project_name": "dedupe"}, files=[("files", ("a.pdf", pdf, "application/pdf"))]).json()
+    wait_for_job(client, first["job_ids"][0])
+
+    again = client.post("/pdf/upload", params={"project_name": "dedupe"}, files=[("files", ("a.pdf", pdf, "application/pdf"))]).json()
+    assert again["job_ids"] == [] and again["unchanged"] == ["a.pdf"]
+
+    copy = client.post("/pdf/upload", params={"project_name": "dedupe"}, files=[("files", ("b.pdf", pdf, "application/pdf"))]).json()
+    job = wait_for_job(client, copy["job_ids"][0])
+    assert job["stage"] == "linked"
+    assert job["pages_total"] is None
+    assert client.get("/pdf/pdf/list", params={"project_name": "dedupe"}).json() == {"pdfs": ["a.pdf", "b.pdf"]}
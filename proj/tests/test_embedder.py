@@ -0,0 +1,63 @@
+import threading
+
+from llama_index_pipeline.embedder import MicroBatchEmbedder
+
+
+class _RecordingModel:
+    def __init__(self):
+        self.batches = []
+        self.running = threading.Event()
+        self.release = threading.Event()
+
+    def embed_documents(self, texts):
+        self.running.set()
+        self.release.wait(5)
+        self.batches.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+
+def _embedder(model, max_batch_size=4):
+    return MicroBatchEmbedder(model, model_name="test", max_batch_size=max_batch_size, max_wait_ms=1)
+
+
+def _start(target, *args) -> threading.Thread:
+    thread = threading.Thread(target=target, args=args)
+    thread.start()
+    return thread
+
+
+def _wait_for_queue(embedder, depth):
+    for _ in range(500):
+        if embedder.queue_depth() >= depth:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("requests were not queued")
+
+
+def test_large_document_requests_are_split_into_batches():
+    model = _RecordingModel()
+    model.release.set()
+    vectors = _embedder(model).embed_documents(["a" * n for n in range(1, 11)])
+    assert [len(batch) for batch in model.batches] == [4, 4, 2]
+    assert vectors == [[float(n)] for n in range(1, 11)]
+
+
+def test_queries_are_batched_ahead_of_queued_documents():
+    model = _RecordingModel()
+    embedder = _embedder(model)
+    threads = [_start(embedder.embed_documents, ["running"])]
+    assert model.running.wait(5)
+    threads.append(_start(embedder.embed_documents, [f"doc {n}" for n in range(8)]))
+    _wait_for_queue(embedder, 2)
+    result = {}
+    threads.append(_start(lambda: result.setdefault("query", embedder.embed_queries(["question?"]))))
+    _wait_for_queue(embedder, 3)
+    model.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert model.batches[0] == ["running"]
+    assert model.batches[1] == ["question?"]
+    assert [len(batch) for batch in model.batches[2:]] == [4, 4]
+    assert result["query"] == [[9.0]]
+    stats = embedder.stats()
+    assert stats["query_requests"] == 1 and stats["queue_depth"] == 0
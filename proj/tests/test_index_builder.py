@@ -0,0 +1,44 @@
+import hashlib
+
+import fitz
+
+from benchmarks.fakes import make_pdf
+from llama_index_pipeline.index_builder import build_index_from_bytes
+from llama_index_pipeline.vector_store import get_vector_store
+
+
+def _pdf(*seeds: int) -> bytes:
+    doc = fitz.open()
+    for seed in seeds:
+        with fitz.open(stream=make_pdf(1, seed=seed)) as page:
+            doc.insert_pdf(page)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _build(pdf: bytes, project: str, progress=None) -> dict:
+    return build_index_from_bytes(pdf, "doc.pdf", project, progress=progress, sha256=hashlib.sha256(pdf).hexdigest())
+
+
+def test_new_version_keeps_the_chunks_of_unchanged_pages():
+    _build(_pdf(1, 2, 3), "incremental")
+    stats = _build(_pdf(1, 4, 3), "incremental")
+    assert stats["changed_pages"] == 1 and stats["reused_chunks"] > 0
+
+
+def test_version_published_during_ingestion_forces_a_full_rebuild():
+    v1, v2, v3 = _pdf(11, 12, 13), _pdf(11, 12, 14), _pdf(15, 12, 13)
+    _build(v1, "overlap")
+    overlapped = []
+
+    def publish_another_version(stage, **info):
+        if stage == "embedding" and not overlapped:
+            overlapped.append(_build(v3, "overlap"))
+
+    stats = _build(v2, "overlap", progress=publish_another_version)
+    assert overlapped[0]["reused_chunks"] > 0
+    assert stats["reused_chunks"] == 0 and stats["changed_pages"] == 3
+    store = get_vector_store()
+    assert store.published_sha256("doc.pdf", "overlap") == hashlib.sha256(v2).hexdigest()
+    assert len(store.get_chunks("doc.pdf", "overlap")) == stats["num_chunks"]
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pytest
+
+from benchmarks.fakes import FakeCollection
+from llama_index_pipeline import catalog
+from services import job_service
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    monkeypatch.setattr(catalog, "meta_collection", FakeCollection())
+    monkeypatch.setattr(job_service, "_jobs", OrderedDict())
+    return job_service
+
+
+def _spool() -> str:
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as handle:
+        return handle.name
+
+
+def _wait(job_id: str) -> dict:
+    for _ in range(500):
+        job = job_service.get_job(job_id)
+        if job["done"]:
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_progress_is_tracked_on_the_job_and_mirrored_to_the_catalog(jobs, monkeypatch):
+    seen = []
+
+    def build(path, filename, project_name, progress, sha256):
+        for page in range(3):
+            progress("embedding", pages_done=page, pages_total=3)
+            progress("writing", pages_done=page + 1, pages_total=3)
+            seen.append(catalog.get_upload(project_name, filename)["status"])
+        return {"num_chunks": 6, "chunks_per_second": 100.0}
+
+    monkeypatch.setattr(job_service, "build_index_from_bytes", build)
+    job = _wait(jobs.submit_ingestion_job(_spool(), "a.pdf", "p", sha256="abc"))
+    assert (job["stage"], job["pages_done"], job["pages_total"], job["num_chunks"]) == ("linked", 3, 3, 6)
+    assert seen == ["writing", "writing", "writing"]
+
+
+def test_failed_ingestion_is_recorded_and_removes_the_spool(jobs, monkeypatch):
+    def build(path, **kwargs):
+        raise RuntimeError("extraction failed")
+
+    monkeypatch.setattr(job_service, "build_index_from_bytes", build)
+    path = _spool()
+    job = _wait(jobs.submit_ingestion_job(path, "a.pdf", "p"))
+    assert (job["stage"], job["error"]) == ("failed", "extraction failed")
+    assert catalog.get_upload("p", "a.pdf")["status"] == "failed"
+    assert not os.path.exists(path)
+
+
+def test_history_evicts_only_finished_jobs(jobs, monkeypatch):
+    release = threading.Event()
+
+    def build(path, **kwargs):
+        release.wait(5)
+        return {"num_chunks": 1, "chunks_per_second": 1.0}
+
+    monkeypatch.setattr(job_service, "build_index_from_bytes", build)
+    monkeypatch.setattr(job_service.settings, "INGEST_JOB_HISTORY", 1)
+    first = jobs.submit_ingestion_job(_spool(), "a.pdf", "p")
+    second = jobs.submit_ingestion_job(_spool(), "b.pdf", "p")
+    assert jobs.get_job(first) is not None
+    release.set()
+    _wait(first)
+    _wait(second)
+    third = jobs.submit_ingestion_job(_spool(), "c.pdf", "p")
+    _wait(third)
+    assert jobs.get_job(first) is None and jobs.get_job(second) is None
+    assert jobs.get_job(third)["stage"] == "linked"
+
+
+def test_reservations_cannot_overcommit_the_queue(jobs, monkeypatch):
+    monkeypatch.setattr(job_service.settings, "INGEST_MAX_PENDING", job_service._pending + 2)
+    jobs.reserve_capacity(2)
+    try:
+        with pytest.raises(job_service.IngestQueueFullError):
+            jobs.reserve_capacity(1)
+        with pytest.raises(job_service.IngestQueueFullError):
+            jobs.submit_ingestion_job(_spool(), "a.pdf", "p")
+    finally:
+        jobs.release_capacity(2)
+    assert jobs.has_capacity(2)
+
+
+def test_upload_beyond_queue_capacity_is_rejected_without_leaking_slots(client, monkeypatch):
+    from benchmarks.fakes import make_pdf
+    from controllers import pdf_controller
+
+    pending = job_service._pending
+    monkeypatch.setattr(pdf_controller, "has_capacity", lambda num_jobs=1: True)
+    monkeypatch.setattr(job_service.settings, "INGEST_MAX_PENDING", pending + 1)
+    files = [("files", (f"{name}.pdf", make_pdf(1, seed=seed), "application/pdf")) for seed, name in ((11, "x"), (12, "y"))]
+    response = client.post("/pdf/upload", params={"project_name": "full"}, files=files)
+    assert response.status_code == 503
+    assert job_service._pending == pending
+
+
+def test_job_unknown_to_this_process_is_reported_from_the_catalog(client):
+    from benchmarks.fakes import make_pdf
+    from conftest import wait_for_job
+
+    response = client.post(
+        "/pdf/upload", params={"project_name": "restarted"}, files=[("files", ("r.pdf", make_pdf(1, seed=21), "application/pdf"))]
+    )
+    job_id = response.json()["job_ids"][0]
+    tracked = wait_for_job(client, job_id)
+    with job_service._jobs_lock:
+        job_service._jobs.pop(job_id)
+
+    job = client.get(f"/pdf/jobs/{job_id}").json()
+    assert job["stage"] == "linked" and job["done"]
+    assert (job["project"], job["filename"], job["num_chunks"]) == ("restarted", "r.pdf", tracked["num_chunks"])
+    assert client.get("/pdf/jobs/no-such-job").status_code == 404
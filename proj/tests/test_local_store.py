@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from llama_index_pipeline.local_store import LocalVectorStore
+from llama_index_pipeline.vector_store import StalePublishError
+
+
+def _store(root, **kwargs) -> LocalVectorStore:
+    store = LocalVectorStore(
+        str(root), hnsw_min_chunks=10**9, hnsw_m=16, hnsw_ef_construction=100, hnsw_ef_search=50, **kwargs
+    )
+    store.prepare()
+    return store
+
+
+def _vector(seed: int) -> list[float]:
+    return np.random.default_rng(seed).standard_normal(8).tolist()
+
+
+def _publish(store, filename, pages, upload_id, project="p", keep=None, sha256=None, base_sha256=None):
+    rows = [
+        {"id": f"{upload_id}-{page}", "index": index, "text": f"{filename} page {page} {upload_id}",
+         "embedding": _vector(seed), "page": page, "start": 0, "end": 10}
+        for index, (page, seed) in enumerate(pages)
+    ]
+    if rows:
+        store.write_chunks(rows, filename, project, upload_id)
+    store.publish(filename, project, upload_id, sha256, keep=keep, base_sha256=base_sha256)
+
+
+@pytest.fixture(params=["float32", "int8"])
+def dtype(request):
+    return request.param
+
+
+def test_search_finds_the_closest_chunk(tmp_path, dtype):
+    store = _store(tmp_path, dtype=dtype)
+    _publish(store, "a.pdf", [(0, 1), (1, 2), (2, 3)], "u1")
+    _publish(store, "b.pdf", [(0, 4)], "u2")
+    hits = store.search(_vector(2), "p", k=2)
+    assert hits[0].page_content == "a.pdf page 1 u1"
+    assert hits[0].metadata["score"] == pytest.approx(1.0, abs=1e-5)
+    assert [doc.metadata["source"] for doc in store.search(_vector(2), "p", k=5, pdf_name="b.pdf")] == ["b.pdf"]
+
+
+def test_publish_with_keep_renumbers_kept_pages_and_drops_the_others(tmp_path, dtype):
+    store = _store(tmp_path, dtype=dtype)
+    _publish(store, "a.pdf", [(0, 1), (1, 2), (2, 3)], "u1")
+    _publish(store, "a.pdf", [(0, 9)], "u2", keep={0: 1, 2: 2})
+    assert store.get_chunks("a.pdf", "p") == ["a.pdf page 0 u2", "a.pdf page 0 u1", "a.pdf page 2 u1"]
+    assert store.search(_vector(3), "p", k=1)[0].page_content == "a.pdf page 2 u1"
+    assert store.search(_vector(2), "p", k=1)[0].page_content != "a.pdf page 1 u1"
+
+
+def test_replace_without_keep_drops_every_old_chunk(tmp_path):
+    store = _store(tmp_path)
+    _publish(store, "a.pdf", [(0, 1), (1, 2)], "u1", sha256="old")
+    _publish(store, "a.pdf", [(0, 5)], "u2", sha256="new")
+    assert store.get_chunks("a.pdf", "p") == ["a.pdf page 0 u2"]
+    assert store.published_sha256("a.pdf", "p") == "new"
+    assert not list((tmp_path / "projects").glob("*/segments/u1.*"))
+
+
+def test_publish_with_keep_rejects_a_version_published_since_its_base(tmp_path):
+    first = _store(tmp_path)
+    second = _store(tmp_path)
+    _publish(first, "a.pdf", [(0, 1), (1, 2)], "u1", sha256="v1")
+    _publish(second, "a.pdf", [(0, 3)], "u2", sha256="v2")
+    with pytest.raises(StalePublishError):
+        _publish(first, "a.pdf", [(0, 4)], "u3", sha256="v3", keep={1: 1}, base_sha256="v1")
+    assert first.get_chunks("a.pdf", "p") == ["a.pdf page 0 u2"]
+    assert first.published_sha256("a.pdf", "p") == "v2"
+
+
+def test_processes_sharing_a_root_see_each_others_publishes(tmp_path, dtype):
+    first = _store(tmp_path, dtype=dtype)
+    second = _store(tmp_path, dtype=dtype)
+    _publish(first, "a.pdf", [(0, 1)], "u1")
+    assert second.list_pdfs("p") == ["a.pdf"]
+    _publish(second, "b.pdf", [(0, 2)], "u2")
+    _publish(first, "c.pdf", [(0, 3)], "u3")
+    assert first.list_pdfs("p") == second.list_pdfs("p") == ["a.pdf", "b.pdf", "c.pdf"]
+    assert second.search(_vector(3), "p", k=1)[0].page_content == "c.pdf page 0 u3"
+
+
+def test_search_recovers_when_another_process_replaces_a_segment_mid_search(tmp_path, monkeypatch):
+    first = _store(tmp_path)
+    second = _store(tmp_path)
+    _publish(first, "a.pdf", [(0, 1), (1, 2)], "u1")
+    second.list_pdfs("p")
+    exact_search = second._exact_search
+    replaced = []
+
+    def search_then_replace(*args):
+        hits = exact_search(*args)
+        if not replaced:
+            replaced.append(True)
+            _publish(first, "a.pdf", [(0, 1)], "u2", keep={1: 1})
+        return hits
+
+    monkeypatch.setattr(second, "_exact_search", search_then_replace)
+    hits = second.search(_vector(2), "p", k=1)
+    assert replaced and hits[0].page_content == "a.pdf page 1 u1"
+    assert second.get_chunks("a.pdf", "p") == ["a.pdf page 0 u2", "a.pdf page 1 u1"]
+
+
+def test_int8_segments_keep_only_their_codes_mapped_and_rerank_from_disk(tmp_path):
+    store = _store(tmp_path, dtype="int8", rerank_candidates=2)
+    _publish(store, "a.pdf", [(0, 1), (1, 2), (2, 3)], "u1")
+    segment = store._load_project("p")["segments"]["a.pdf"]
+    assert segment["vectors"] is None and segment["codes"].dtype == np.int8
+    hits = store.search_many([_vector(2), _vector(3)], "p", k=1)
+    assert [docs[0].page_content for docs in hits] == ["a.pdf page 1 u1", "a.pdf page 2 u1"]
+    assert hits[0][0].metadata["score"] == pytest.approx(1.0, abs=1e-6)
+    assert sorted(path.suffix for path in (tmp_path / "projects").glob("*/segments/u1.*")) == [".f32", ".i8", ".jsonl", ".scale"]
@@ -0,0 +1,61 @@
+import fitz
+
+from llama_index_pipeline.index_builder import _reusable_pages
+from llama_index_pipeline.pdf_extract import pdf_page_hashes
+
+
+def _text_pdf(texts: list[str]) -> fitz.Document:
+    doc = fitz.open()
+    for text in texts:
+        doc.new_page().insert_text((72, 72), text)
+    return doc
+
+
+def _form_pdf(texts: list[str]) -> bytes:
+    """Build a PDF whose pages only paint a form XObject of another PDF's page."""
+    source = _text_pdf(texts)
+    doc = fitz.open()
+    for number in range(len(texts)):
+        doc.new_page().show_pdf_page(fitz.Rect(0, 0, 595, 842), source, number)
+    return doc.tobytes()
+
+
+def _previous(page_hashes: list[str]) -> dict:
+    return {"page_hashes": page_hashes, "chunks": [], "sha256": "published"}
+
+
+def test_form_xobject_pages_hash_by_the_form_they_paint():
+    hashes = pdf_page_hashes(_form_pdf(["first page", "second page", "third page"]))
+    assert len(set(hashes)) == 3
+
+
+def test_changed_form_xobject_page_changes_only_its_hash():
+    before = pdf_page_hashes(_form_pdf(["first page", "second page", "third page"]))
+    after = pdf_page_hashes(_form_pdf(["first page", "second page, edited", "third page"]))
+    assert [old == new for old, new in zip(before, after)] == [True, False, True]
+
+
+def test_changed_text_page_changes_only_its_hash():
+    before = pdf_page_hashes(_text_pdf(["alpha", "beta", "gamma"]).tobytes())
+    after = pdf_page_hashes(_text_pdf(["alpha", "beta, edited", "gamma"]).tobytes())
+    assert [old == new for old, new in zip(before, after)] == [True, False, True]
+
+
+def test_hashes_survive_object_renumbering():
+    doc = _text_pdf(["alpha", "beta", "gamma"])
+    assert pdf_page_hashes(doc.tobytes()) == pdf_page_hashes(doc.tobytes(garbage=4))
+
+
+def test_inserted_and_moved_pages_are_matched_to_their_old_numbers():
+    before = pdf_page_hashes(_form_pdf(["alpha", "beta", "gamma", "delta"]))
+    after = pdf_page_hashes(_form_pdf(["delta", "alpha", "new page", "beta", "gamma"]))
+    keep = _reusable_pages(_previous(before), after, "published")
+    assert keep == {3: 0, 0: 1, 1: 3, 2: 4}
+
+
+def test_inserted_text_page_keeps_the_following_pages():
+    doc = _text_pdf(["alpha", "beta", "gamma"])
+    before = pdf_page_hashes(doc.tobytes())
+    doc.insert_page(1, text="inserted")
+    after = pdf_page_hashes(doc.tobytes(garbage=4))
+    assert _reusable_pages(_previous(before), after, "published") == {0: 0, 1: 2, 2: 3}
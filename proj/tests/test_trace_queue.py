@@ -0,0 +1,44 @@
+import time
+
+from benchmarks.fakes import FakeGeneration, FakeLangfuse
+from services.trace_queue import TraceQueue
+
+
+def _wait_until_ended(generation: FakeGeneration):
+    deadline = time.monotonic() + 5
+    while not generation.ended and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert generation.ended
+
+
+def test_generation_is_ended_at_the_submitted_time_with_its_fields():
+    client = FakeLangfuse()
+    traces = TraceQueue(client, max_size=4, batch_size=2, flush_interval=0.01)
+    generation = traces.start("pdf_qa", model="gemini")
+    assert traces.submit(generation, end_time=123, input="prompt", output="answer")
+    _wait_until_ended(generation)
+    assert generation.end_time == 123
+    assert generation.fields == {"name": "pdf_qa", "model": "gemini", "input": "prompt", "output": "answer"}
+    assert traces.stats()["exported"] == 1
+
+
+def test_submit_without_generation_is_ignored():
+    traces = TraceQueue(FakeLangfuse(), max_size=1, batch_size=1, flush_interval=0.01)
+    assert not traces.submit(None, end_time=1)
+    assert traces.stats()["exported"] == 0
+
+
+def test_ask_traces_prompt_answer_usage_and_llm_end_time(client, indexed_project):
+    from services import pdf_service
+    from services.answer_cache import answer_cache
+
+    answer_cache.invalidate_project(indexed_project)
+    langfuse = pdf_service.get_trace_queue().client
+    before = time.time_ns()
+    answer = client.get("/pdf/ask", params={"q": "which house has a tower?", "project_name": indexed_project}).json()
+    generation = langfuse.generations[-1]
+    _wait_until_ended(generation)
+    assert generation.fields["output"] == answer["answer"]
+    assert "which house has a tower?" in generation.fields["input"]
+    assert generation.fields["usage_details"]["total_tokens"] == answer["total_tokens"]
+    assert before <= generation.end_time <= time.time_ns()
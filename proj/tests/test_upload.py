@@ -0,0 +1,73 @@
+import hashlib
+import os
+
+import pytest
+
+from benchmarks.fakes import make_pdf
+from config import settings
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_SPOOL_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _pdf(name: str, seed: int = 0):
+    return ("files", (name, make_pdf(1, seed=seed), "application/pdf"))
+
+
+def test_more_files_than_allowed_are_rejected_without_leaving_spools(client, spool_dir):
+    response = client.post("/pdf/upload", params={"project_name": "limits"}, files=[_pdf(f"{n}.pdf", n) for n in range(3)])
+    assert response.status_code == 400
+    assert os.listdir(spool_dir) == []
+
+
+def test_file_over_the_limit_is_rejected_while_streaming(client, spool_dir, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 1024)
+    response = client.post("/pdf/upload", params={"project_name": "limits"}, files=[_pdf("big.pdf")])
+    assert response.status_code == 413
+    assert "big.pdf" in response.json()["detail"]
+    assert os.listdir(spool_dir) == []
+
+
+def test_oversized_content_length_is_rejected_before_the_body_is_read(client, spool_dir, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 1024)
+    body = b"x" * (4 * 1024 + 64 * 1024)
+    response = client.post(
+        "/pdf/upload",
+        params={"project_name": "limits"},
+        content=body,
+        headers={"content-type": "multipart/form-data; boundary=xyz"},
+    )
+    assert response.status_code == 413
+    assert os.listdir(spool_dir) == []
+
+
+def test_non_multipart_and_empty_uploads_are_rejected(client, spool_dir):
+    assert client.post("/pdf/upload", params={"project_name": "limits"}, json={"files": []}).status_code == 400
+    empty = client.post("/pdf/upload", params={"project_name": "limits"}, data={"note": "no files"}, files=[("other", ("x.txt", b"x"))])
+    assert empty.status_code == 400
+
+
+def test_uploaded_files_are_spooled_with_their_names_and_hashes(client, spool_dir, monkeypatch):
+    from services import pdf_service
+
+    first, second = make_pdf(1, seed=21), make_pdf(2, seed=22)
+    seen = {}
+    submit = pdf_service.submit_ingestion_job
+
+    def record(path, filename, **kwargs):
+        with open(path, "rb") as handle:
+            seen[filename] = (handle.read(), kwargs["sha256"])
+        return submit(path, filename=filename, **kwargs)
+
+    monkeypatch.setattr(pdf_service, "submit_ingestion_job", record)
+    response = client.post(
+        "/pdf/upload",
+        params={"project_name": "spooled"},
+        files=[("files", ("one.pdf", first, "application/pdf")), ("files", ("two é.pdf", second, "application/pdf"))],
+    )
+    assert response.status_code == 200 and len(response.json()["job_ids"]) == 2
+    assert seen["one.pdf"] == (first, hashlib.sha256(first).hexdigest())
+    assert seen["two é.pdf"] == (second, hashlib.sha256(second).hexdigest())